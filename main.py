@@ -1,15 +1,34 @@
-import customtkinter as ctk
-from package.gui.main_window import AppMainWindow
-from package.database import inicializar_bd
+import os
+import time
 
-def main():
-    print("Inicializando o banco de dados...")
-    inicializar_bd()
-    print("Banco de dados pronto.")
+INICIO = time.perf_counter()
+
+# Com BIBLIOTECA_MEDIR_INICIO=1, imprime o tempo de cada etapa da abertura e
+# fecha assim que a primeira tela de livros aparece (usado por package/benchmark/inicio.py).
+VARIAVEL_MEDIR_INICIO = "BIBLIOTECA_MEDIR_INICIO"
 
+def marcar_etapa(etapa: str):
+    print(f"[inicio] {etapa} {(time.perf_counter() - INICIO) * 1000:.1f}", flush=True)
+
+def main():
+    medir = bool(os.environ.get(VARIAVEL_MEDIR_INICIO))
     print("Iniciando a interface gráfica...")
+    # Importado só aqui: a interface (e o customtkinter) é a parte mais lenta da abertura.
+    from package.gui.main_window import AppMainWindow
+    if medir:
+        marcar_etapa("importacoes")
+
+    # O banco é preparado pela própria janela, em segundo plano.
     app = AppMainWindow()
+    if medir:
+        marcar_etapa("janela")
+
+        def ao_exibir():
+            marcar_etapa("primeira_tela")
+            app.after(0, app.ao_fechar)
+
+        app.lista_livros.ao_exibir_primeira_tela = ao_exibir
     app.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,271 @@
+"""Mede o tempo das operações de ``package/database.py`` em catálogos sintéticos.
+
+Uso (a partir da raiz do projeto)::
+
+    python -m package.benchmark.executar --escalas 1000 100000 --saida resultados.json
+    python -m package.benchmark.executar --comparar baseline.json --tolerancia 0.2
+
+Cada escala usa um banco próprio, fora de data/. Com ``--pasta`` os bancos
+gerados ficam guardados e são reaproveitados nas execuções seguintes (gerar
+1.000.000 de livros leva alguns minutos). As escritas removem o que gravaram,
+então o catálogo não muda entre as repetições nem entre execuções.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from .. import database as db
+from .. import estatisticas
+from ..conexao import gerenciador_conexoes
+from ..migracoes import VERSAO_ATUAL
+from ..models import Livro, Emprestimo
+from .gerador import ParametrosCatalogo, gerar_catalogo, PALAVRAS
+
+ESCALAS_PADRAO = (1000, 100000)
+# Listagens que carregam o catálogo inteiro na memória só rodam até esta escala.
+LIMITE_LISTAGEM_COMPLETA = 100000
+AMOSTRA = 100  # IDs, nomes e livros novos usados pelas operações pontuais
+
+
+def _medir(funcao, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {"min": min(tempos), "mediana": statistics.median(tempos), "repeticoes": repeticoes}
+
+
+def _caminho_catalogo(pasta: str, parametros: ParametrosCatalogo) -> str:
+    return os.path.join(pasta, f"catalogo_{parametros.livros}_{parametros.semente}_v{VERSAO_ATUAL}.db")
+
+
+def _preparar_banco(caminho: str, parametros: ParametrosCatalogo):
+    """Aponta o gerenciador para ``caminho``, gerando o catálogo se o arquivo ainda não existir."""
+    existia = os.path.exists(caminho)
+    gerenciador_conexoes.definir_caminho(caminho)
+    db.inicializar_bd()
+    if not existia:
+        inicio = time.perf_counter()
+        gerar_catalogo(parametros)
+        gerenciador_conexoes.obter_conexao().execute("ANALYZE")
+        print(f"Catálogo de {parametros.livros} livros gerado em {time.perf_counter() - inicio:.1f} s.")
+    db.limpar_cache()
+
+
+def _amostras(rng: random.Random) -> dict:
+    """IDs, nomes e termos sorteados com a semente, para medir sempre as mesmas linhas."""
+    conn = gerenciador_conexoes.obter_conexao()
+
+    def sortear(coluna, tabela):
+        maior = conn.execute(f"SELECT max(rowid) FROM {tabela}").fetchone()[0] or 0
+        rowids = rng.sample(range(1, maior + 1), min(AMOSTRA, maior))
+        return [linha[0] for linha in conn.execute(
+            f"SELECT {coluna} FROM {tabela} WHERE rowid IN (SELECT value FROM json_each(?)) ORDER BY rowid",
+            (json.dumps(rowids),))]
+
+    ids_livros = sortear("id_livro", "livros")
+    nomes = sortear("nome", "autores")
+    usuario = conn.execute("SELECT nome_usuario FROM emprestimos ORDER BY rowid LIMIT 1").fetchone()
+    total = db.contar_livros_bd()
+    return {
+        "ids_livros": ids_livros,
+        "nomes_autores": nomes,
+        "usuario": usuario[0] if usuario else "",
+        "livro_meio": db.buscar_livro_por_id_bd(ids_livros[len(ids_livros) // 2]) if ids_livros else None,
+        "inicio_meio": max(0, total // 2),
+        "termos": [rng.choice(PALAVRAS) for _ in range(10)],
+    }
+
+
+def _buscar_por_ids(ids: list[str]):
+    # Sem cache: mede o acesso ao banco, não o mapa de identidade.
+    db.limpar_cache()
+    for id_livro in ids:
+        db.buscar_livro_por_id_bd(id_livro)
+
+
+def _operacoes_leitura(escala: int, amostras: dict) -> dict:
+    """Nome -> função sem argumentos. Todas só leem o banco."""
+    meio = amostras["inicio_meio"]
+    ids = amostras["ids_livros"]
+    operacoes = {
+        "contar_livros_bd": db.contar_livros_bd,
+        "listar_livros_janela_bd": lambda: db.listar_livros_janela_bd(meio, 100),
+        "listar_livros_resumo_janela_bd": lambda: db.listar_livros_resumo_janela_bd(meio, 100),
+        "listar_livros_pagina_bd": lambda: db.listar_livros_pagina_bd(100),
+        "iterar_livros_resumo_bd (1000)": lambda: sum(1 for _, __ in zip(range(1000), db.iterar_livros_resumo_bd())),
+        "obter_posicao_livro_bd": lambda: db.obter_posicao_livro_bd(amostras["livro_meio"]),
+        f"buscar_livro_por_id_bd (x{len(ids)})": lambda: _buscar_por_ids(ids),
+        f"buscar_livros_bd (x{len(amostras['termos'])})": lambda: [db.buscar_livros_bd(termo) for termo in amostras["termos"]],
+        f"resolver_autores_bd ({len(amostras['nomes_autores'])} nomes)": lambda: db.resolver_autores_bd(amostras["nomes_autores"]),
+        "listar_emprestimos_ativos_bd": db.listar_emprestimos_ativos_bd,
+        "listar_emprestimos_atrasados_bd": db.listar_emprestimos_atrasados_bd,
+        "listar_emprestimos_usuario_bd": lambda: db.listar_emprestimos_usuario_bd(amostras["usuario"]),
+        f"listar_emprestimos_livro_bd (x{len(ids)})": lambda: [db.listar_emprestimos_livro_bd(i) for i in ids],
+        "obter_situacao_emprestimos_bd": db.obter_situacao_emprestimos_bd,
+        "obter_resumo_bd": estatisticas.obter_resumo_bd,
+        "listar_livros_por_autor_bd": estatisticas.listar_livros_por_autor_bd,
+        "listar_livros_mais_emprestados_bd": estatisticas.listar_livros_mais_emprestados_bd,
+        "listar_emprestimos_por_mes_bd": estatisticas.listar_emprestimos_por_mes_bd,
+    }
+    if escala <= LIMITE_LISTAGEM_COMPLETA:
+        operacoes["listar_livros_bd"] = db.listar_livros_bd
+        operacoes["listar_emprestimos_bd"] = db.listar_emprestimos_bd
+    return operacoes
+
+
+def _livros_novos(rng: random.Random, nomes_autores: list[str]) -> list[Livro]:
+    livros = []
+    for i in range(AMOSTRA):
+        livro = Livro(f"Benchmark {rng.choice(PALAVRAS)} {i}", isbn=f"999{i:010d}", editora="Editora Benchmark",
+                      numero_paginas=100, ano_publicacao=2000)
+        nome = nomes_autores[i % len(nomes_autores)] if nomes_autores else "Autor Benchmark"
+        livro.autores.extend(db.resolver_autores_bd([nome]))
+        livros.append(livro)
+    return livros
+
+
+def _medir_escritas(rng: random.Random, amostras: dict, repeticoes: int) -> dict:
+    """Grava, altera e remove os mesmos livros (com um empréstimo cada) a cada repetição."""
+    tempos: dict[str, list[float]] = {}
+
+    def cronometrar(nome, funcao, itens):
+        inicio = time.perf_counter()
+        for item in itens:
+            if not funcao(item):
+                raise RuntimeError(f"{nome} falhou durante o benchmark.")
+        tempos.setdefault(f"{nome} (x{len(itens)})", []).append(time.perf_counter() - inicio)
+
+    for _ in range(repeticoes):
+        livros = _livros_novos(rng, amostras["nomes_autores"])
+        hoje = date.today()
+        emprestimos = [Emprestimo(livro, "usuario benchmark", hoje, hoje + timedelta(days=14)) for livro in livros]
+        cronometrar("adicionar_livro_bd", db.adicionar_livro_bd, livros)
+        cronometrar("adicionar_emprestimo_bd", db.adicionar_emprestimo_bd, emprestimos)
+        with contextlib.redirect_stdout(io.StringIO()):  # registrar_devolucao imprime uma linha por livro
+            for emprestimo in emprestimos:
+                emprestimo.registrar_devolucao(hoje)
+        cronometrar("atualizar_emprestimo_bd", db.atualizar_emprestimo_bd, emprestimos)
+        for livro in livros:
+            livro.titulo = livro.titulo + " (revisto)"
+            livro.numero_paginas += 1
+        cronometrar("atualizar_livro_bd", db.atualizar_livro_bd, livros)
+        cronometrar("remover_livro_bd", lambda livro: db.remover_livro_bd(livro.id_item), livros)
+
+    return {nome: {"min": min(lista), "mediana": statistics.median(lista), "repeticoes": len(lista)}
+            for nome, lista in tempos.items()}
+
+
+def executar_escala(escala: int, repeticoes: int, pasta: str, semente: int = 42) -> dict:
+    """Gera (ou reaproveita) o catálogo de ``escala`` livros e mede todas as operações."""
+    parametros = ParametrosCatalogo(escala, semente=semente)
+    _preparar_banco(_caminho_catalogo(pasta, parametros), parametros)
+    rng = random.Random(semente)
+    amostras = _amostras(rng)
+    resultados = {}
+    for nome, funcao in _operacoes_leitura(escala, amostras).items():
+        funcao()  # aquece o cache de páginas do SQLite
+        resultados[nome] = _medir(funcao, repeticoes)
+        print(f"  {nome:<45} {resultados[nome]['mediana'] * 1000:10.2f} ms")
+    for nome, medida in _medir_escritas(rng, amostras, repeticoes).items():
+        resultados[nome] = medida
+        print(f"  {nome:<45} {medida['mediana'] * 1000:10.2f} ms")
+    return {"parametros": parametros.como_dict(), "operacoes": resultados}
+
+
+def comparar(resultados: dict, baseline: dict, tolerancia: float, piso: float = 0.001) -> list[str]:
+    """Compara os tempos mínimos com os da baseline; retorna as regressões.
+
+    Uma operação regride quando fica mais de ``tolerancia`` (relativa) e mais
+    de ``piso`` segundos mais lenta: abaixo de um milissegundo a variação entre
+    execuções já passa facilmente de 20%.
+    """
+    regressoes = []
+    print(f"\nComparação com a baseline de {baseline.get('metadados', {}).get('data', '?')}:")
+    for escala, dados in resultados["escalas"].items():
+        base_escala = baseline.get("escalas", {}).get(escala)
+        if base_escala is None:
+            print(f"  escala {escala}: ausente na baseline")
+            continue
+        for nome, medida in dados["operacoes"].items():
+            base = base_escala["operacoes"].get(nome)
+            if base is None or base["min"] <= 0:
+                continue
+            razao = medida["min"] / base["min"]
+            marca = ""
+            if razao > 1 + tolerancia and medida["min"] - base["min"] > piso:
+                marca = "  <-- REGRESSÃO"
+                regressoes.append(f"{escala} / {nome}: {razao:.2f}x")
+            print(f"  {escala:>8} {nome:<45} {razao:6.2f}x{marca}")
+    return regressoes
+
+
+def _metadados(perfil: str) -> dict:
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "perfil": perfil,
+        "versao_esquema": VERSAO_ATUAL,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark das operações do banco da biblioteca.")
+    parser.add_argument("--escalas", type=int, nargs="+", default=list(ESCALAS_PADRAO),
+                        help="Quantidades de livros (ex.: 1000 100000 1000000).")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--pasta", help="Pasta onde os catálogos gerados são guardados e reaproveitados.")
+    parser.add_argument("--saida", help="Arquivo JSON onde gravar os resultados.")
+    parser.add_argument("--comparar", metavar="BASELINE", help="JSON de uma execução anterior.")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="Aumento relativo do tempo tolerado antes de acusar regressão (0.2 = 20%%).")
+    parser.add_argument("--piso", type=float, default=1.0,
+                        help="Diferença absoluta mínima, em ms, para acusar regressão.")
+    args = parser.parse_args(argv)
+
+    pasta = args.pasta or tempfile.mkdtemp(prefix="biblioteca_benchmark_")
+    os.makedirs(pasta, exist_ok=True)
+    resultados = {"metadados": _metadados(gerenciador_conexoes.perfil.nome), "escalas": {}}
+    try:
+        for escala in args.escalas:
+            print(f"\nEscala: {escala} livros")
+            resultados["escalas"][str(escala)] = executar_escala(escala, args.repeticoes, pasta, args.semente)
+    finally:
+        gerenciador_conexoes.fechar_todas()
+        if not args.pasta:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados gravados em {args.saida}.")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            baseline = json.load(arquivo)
+        regressoes = comparar(resultados, baseline, args.tolerancia, args.piso / 1000)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}:")
+            for linha in regressoes:
+                print(f"  {linha}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
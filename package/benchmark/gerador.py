@@ -0,0 +1,151 @@
+import random
+import uuid
+from datetime import date, timedelta
+
+from ..conexao import gerenciador_conexoes
+from ..models import Autor
+from ..datas import para_dia
+
+# Quantos autores um livro costuma ter: a maioria tem um só, poucos passam de três.
+DISTRIBUICAO_AUTORES_POR_LIVRO = {1: 0.72, 2: 0.19, 3: 0.06, 4: 0.02, 5: 0.01}
+
+PALAVRAS = (
+    "amor guerra noite mar cidade sombra tempo casa vida morte jardim rio sol lua "
+    "caminho segredo silêncio memória viagem fogo pedra vento ilha estrela sonho "
+    "coração inverno verão livro carta janela ponte montanha floresta deserto"
+).split()
+NOMES = ("Ana Bruno Carla Diego Elisa Fábio Gabriela Heitor Irene João Karina Luís Marta "
+         "Nuno Olga Paulo Quitéria Rafael Sofia Tiago Úrsula Vítor Wanda Xavier Yara Zé").split()
+SOBRENOMES = ("Silva Souza Costa Santos Oliveira Pereira Rodrigues Almeida Nascimento Lima "
+              "Araújo Fernandes Carvalho Gomes Martins Rocha Ribeiro Alves Monteiro Mendes").split()
+EDITORAS = ("Aurora", "Horizonte", "Companhia das Páginas", "Editora Central", "Letra Viva",
+            "Nova Fronteira Literária", "Sextante Azul", "Rocco Verde")
+
+
+class ParametrosCatalogo:
+    """Tamanho e forma de um catálogo sintético. A mesma semente gera sempre o mesmo catálogo."""
+
+    def __init__(self, livros: int, autores: int | None = None, emprestimos: int | None = None,
+                 fracao_devolvidos: float = 0.9, fracao_atrasados: float = 0.3, semente: int = 42,
+                 data_referencia: date = date(2025, 1, 1)):
+        self.livros = livros
+        self.autores = autores if autores is not None else max(1, livros // 4)
+        self.emprestimos = emprestimos if emprestimos is not None else livros * 2
+        self.fracao_devolvidos = fracao_devolvidos  # dos empréstimos, quantos já voltaram
+        self.fracao_atrasados = fracao_atrasados    # dos ainda em aberto, quantos passaram do prazo
+        self.semente = semente
+        self.data_referencia = data_referencia
+
+    def como_dict(self) -> dict:
+        return {
+            "livros": self.livros,
+            "autores": self.autores,
+            "emprestimos": self.emprestimos,
+            "fracao_devolvidos": self.fracao_devolvidos,
+            "fracao_atrasados": self.fracao_atrasados,
+            "semente": self.semente,
+            "data_referencia": self.data_referencia.isoformat(),
+        }
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _gerar_autores(rng: random.Random, quantidade: int) -> list[tuple]:
+    linhas = []
+    for i in range(quantidade):
+        nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {i}"
+        nascimento = date(1900, 1, 1) + timedelta(days=rng.randrange(36500))
+        linhas.append((_uuid(rng), nome, Autor.normalizar_nome(nome), para_dia(nascimento), ""))
+    return linhas
+
+
+def _pesos_popularidade(quantidade: int) -> list[float]:
+    """Pesos acumulados com cauda longa: o autor i aparece com peso proporcional a 1 / (i + 1)."""
+    pesos_acumulados = []
+    total = 0.0
+    for i in range(quantidade):
+        total += 1.0 / (i + 1)
+        pesos_acumulados.append(total)
+    return pesos_acumulados
+
+
+def _gerar_livros(rng: random.Random, primeiro: int, quantidade: int, ids_autores: list[str],
+                  pesos_acumulados: list[float]):
+    """Produz (linhas de livros, vínculos), com autores populares aparecendo em mais livros."""
+    quantidades, pesos_quantidade = zip(*DISTRIBUICAO_AUTORES_POR_LIVRO.items())
+    livros, vinculos = [], []
+    for i in range(primeiro, primeiro + quantidade):
+        id_livro = _uuid(rng)
+        titulo = " ".join(rng.choice(PALAVRAS) for _ in range(rng.randint(1, 4))).capitalize()
+        sinopse = " ".join(rng.choice(PALAVRAS) for _ in range(rng.randint(10, 40)))
+        livros.append((id_livro, titulo, rng.randint(1900, 2024), f"978{i:010d}", rng.choice(EDITORAS),
+                       rng.randint(50, 1200), sinopse))
+        n_autores = min(len(ids_autores), rng.choices(quantidades, pesos_quantidade)[0])
+        escolhidos = dict.fromkeys(rng.choices(ids_autores, cum_weights=pesos_acumulados, k=n_autores))
+        vinculos.extend((id_livro, id_autor) for id_autor in escolhidos)
+    return livros, vinculos
+
+
+def _gerar_emprestimos(rng: random.Random, parametros: ParametrosCatalogo, ids_livros: list[str],
+                       usuarios: list[str], quantidade: int) -> list[tuple]:
+    referencia = para_dia(parametros.data_referencia)
+    linhas = []
+    for _ in range(quantidade):
+        prazo = rng.choice((7, 14, 21))
+        if rng.random() < parametros.fracao_devolvidos:
+            inicio = referencia - rng.randint(prazo, 3650)
+            devolucao = inicio + rng.randint(1, prazo + 10)
+        elif rng.random() < parametros.fracao_atrasados:
+            inicio = referencia - prazo - rng.randint(1, 60)
+            devolucao = None
+        else:
+            inicio = referencia - rng.randint(0, prazo - 1)
+            devolucao = None
+        linhas.append((_uuid(rng), rng.choice(ids_livros), rng.choice(usuarios), inicio, inicio + prazo, devolucao))
+    return linhas
+
+
+def gerar_catalogo(parametros: ParametrosCatalogo, tamanho_lote: int = 50000, gerenciador=gerenciador_conexoes):
+    """Grava no banco atual do ``gerenciador`` um catálogo sintético determinístico.
+
+    Escreve direto nas tabelas com executemany (sem passar pelos objetos do
+    modelo), em lotes, cada um em sua transação. O esquema já deve existir.
+    """
+    rng = random.Random(parametros.semente)
+    autores = _gerar_autores(rng, parametros.autores)
+    ids_autores = [linha[0] for linha in autores]
+    with gerenciador.transacao() as cursor:
+        cursor.executemany('''
+            INSERT INTO autores (id_autor, nome, nome_normalizado, data_nascimento, biografia)
+            VALUES (?, ?, ?, ?, ?)
+        ''', autores)
+
+    pesos_acumulados = _pesos_popularidade(len(ids_autores))
+    ids_livros = []
+    for inicio in range(0, parametros.livros, tamanho_lote):
+        livros, vinculos = _gerar_livros(rng, inicio, min(tamanho_lote, parametros.livros - inicio),
+                                         ids_autores, pesos_acumulados)
+        ids_livros.extend(linha[0] for linha in livros)
+        with gerenciador.transacao() as cursor:
+            # Como na importação: vínculos antes dos livros, para o índice de busca
+            # receber os autores de cada livro de uma vez.
+            cursor.execute("PRAGMA defer_foreign_keys = ON")
+            cursor.executemany("INSERT INTO livros_autores (livro_id, autor_id) VALUES (?, ?)", vinculos)
+            cursor.executemany('''
+                INSERT INTO livros (id_livro, titulo, ano_publicacao, isbn, editora, numero_paginas, sinopse)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', livros)
+
+    if ids_livros:
+        usuarios = [f"usuario{i}" for i in range(max(1, parametros.emprestimos // 20))]
+        for inicio in range(0, parametros.emprestimos, tamanho_lote):
+            emprestimos = _gerar_emprestimos(rng, parametros, ids_livros, usuarios,
+                                             min(tamanho_lote, parametros.emprestimos - inicio))
+            with gerenciador.transacao() as cursor:
+                cursor.executemany('''
+                    INSERT INTO emprestimos (id_emprestimo, livro_id, nome_usuario, data_emprestimo,
+                                             data_devolucao_prevista, data_devolucao_efetiva)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', emprestimos)
@@ -0,0 +1,99 @@
+"""Mede o tempo de abertura da aplicação (main.py) até a primeira tela de livros.
+
+Uso (a partir da raiz do projeto, com um display disponível)::
+
+    python -m package.benchmark.inicio --saida inicio.json
+    python -m package.benchmark.inicio --comparar inicio_baseline.json
+
+Cada execução roda main.py em um processo novo com BIBLIOTECA_MEDIR_INICIO=1 e
+lê as etapas que ele imprime: ``importacoes`` (interface importada), ``janela``
+(janela criada) e ``primeira_tela`` (primeiras linhas desenhadas), em ms desde
+o início de main.py, além do tempo total do processo, que inclui o interpretador.
+O resultado tem o formato do executar.py, e pode ser comparado do mesmo jeito.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from .executar import comparar, _metadados
+from ..conexao import VARIAVEL_CAMINHO, gerenciador_conexoes
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PREFIXO = "[inicio] "
+
+
+def medir_abertura(ambiente: dict) -> dict[str, float]:
+    """Abre e fecha a aplicação uma vez; retorna as etapas medidas, em segundos."""
+    inicio = time.perf_counter()
+    processo = subprocess.run([sys.executable, os.path.join(RAIZ, "main.py")], cwd=RAIZ, env=ambiente,
+                              capture_output=True, text=True, timeout=120)
+    total = time.perf_counter() - inicio
+    etapas = {}
+    for linha in processo.stdout.splitlines():
+        if linha.startswith(PREFIXO):
+            nome, ms = linha[len(PREFIXO):].split()
+            etapas[nome] = float(ms) / 1000
+    if processo.returncode != 0 or "primeira_tela" not in etapas:
+        raise RuntimeError(f"main.py não chegou à primeira tela (código {processo.returncode}):\n"
+                           f"{processo.stderr.strip()[-2000:]}")
+    etapas["processo"] = total
+    return etapas
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Tempo de abertura da aplicação.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--banco", help="Banco a abrir (padrão: o de BIBLIOTECA_BD ou data/biblioteca.db).")
+    parser.add_argument("--saida", help="Arquivo JSON onde gravar os resultados.")
+    parser.add_argument("--comparar", metavar="BASELINE", help="JSON de uma medição anterior.")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    parser.add_argument("--piso", type=float, default=5.0, help="Diferença absoluta mínima, em ms, para acusar regressão.")
+    args = parser.parse_args(argv)
+
+    ambiente = dict(os.environ, BIBLIOTECA_MEDIR_INICIO="1")
+    if args.banco:
+        ambiente[VARIAVEL_CAMINHO] = args.banco
+    # Bytecode gravado na primeira execução; as demais medem a abertura de sempre.
+    ambiente.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    try:
+        medir_abertura(ambiente)  # aquecimento: compila .pyc e carrega o cache de disco
+        medicoes = [medir_abertura(ambiente) for _ in range(args.repeticoes)]
+    except (RuntimeError, subprocess.TimeoutExpired) as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    operacoes = {}
+    for etapa in medicoes[0]:
+        tempos = [medicao[etapa] for medicao in medicoes]
+        operacoes[etapa] = {"min": min(tempos), "mediana": statistics.median(tempos), "repeticoes": len(tempos)}
+        print(f"  {etapa:<15} {operacoes[etapa]['mediana'] * 1000:8.1f} ms")
+    resultados = {
+        "metadados": _metadados(gerenciador_conexoes.perfil.nome),
+        "escalas": {"inicio": {"parametros": {"banco": args.banco or ambiente.get(VARIAVEL_CAMINHO, "")},
+                               "operacoes": operacoes}},
+    }
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados gravados em {args.saida}.")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            baseline = json.load(arquivo)
+        regressoes = comparar(resultados, baseline, args.tolerancia, args.piso / 1000)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}:")
+            for linha in regressoes:
+                print(f"  {linha}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
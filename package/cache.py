@@ -0,0 +1,87 @@
+import threading
+from collections import OrderedDict
+
+class CacheLRU:
+    """Cache limitado, com descarte do item usado há mais tempo (LRU).
+
+    Também serve de mapa de identidade: enquanto um objeto estiver no cache, as
+    leituras devolvem a mesma instância. Pode ser usado de várias threads.
+    """
+
+    def __init__(self, tamanho_maximo: int = 1000):
+        if tamanho_maximo < 0:
+            raise ValueError("Tamanho máximo do cache não pode ser negativo.")
+        self._tamanho_maximo = tamanho_maximo
+        self._itens: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+        self.invalidacoes = 0
+
+    @property
+    def tamanho_maximo(self) -> int:
+        return self._tamanho_maximo
+
+    def redimensionar(self, tamanho_maximo: int):
+        if tamanho_maximo < 0:
+            raise ValueError("Tamanho máximo do cache não pode ser negativo.")
+        with self._lock:
+            self._tamanho_maximo = tamanho_maximo
+            self._descartar_excedentes()
+
+    def obter(self, chave):
+        """Retorna o valor em cache (ou None), contando acerto/falha."""
+        with self._lock:
+            valor = self._itens.get(chave)
+            if valor is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def espiar(self, chave):
+        """Como ``obter``, mas sem alterar a ordem de uso nem os contadores."""
+        with self._lock:
+            return self._itens.get(chave)
+
+    def guardar(self, chave, valor):
+        if self._tamanho_maximo == 0:
+            return
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            self._descartar_excedentes()
+
+    def invalidar(self, *chaves):
+        with self._lock:
+            for chave in chaves:
+                if self._itens.pop(chave, None) is not None:
+                    self.invalidacoes += 1
+
+    def limpar(self):
+        with self._lock:
+            self.invalidacoes += len(self._itens)
+            self._itens.clear()
+
+    def _descartar_excedentes(self):
+        while len(self._itens) > self._tamanho_maximo:
+            self._itens.popitem(last=False)
+            self.descartes += 1
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "itens": len(self._itens),
+                "tamanho_maximo": self._tamanho_maximo,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+                "descartes": self.descartes,
+                "invalidacoes": self.invalidacoes,
+            }
+
+    def __len__(self) -> int:
+        return len(self._itens)
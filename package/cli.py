@@ -0,0 +1,258 @@
+"""Linha de comando da biblioteca, sem interface gráfica: ``python -m package <comando>``.
+
+Pensada para scripts, cron e pipelines: nenhum módulo da interface (nem o
+customtkinter) é importado, cada comando importa só o que usa e as listagens
+são escritas linha a linha, à medida que são lidas do banco. Mensagens de
+progresso, de migração e de erro vão para stderr; stdout só recebe os dados.
+"""
+import argparse
+import sys
+from contextlib import redirect_stdout
+
+FORMATOS_LISTAGEM = ("tsv", "csv", "jsonl")
+FORMATOS_EXPORTACAO = ("csv", "jsonl")
+
+
+def _preparar_banco():
+    """Aplica as migrações pendentes; com o esquema em dia, é só a leitura de PRAGMA user_version."""
+    from .migracoes import aplicar_migracoes
+    aplicar_migracoes()
+
+
+def _campo_tsv(valor) -> str:
+    return "" if valor is None else " ".join(str(valor).split("\n")).replace("\t", " ")
+
+
+def _escritor(formato: str, colunas: tuple, saida):
+    """Função que escreve um registro (tupla na ordem de ``colunas``) no formato pedido."""
+    if formato == "jsonl":
+        import json
+        return lambda valores: saida.write(json.dumps(dict(zip(colunas, valores)), ensure_ascii=False) + "\n")
+    if formato == "csv":
+        import csv
+        escritor = csv.writer(saida)
+        escritor.writerow(colunas)
+        return escritor.writerow
+    saida.write("\t".join(colunas) + "\n")
+    return lambda valores: saida.write("\t".join(_campo_tsv(v) for v in valores) + "\n")
+
+
+def cmd_adicionar(args) -> int:
+    import sqlite3
+    from .models import Livro
+    from .sessao import Sessao
+    livro = Livro(args.titulo, isbn=args.isbn, editora=args.editora, numero_paginas=args.paginas,
+                  sinopse=args.sinopse, ano_publicacao=args.ano)
+    nomes = [nome.strip() for nome in (args.autores or "").split(";") if nome.strip()]
+    # Autores novos e livro na mesma transação: se o livro for recusado, nenhum autor fica gravado.
+    try:
+        with Sessao() as sessao:
+            livro.definir_autores(sessao.resolver_autores(nomes))
+            sessao.adicionar_livro(livro)
+    except sqlite3.Error as e:
+        print(f"Erro ao adicionar livro: {e}", file=sys.stderr)
+        return 1
+    print(livro.id_item, file=args.saida)
+    return 0
+
+
+def cmd_listar(args) -> int:
+    from itertools import islice
+    from .database import iterar_livros_resumo_bd
+    escrever = _escritor(args.formato, ("id_livro", "titulo", "autores", "isbn", "ano_publicacao"), args.saida)
+    for resumo in islice(iterar_livros_resumo_bd(args.lote), args.limite):
+        escrever(resumo)
+    return 0
+
+
+def cmd_buscar(args) -> int:
+    from .database import buscar_livros_bd
+    escrever = _escritor(args.formato, ("id_livro", "titulo", "autores", "trecho"), args.saida)
+    for livro, trecho in buscar_livros_bd(args.texto, limit=args.limite):
+        escrever((livro.id_item, livro.titulo, ", ".join(autor.nome for autor in livro.autores), trecho))
+    return 0
+
+
+def cmd_importar(args) -> int:
+    from .importacao import importar_csv_bd, importar_jsonl_bd
+    formato = args.formato or ("jsonl" if args.arquivo.lower().endswith((".jsonl", ".ndjson")) else "csv")
+    importar = importar_jsonl_bd if formato == "jsonl" else importar_csv_bd
+    relatorio = importar(args.arquivo, args.lote)
+    print(relatorio, file=sys.stderr)
+    for referencia, mensagem in relatorio.falhas:
+        print(f"  {referencia}: {mensagem}", file=sys.stderr)
+    return 1 if relatorio.falhas else 0
+
+
+def cmd_exportar(args) -> int:
+    import sqlite3
+    from .exportacao import exportar_emprestimos_bd, exportar_livros_bd, exportar_sql_bd
+    destino = args.saida if args.arquivo in (None, "-") else args.arquivo
+    try:
+        if args.formato == "sql":
+            relatorio = exportar_sql_bd(destino, desde=args.desde)
+        elif args.tabela == "emprestimos":
+            relatorio = exportar_emprestimos_bd(destino, args.formato, desde=args.desde)
+        else:
+            relatorio = exportar_livros_bd(destino, args.formato, desde=args.desde)
+    except sqlite3.Error as e:
+        print(f"Erro ao exportar: {e}", file=sys.stderr)
+        return 1
+    # A marca é o valor de --desde para a próxima exportação incremental.
+    print(relatorio, file=sys.stderr)
+    return 0
+
+
+COLUNAS_EMPRESTIMO = ("id_emprestimo", "id_livro", "titulo", "nome_usuario", "data_emprestimo",
+                      "data_devolucao_prevista", "data_devolucao_efetiva")
+
+
+def cmd_emprestimo_novo(args) -> int:
+    from datetime import date, timedelta
+    from .database import adicionar_emprestimo_bd, buscar_livro_por_id_bd
+    from .models import Emprestimo
+    livro = buscar_livro_por_id_bd(args.id_livro)
+    if livro is None:
+        print(f"Livro não encontrado: {args.id_livro}", file=sys.stderr)
+        return 1
+    hoje = date.today()
+    emprestimo = Emprestimo(livro, args.usuario, hoje, hoje + timedelta(days=args.dias))
+    if not adicionar_emprestimo_bd(emprestimo):
+        return 1
+    print(emprestimo.id_emprestimo, file=args.saida)
+    return 0
+
+
+def cmd_emprestimo_devolver(args) -> int:
+    from datetime import date
+    from .database import atualizar_emprestimo_bd, buscar_emprestimo_por_id_bd
+    emprestimo = buscar_emprestimo_por_id_bd(args.id_emprestimo)
+    if emprestimo is None:
+        print(f"Empréstimo não encontrado: {args.id_emprestimo}", file=sys.stderr)
+        return 1
+    if emprestimo.data_devolucao_efetiva is not None:
+        print(f"Empréstimo já devolvido em {emprestimo.data_devolucao_efetiva}.", file=sys.stderr)
+        return 1
+    emprestimo.registrar_devolucao(date.today())
+    return 0 if atualizar_emprestimo_bd(emprestimo) else 1
+
+
+def cmd_emprestimo_listar(args) -> int:
+    from .database import iterar_emprestimos_bd
+    emprestimos = iterar_emprestimos_bd(nome_usuario=args.usuario, id_livro=args.livro,
+                                        apenas_ativos=args.ativos, atrasados=args.atrasados)
+    escrever = _escritor(args.formato, COLUNAS_EMPRESTIMO, args.saida)
+    for e in emprestimos:
+        escrever((e.id_emprestimo, e.livro.id_item, e.livro.titulo, e.nome_usuario, e.data_emprestimo.isoformat(),
+                  e.data_devolucao_prevista.isoformat(),
+                  e.data_devolucao_efetiva.isoformat() if e.data_devolucao_efetiva else None))
+    return 0
+
+
+def cmd_estatisticas(args) -> int:
+    from . import estatisticas as est
+    if args.por == "editora":
+        colunas, linhas = ("editora", "livros"), est.listar_livros_por_editora_bd(args.limite)
+    elif args.por == "ano":
+        colunas, linhas = ("ano", "livros"), est.listar_livros_por_ano_bd()
+    elif args.por == "autor":
+        colunas, linhas = ("id_autor", "nome", "livros"), est.listar_livros_por_autor_bd(args.limite)
+    elif args.por == "livro":
+        colunas, linhas = ("id_livro", "titulo", "emprestimos"), est.listar_livros_mais_emprestados_bd(args.limite)
+    elif args.por == "mes":
+        meses = est.listar_emprestimos_por_mes_bd(args.limite)
+        colunas = ("mes", "emprestimos", "devolvidos", "duracao_media_dias", "giro")
+        linhas = [tuple(mes[coluna] for coluna in colunas) for mes in meses]
+    else:
+        from .database import obter_situacao_emprestimos_bd
+        valores = est.obter_resumo_bd()
+        valores["emprestimos_atrasados"] = obter_situacao_emprestimos_bd()["atrasados"]
+        colunas, linhas = tuple(valores), [tuple(valores.values())]
+    escrever = _escritor(args.formato, colunas, args.saida)
+    for linha in linhas:
+        escrever(linha)
+    return 0
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m package", description="Biblioteca pessoal pela linha de comando.")
+    comandos = parser.add_subparsers(dest="comando", required=True, metavar="COMANDO")
+
+    p = comandos.add_parser("adicionar", help="Cadastra um livro e imprime o ID gerado.")
+    p.add_argument("titulo")
+    p.add_argument("--autores", help="Nomes separados por ';' (autores novos são cadastrados).")
+    p.add_argument("--isbn")
+    p.add_argument("--ano", type=int)
+    p.add_argument("--editora", default="")
+    p.add_argument("--paginas", type=int, default=0)
+    p.add_argument("--sinopse", default="")
+    p.set_defaults(funcao=cmd_adicionar)
+
+    p = comandos.add_parser("listar", help="Lista os livros em ordem de título.")
+    p.add_argument("--formato", choices=FORMATOS_LISTAGEM, default="tsv")
+    p.add_argument("--limite", type=int, help="Quantidade máxima de livros.")
+    p.add_argument("--lote", type=int, default=500, help=argparse.SUPPRESS)
+    p.set_defaults(funcao=cmd_listar)
+
+    p = comandos.add_parser("buscar", help="Busca textual em título, sinopse, editora e autores.")
+    p.add_argument("texto")
+    p.add_argument("--formato", choices=FORMATOS_LISTAGEM, default="tsv")
+    p.add_argument("--limite", type=int, default=20)
+    p.set_defaults(funcao=cmd_buscar)
+
+    p = comandos.add_parser("importar", help="Importa livros de um arquivo CSV ou JSON Lines.")
+    p.add_argument("arquivo")
+    p.add_argument("--formato", choices=FORMATOS_EXPORTACAO, help="Padrão: pela extensão do arquivo.")
+    p.add_argument("--lote", type=int, default=1000)
+    p.set_defaults(funcao=cmd_importar)
+
+    p = comandos.add_parser("exportar", help="Exporta livros (no formato lido por 'importar'), empréstimos ou um dump SQL.")
+    p.add_argument("arquivo", nargs="?", help="Arquivo de saída ('-' ou omitido: saída padrão).")
+    p.add_argument("--formato", choices=FORMATOS_EXPORTACAO + ("sql",), default="csv")
+    p.add_argument("--tabela", choices=("livros", "emprestimos"), default="livros",
+                   help="O que exportar em csv/jsonl (o dump SQL inclui tudo).")
+    p.add_argument("--desde", type=int, metavar="MARCA",
+                   help="Só o que mudou depois da marca informada por uma exportação anterior.")
+    p.set_defaults(funcao=cmd_exportar)
+
+    p = comandos.add_parser("emprestimo", help="Registra, devolve e lista empréstimos.")
+    acoes = p.add_subparsers(dest="acao", required=True, metavar="ACAO")
+    a = acoes.add_parser("novo", help="Empresta um livro e imprime o ID do empréstimo.")
+    a.add_argument("id_livro")
+    a.add_argument("usuario")
+    a.add_argument("--dias", type=int, default=14, help="Prazo de devolução (padrão: 14 dias).")
+    a.set_defaults(funcao=cmd_emprestimo_novo)
+    a = acoes.add_parser("devolver", help="Registra a devolução com a data de hoje.")
+    a.add_argument("id_emprestimo")
+    a.set_defaults(funcao=cmd_emprestimo_devolver)
+    a = acoes.add_parser("listar", help="Lista empréstimos (todos, por padrão).")
+    a.add_argument("--ativos", action="store_true", help="Só os ainda não devolvidos.")
+    a.add_argument("--atrasados", action="store_true", help="Só os em aberto com prazo vencido.")
+    a.add_argument("--usuario")
+    a.add_argument("--livro", metavar="ID_LIVRO")
+    a.add_argument("--formato", choices=FORMATOS_LISTAGEM, default="tsv")
+    a.set_defaults(funcao=cmd_emprestimo_listar)
+
+    p = comandos.add_parser("estatisticas", help="Totais de livros e empréstimos, ou contagens por grupo.")
+    p.add_argument("--por", choices=("editora", "ano", "autor", "livro", "mes"),
+                   help="Livros por editora, ano ou autor; empréstimos por livro ou por mês.")
+    p.add_argument("--limite", type=int, default=20, help="Quantidade máxima de grupos (padrão: 20).")
+    p.add_argument("--formato", choices=FORMATOS_LISTAGEM, default="tsv")
+    p.set_defaults(funcao=cmd_estatisticas)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = criar_parser().parse_args(argv)
+    # Os dados vão para ``args.saida``; o que as funções *_bd e os modelos imprimem
+    # (erros, avisos) vai para stderr, sem se misturar a um TSV ou CSV.
+    args.saida = sys.stdout
+    with redirect_stdout(sys.stderr):
+        _preparar_banco()
+        try:
+            return args.funcao(args)
+        except BrokenPipeError:
+            # A saída foi fechada antes do fim (ex.: "| head"); não é um erro do comando.
+            import os
+            os.dup2(os.open(os.devnull, os.O_WRONLY), args.saida.fileno())
+            return 0
@@ -0,0 +1,229 @@
+import sqlite3
+import os
+import random
+import threading
+import time
+import atexit
+from contextlib import contextmanager
+
+DATABASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DATABASE_NAME = 'biblioteca.db'
+DATABASE_PATH = os.path.join(DATABASE_DIR, DATABASE_NAME)
+
+# Permite apontar para outro arquivo (testes, benchmarks) sem tocar em data/biblioteca.db.
+VARIAVEL_CAMINHO = "BIBLIOTECA_BD"
+
+VARIAVEL_PERFIL = "BIBLIOTECA_PERFIL_BD"
+
+
+class PerfilConcorrencia:
+    """Configuração de concorrência e durabilidade aplicada a cada conexão aberta.
+
+    Com ``journal_mode='WAL'`` leitores não bloqueiam o escritor nem são
+    bloqueados por ele. ``busy_timeout_ms`` é a espera do próprio SQLite por um
+    bloqueio; além dela, BEGIN e COMMIT são repetidos até ``tentativas`` vezes,
+    com espera exponencial entre ``espera_inicial`` e ``espera_maxima`` segundos.
+
+    ``temp_store`` fica no padrão do SQLite: com MEMORY o diário de instrução
+    (aberto para cada linha gravada em tabela com gatilhos dentro de um
+    SAVEPOINT, como nos lotes da importação) fica só na memória e cada lote
+    ficava mais lento que o anterior.
+    """
+
+    def __init__(self, nome: str, journal_mode: str = "WAL", synchronous: str = "NORMAL",
+                 busy_timeout_ms: int = 5000, cache_size: int = -16000, foreign_keys: bool = True,
+                 temp_store: str = "DEFAULT", tentativas: int = 5, espera_inicial: float = 0.05,
+                 espera_maxima: float = 1.0):
+        self.nome = nome
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size = cache_size  # valores negativos são em KiB
+        self.foreign_keys = foreign_keys
+        self.temp_store = temp_store
+        self.tentativas = tentativas
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+
+    def pragmas(self) -> dict:
+        """PRAGMAs na ordem em que são aplicados (busy_timeout primeiro: trocar o journal pode esperar bloqueio)."""
+        return {
+            "busy_timeout": self.busy_timeout_ms,
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "cache_size": self.cache_size,
+            "temp_store": self.temp_store,
+            "foreign_keys": "ON" if self.foreign_keys else "OFF",
+        }
+
+    def __repr__(self) -> str:
+        return f"PerfilConcorrencia({self.nome!r}, journal_mode={self.journal_mode!r}, synchronous={self.synchronous!r})"
+
+
+PERFIS = {
+    # Uma instalação local: a interface e scripts ocasionais no mesmo computador.
+    "padrao": PerfilConcorrencia("padrao"),
+    # Interface aberta enquanto importações e relatórios rodam em outros processos.
+    "multiprocesso": PerfilConcorrencia("multiprocesso", busy_timeout_ms=15000, tentativas=8,
+                                        espera_maxima=2.0),
+    # Cada commit sincronizado no disco; mais lento, sobrevive a queda de energia.
+    "seguro": PerfilConcorrencia("seguro", synchronous="FULL", busy_timeout_ms=10000),
+    # Arquivo em pasta de rede, onde WAL não funciona (exige memória compartilhada).
+    "rede": PerfilConcorrencia("rede", journal_mode="DELETE", synchronous="FULL",
+                               busy_timeout_ms=15000, tentativas=8, espera_maxima=2.0),
+}
+
+
+def obter_perfil(nome: str | None = None) -> PerfilConcorrencia:
+    """Perfil pelo nome; sem nome, usa a variável de ambiente BIBLIOTECA_PERFIL_BD (ou 'padrao')."""
+    nome = nome or os.environ.get(VARIAVEL_PERFIL) or "padrao"
+    try:
+        return PERFIS[nome]
+    except KeyError:
+        raise ValueError(f"Perfil de banco desconhecido: '{nome}'. Opções: {', '.join(PERFIS)}.")
+
+
+def _ocupado(erro: sqlite3.Error) -> bool:
+    mensagem = str(erro).lower()
+    return isinstance(erro, sqlite3.OperationalError) and ("locked" in mensagem or "busy" in mensagem)
+
+
+class GerenciadorConexoes:
+    """Mantém uma conexão SQLite aberta por thread e a reutiliza entre as chamadas.
+
+    As conexões são abertas em modo autocommit (``isolation_level=None``);
+    transações são controladas explicitamente por ``transacao()``, que pode ser
+    aninhada (os níveis internos viram SAVEPOINTs). Cada conexão recebe as
+    configurações do PerfilConcorrencia do gerenciador.
+    """
+
+    def __init__(self, caminho: str | None = None, perfil: PerfilConcorrencia | None = None):
+        self.caminho = caminho or os.environ.get(VARIAVEL_CAMINHO) or DATABASE_PATH
+        self.perfil = perfil or obter_perfil()
+        # Classe das conexões abertas; a instrumentação troca por uma que conta consultas.
+        self.fabrica_conexao = sqlite3.Connection
+        self._local = threading.local()
+        self._conexoes: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _abrir(self) -> sqlite3.Connection:
+        # A pasta é criada só na primeira conexão, não ao importar o módulo.
+        pasta = os.path.dirname(self.caminho)
+        if pasta and not os.path.isdir(pasta):
+            os.makedirs(pasta, exist_ok=True)
+        conn = sqlite3.connect(self.caminho, isolation_level=None, check_same_thread=False,
+                               factory=self.fabrica_conexao)
+        conn.row_factory = sqlite3.Row
+        for nome, valor in self.perfil.pragmas().items():
+            if nome == "journal_mode":
+                self._repetir_se_ocupado(conn.execute, f"PRAGMA {nome} = {valor}")
+            else:
+                conn.execute(f"PRAGMA {nome} = {valor}")
+        with self._lock:
+            self._conexoes.append(conn)
+        return conn
+
+    def definir_caminho(self, caminho: str):
+        """Passa a usar outro arquivo de banco, fechando as conexões abertas para o anterior."""
+        self.fechar_todas()
+        self.caminho = caminho
+
+    def definir_perfil(self, perfil: PerfilConcorrencia | str):
+        """Troca o perfil. Vale para as conexões abertas depois; chame antes de usar o banco."""
+        self.perfil = obter_perfil(perfil) if isinstance(perfil, str) else perfil
+
+    def _repetir_se_ocupado(self, funcao, *args):
+        """Chama ``funcao`` repetindo, com espera exponencial, enquanto o banco estiver bloqueado."""
+        perfil = self.perfil
+        for tentativa in range(perfil.tentativas):
+            try:
+                return funcao(*args)
+            except sqlite3.OperationalError as e:
+                if not _ocupado(e) or tentativa == perfil.tentativas - 1:
+                    raise
+                espera = min(perfil.espera_maxima, perfil.espera_inicial * 2 ** tentativa)
+                time.sleep(espera * random.uniform(0.5, 1.0))
+
+    def obter_conexao(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, abrindo-a na primeira chamada."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._abrir()
+            self._local.conn = conn
+            self._local.profundidade = 0
+        return conn
+
+    @contextmanager
+    def conexao(self):
+        """Fornece a conexão da thread atual, sem abrir transação."""
+        yield self.obter_conexao()
+
+    @contextmanager
+    def transacao(self, imediata: bool = True):
+        """Abre uma transação (ou um SAVEPOINT, se já houver uma) e fornece um cursor.
+
+        Confirma ao sair normalmente e desfaz se uma exceção escapar do bloco.
+        Por padrão o bloqueio de escrita é reservado já no BEGIN (BEGIN IMMEDIATE):
+        em WAL, uma transação adiada que lê e depois tenta escrever falha com
+        SQLITE_BUSY sem esperar pelo busy_timeout. ``imediata=False`` serve para
+        transações só de leitura.
+        """
+        conn = self.obter_conexao()
+        profundidade = self._local.profundidade
+        savepoint = f"sp_{profundidade}"
+        if profundidade == 0:
+            self._repetir_se_ocupado(conn.execute, "BEGIN IMMEDIATE" if imediata else "BEGIN")
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+        self._local.profundidade = profundidade + 1
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        except BaseException:
+            if profundidade == 0:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            try:
+                if profundidade == 0:
+                    self._repetir_se_ocupado(conn.commit)
+                else:
+                    conn.execute(f"RELEASE {savepoint}")
+            except sqlite3.Error:
+                if profundidade == 0:
+                    conn.rollback()
+                else:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+                raise
+        finally:
+            self._local.profundidade = profundidade
+            cursor.close()
+
+    def fechar_conexao_thread(self):
+        """Fecha a conexão da thread atual (se houver)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                if conn in self._conexoes:
+                    self._conexoes.remove(conn)
+            conn.close()
+
+    def fechar_todas(self):
+        """Fecha todas as conexões abertas por este gerenciador."""
+        with self._lock:
+            conexoes, self._conexoes = self._conexoes, []
+        for conn in conexoes:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
+gerenciador_conexoes = GerenciadorConexoes()
+atexit.register(gerenciador_conexoes.fechar_todas)
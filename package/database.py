@@ -1,349 +1,867 @@
 import sqlite3
-import os
-from datetime import date, datetime
-from .models import Autor, Livro, Emprestimo
+import json
+import re
+import base64
+from typing import Iterator
+from datetime import date
+from .models import Autor, Livro, LivroResumo, Emprestimo
+from .conexao import DATABASE_DIR, DATABASE_NAME, DATABASE_PATH, gerenciador_conexoes
+from .migracoes import aplicar_migracoes, reconstruir_indice_busca, SQL_ISBN_COMPACTO, VERSAO_ATUAL
+from .cache import CacheLRU
+from .instrumentacao import instrumentar
+from .datas import para_dia, de_dia, SQL_DIA_HOJE
 
-DATABASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
-DATABASE_NAME = 'biblioteca.db'
-DATABASE_PATH = os.path.join(DATABASE_DIR, DATABASE_NAME)
+TAMANHO_CACHE_AUTORES = 5000
+TAMANHO_CACHE_LIVROS = 1000
 
-os.makedirs(DATABASE_DIR, exist_ok=True)
+# Mapas de identidade/caches das leituras por ID. Toda função que grava um autor
+# ou livro invalida as entradas correspondentes.
+cache_autores = CacheLRU(TAMANHO_CACHE_AUTORES)
+cache_livros = CacheLRU(TAMANHO_CACHE_LIVROS)
 
+@instrumentar
 def conectar_bd():
-    """Conecta ao banco de Dados SQLite e retorna a conexão e o cursor."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+    """Retorna a conexão reutilizável da thread atual e um novo cursor."""
+    conn = gerenciador_conexoes.obter_conexao()
     cursor = conn.cursor()
     return conn, cursor
 
+@instrumentar
 def fechar_bd(conn):
-    """Fecha a conexão com o banco de dados."""
-    if conn:
+    """Confirma alterações pendentes. A conexão continua aberta para reuso."""
+    if conn and conn.in_transaction:
         conn.commit()
-        conn.close()
 
-def inicializar_bd():
-    """Cria as tabelas no banco de dados se elas não existirem."""
-    conn, cursor = conectar_bd()
+def configurar_cache(tamanho_autores: int | None = None, tamanho_livros: int | None = None):
+    """Redimensiona os caches de autores e livros (0 desativa o cache)."""
+    if tamanho_autores is not None:
+        cache_autores.redimensionar(tamanho_autores)
+    if tamanho_livros is not None:
+        cache_livros.redimensionar(tamanho_livros)
+
+def obter_estatisticas_cache() -> dict:
+    return {"autores": cache_autores.estatisticas(), "livros": cache_livros.estatisticas()}
+
+def limpar_cache():
+    cache_autores.limpar()
+    cache_livros.limpar()
+
+@instrumentar
+def inicializar_bd(progresso=None):
+    """Cria ou atualiza o esquema do banco aplicando as migrações pendentes."""
     try:
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS autores (
-                id_autor TEXT PRIMARY KEY,
-                nome TEXT NOT NULL,
-                data_nascimento TEXT, -- Armazenar como YYYY-MM-DD
-                biografia TEXT
-            )
-        ''')
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS livros (
-                id_livro TEXT PRIMARY KEY, -- id_item da classe base ItemBiblioteca
-                titulo TEXT NOT NULL,
-                ano_publicacao INTEGER,
-                isbn TEXT UNIQUE, -- ISBN deve ser único
-                editora TEXT,
-                numero_paginas INTEGER,
-                sinopse TEXT
-            )
-        ''')
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS livros_autores (
-                livro_id TEXT NOT NULL,
-                autor_id TEXT NOT NULL,
-                FOREIGN KEY (livro_id) REFERENCES livros (id_livro) ON DELETE CASCADE,
-                FOREIGN KEY (autor_id) REFERENCES autores (id_autor) ON DELETE CASCADE,
-                PRIMARY KEY (livro_id, autor_id)
-            )
-        ''')
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS emprestimos (
-                id_emprestimo TEXT PRIMARY KEY,
-                livro_id TEXT NOT NULL,
-                nome_usuario TEXT NOT NULL,
-                data_emprestimo TEXT NOT NULL, -- Armazenar como YYYY-MM-DD
-                data_devolucao_prevista TEXT NOT NULL, -- Armazenar como YYYY-MM-DD
-                data_devolucao_efetiva TEXT, -- Armazenar como YYYY-MM-DD
-                FOREIGN KEY (livro_id) REFERENCES livros (id_livro) ON DELETE CASCADE
-            )
-        ''')
-        print("Banco de dados inicializado e tabelas criadas (se não existiam).")
+        aplicadas = aplicar_migracoes(progresso=progresso)
+        if aplicadas:
+            print(f"Banco de dados inicializado (esquema na versão {VERSAO_ATUAL}).")
+        else:
+            print("Banco de dados já está na versão mais recente do esquema.")
     except sqlite3.Error as e:
         print(f"Erro ao inicializar o banco de dados: {e}")
-    finally:
-        fechar_bd(conn)
 
+def _autor_de_row(autor_row) -> Autor:
+    return Autor.de_linha_bd(
+        autor_row['id_autor'],
+        autor_row['nome'],
+        de_dia(autor_row['data_nascimento']),
+        autor_row['biografia']
+    )
+
+def _livro_de_row(livro_row, autores: list[Autor]) -> Livro:
+    return Livro.de_linha_bd(
+        livro_row['id_livro'],
+        livro_row['titulo'],
+        livro_row['ano_publicacao'],
+        livro_row['isbn'],
+        livro_row['editora'],
+        livro_row['numero_paginas'],
+        livro_row['sinopse'],
+        autores
+    )
+
+def _carregar_autores_por_livro(conn, ids_livros: list[str] | None = None) -> dict[str, list[Autor]]:
+    """Busca em duas consultas os autores de vários livros: vínculos e autores.
+
+    Com ``ids_livros=None`` carrega os vínculos de todo o acervo. Cada autor é
+    instanciado uma única vez e compartilhado entre todos os livros em que aparece.
+    """
+    filtro = ""
+    params = ()
+    if ids_livros is not None:
+        filtro = " WHERE livro_id IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(ids_livros),)
+
+    cursor = conn.execute("SELECT livro_id, autor_id FROM livros_autores" + filtro + " ORDER BY rowid", params)
+    cursor.row_factory = None
+    vinculos = cursor.fetchall()
+    if not vinculos:
+        return {}
+
+    autores_por_id: dict[str, Autor] = {}
+    ids_faltando = []
+    for id_autor in {id_autor for _, id_autor in vinculos}:
+        autor = cache_autores.espiar(id_autor)
+        if autor is None:
+            ids_faltando.append(id_autor)
+        else:
+            autores_por_id[id_autor] = autor
+    if ids_faltando:
+        for row in conn.execute(
+            "SELECT * FROM autores WHERE id_autor IN (SELECT value FROM json_each(?))",
+            (json.dumps(ids_faltando),)
+        ):
+            autores_por_id[row['id_autor']] = _autor_de_row(row)
+
+    autores_por_livro: dict[str, list[Autor]] = {}
+    for livro_id, id_autor in vinculos:
+        autor = autores_por_id.get(id_autor)
+        if autor is not None:
+            autores_por_livro.setdefault(livro_id, []).append(autor)
+    return autores_por_livro
+
+def _carregar_livros(conn, livros_db: list, todos: bool = False) -> list[Livro]:
+    """Monta os objetos Livro para as linhas dadas com uma consulta extra para os autores."""
+    if not livros_db:
+        return []
+    ids_livros = None if todos else [livro_row['id_livro'] for livro_row in livros_db]
+    autores_por_livro = _carregar_autores_por_livro(conn, ids_livros)
+    return [_livro_de_row(livro_row, autores_por_livro.get(livro_row['id_livro'], []))
+            for livro_row in livros_db]
+
+def _buscar_livros_por_ids(conn, ids_livros) -> dict[str, Livro]:
+    """Carrega em lote os livros dos IDs informados, indexados por id_livro."""
+    ids_livros = list(ids_livros)
+    if not ids_livros:
+        return {}
+    livros_db = conn.execute(
+        "SELECT * FROM livros WHERE id_livro IN (SELECT value FROM json_each(?))",
+        (json.dumps(ids_livros),)
+    ).fetchall()
+    return {livro.id_item: livro for livro in _carregar_livros(conn, livros_db)}
+
+def _inserir_autores(cursor, autores: list[Autor], ignorar_existentes: bool = True) -> int:
+    """Grava os autores que ainda não existem (pelo id_autor), em um único executemany.
+
+    Sem ``ignorar_existentes``, um id_autor já gravado é erro (sqlite3.IntegrityError).
+    Retorna quantos foram de fato gravados.
+    """
+    if not autores:
+        return 0
+    cursor.executemany(f'''
+        INSERT {"OR IGNORE " if ignorar_existentes else ""}INTO autores
+            (id_autor, nome, nome_normalizado, data_nascimento, biografia)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [_linha_autor(autor) for autor in autores])
+    return cursor.rowcount
+
+@instrumentar
 def adicionar_autor_bd(autor: Autor):
-    conn, cursor = conectar_bd()
+    cache_autores.invalidar(autor.id_autor)
     try:
-        data_nasc_str = autor.data_nascimento.isoformat() if autor.data_nascimento else None
-        cursor.execute('''
-            INSERT INTO autores (id_autor, nome, data_nascimento, biografia)
-            VALUES (?, ?, ?, ?)
-        ''', (autor.id_autor, autor.nome, data_nasc_str, autor.biografia))
+        with gerenciador_conexoes.transacao() as cursor:
+            _inserir_autores(cursor, [autor], ignorar_existentes=False)
     except sqlite3.Error as e:
         print(f"Erro ao adicionar autor: {e}")
         return False
-    finally:
-        fechar_bd(conn)
     return True
 
+def _linha_autor(autor: Autor) -> tuple:
+    return (autor.id_autor, autor.nome, Autor.normalizar_nome(autor.nome),
+            para_dia(autor.data_nascimento), autor.biografia)
+
+def _resolver_autores(cursor, nomes: list[str], inserir: bool = True) -> tuple[list[Autor], list[Autor]]:
+    """Resolve nomes de autores para objetos Autor dentro da transação de ``cursor``.
+
+    A busca é feita pelo nome normalizado (ver Autor.normalizar_nome), em uma
+    consulta indexada só com os nomes pedidos; os que não existem são criados
+    com um único executemany (ou só instanciados, com ``inserir=False``). Nomes
+    repetidos resultam em um único autor, e a lista mantém a ordem da primeira
+    ocorrência de cada nome.
+
+    Retorna (autores resolvidos, autores novos).
+    """
+    pedidos: dict[str, str] = {}
+    for nome in nomes:
+        nome = " ".join(nome.split())
+        if nome:
+            pedidos.setdefault(Autor.normalizar_nome(nome), nome)
+    if not pedidos:
+        return [], []
+
+    encontrados: dict[str, Autor] = {}
+    cursor.execute(
+        "SELECT * FROM autores WHERE nome_normalizado IN (SELECT value FROM json_each(?)) ORDER BY rowid",
+        (json.dumps(list(pedidos)),)
+    )
+    for row in cursor.fetchall():
+        # Havendo homônimos já gravados, vale o mais antigo.
+        if row['nome_normalizado'] not in encontrados:
+            encontrados[row['nome_normalizado']] = cache_autores.espiar(row['id_autor']) or _autor_de_row(row)
+
+    novos = {chave: Autor(nome=nome) for chave, nome in pedidos.items() if chave not in encontrados}
+    if inserir:
+        _inserir_autores(cursor, list(novos.values()), ignorar_existentes=False)
+    encontrados.update(novos)
+    return [encontrados[chave] for chave in pedidos], list(novos.values())
+
+@instrumentar
+def resolver_autores_bd(nomes: list[str]) -> list[Autor]:
+    """Retorna os autores com os nomes dados (sem diferenciar maiúsculas), criando os que faltam."""
+    try:
+        with gerenciador_conexoes.transacao() as cursor:
+            return _resolver_autores(cursor, nomes)[0]
+    except sqlite3.Error as e:
+        print(f"Erro ao resolver autores: {e}")
+    return []
+
+@instrumentar
 def listar_autores_bd() -> list[Autor]:
-    conn, cursor = conectar_bd()
+    conn = gerenciador_conexoes.obter_conexao()
     autores_obj = []
     try:
-        cursor.execute("SELECT * FROM autores ORDER BY nome")
-        autores_db = cursor.fetchall()
-        for autor_row in autores_db:
-            data_nasc = datetime.strptime(autor_row['data_nascimento'], '%Y-%m-%d').date() if autor_row['data_nascimento'] else None
-            autores_obj.append(Autor(
-                id_autor=autor_row['id_autor'],
-                nome=autor_row['nome'],
-                data_nascimento=data_nasc,
-                biografia=autor_row['biografia']
-            ))
+        autores_db = conn.execute("SELECT * FROM autores ORDER BY nome").fetchall()
+        autores_obj = [cache_autores.espiar(autor_row['id_autor']) or _autor_de_row(autor_row)
+                       for autor_row in autores_db]
     except sqlite3.Error as e:
         print(f"Erro ao listar autores: {e}")
-    finally:
-        fechar_bd(conn)
     return autores_obj
 
+@instrumentar
 def buscar_autor_por_id_bd(id_autor: str) -> Autor | None:
-    conn, cursor = conectar_bd()
+    autor = cache_autores.obter(id_autor)
+    if autor is not None:
+        return autor
+    conn = gerenciador_conexoes.obter_conexao()
     try:
-        cursor.execute("SELECT * FROM autores WHERE id_autor = ?", (id_autor,))
-        autor_row = cursor.fetchone()
+        autor_row = conn.execute("SELECT * FROM autores WHERE id_autor = ?", (id_autor,)).fetchone()
         if autor_row:
-            data_nasc = datetime.strptime(autor_row['data_nascimento'], '%Y-%m-%d').date() if autor_row['data_nascimento'] else None
-            return Autor(
-                id_autor=autor_row['id_autor'],
-                nome=autor_row['nome'],
-                data_nascimento=data_nasc,
-                biografia=autor_row['biografia']
-            )
+            autor = _autor_de_row(autor_row)
+            cache_autores.guardar(id_autor, autor)
+            return autor
     except sqlite3.Error as e:
         print(f"Erro ao buscar autor: {e}")
-    finally:
-        fechar_bd(conn)
     return None
 
+def _inserir_vinculos(cursor, livro: Livro):
+    cursor.executemany('''
+        INSERT INTO livros_autores (livro_id, autor_id)
+        VALUES (?, ?)
+    ''', [(livro.id_item, autor.id_autor) for autor in livro.autores])
+
+def _inserir_livro(cursor, livro: Livro):
+    """Grava o livro, seus autores ainda não cadastrados e os vínculos, na transação de ``cursor``."""
+    cursor.execute('''
+        INSERT INTO livros (id_livro, titulo, ano_publicacao, isbn, editora, numero_paginas, sinopse)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (livro.id_item, livro.titulo, livro.ano_publicacao, livro.isbn,
+          livro.editora, livro.numero_paginas, livro.sinopse))
+    _inserir_autores(cursor, livro.autores)
+    _inserir_vinculos(cursor, livro)
+
+@instrumentar
 def adicionar_livro_bd(livro: Livro):
-    conn, cursor = conectar_bd()
+    cache_livros.invalidar(livro.id_item)
     try:
-        cursor.execute('''
-            INSERT INTO livros (id_livro, titulo, ano_publicacao, isbn, editora, numero_paginas, sinopse)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (livro.id_item, livro.titulo, livro.ano_publicacao, livro.isbn,
-              livro.editora, livro.numero_paginas, livro.sinopse))
-
-        for autor in livro.autores:
-            autor_existente = buscar_autor_por_id_bd(autor.id_autor)
-            if not autor_existente:
-                 adicionar_autor_bd(autor)
-
-            cursor.execute('''
-                INSERT INTO livros_autores (livro_id, autor_id)
-                VALUES (?, ?)
-            ''', (livro.id_item, autor.id_autor))
-        conn.commit()
+        with gerenciador_conexoes.transacao() as cursor:
+            _inserir_livro(cursor, livro)
+        livro.marcar_como_gravado()
         return True
     except sqlite3.Error as e:
         print(f"Erro ao adicionar livro: {e}")
-        conn.rollback()
         return False
-    finally:
-        fechar_bd(conn)
 
 
+@instrumentar
 def listar_livros_bd() -> list[Livro]:
-    conn, cursor = conectar_bd()
+    conn = gerenciador_conexoes.obter_conexao()
     livros_obj = []
     try:
-        cursor.execute("SELECT * FROM livros ORDER BY titulo")
-        livros_db = cursor.fetchall()
-        for livro_row in livros_db:
-            cursor.execute('''
-                SELECT a.* FROM autores a
-                JOIN livros_autores la ON a.id_autor = la.autor_id
-                WHERE la.livro_id = ?
-            ''', (livro_row['id_livro'],))
-            autores_do_livro_db = cursor.fetchall()
-            autores_do_livro_obj = []
-            for autor_row in autores_do_livro_db:
-                data_nasc = datetime.strptime(autor_row['data_nascimento'], '%Y-%m-%d').date() if autor_row['data_nascimento'] else None
-                autores_do_livro_obj.append(Autor(
-                    id_autor=autor_row['id_autor'],
-                    nome=autor_row['nome'],
-                    data_nascimento=data_nasc,
-                    biografia=autor_row['biografia']
-                ))
-            
-            livros_obj.append(Livro(
-                id_livro=livro_row['id_livro'],
-                titulo=livro_row['titulo'],
-                ano_publicacao=livro_row['ano_publicacao'],
-                isbn=livro_row['isbn'],
-                editora=livro_row['editora'],
-                numero_paginas=livro_row['numero_paginas'],
-                sinopse=livro_row['sinopse'],
-                autores=autores_do_livro_obj
-            ))
+        livros_db = conn.execute("SELECT * FROM livros ORDER BY titulo, id_livro").fetchall()
+        livros_obj = _carregar_livros(conn, livros_db, todos=True)
     except sqlite3.Error as e:
         print(f"Erro ao listar livros: {e}")
-    finally:
-        fechar_bd(conn)
     return livros_obj
 
+def _codificar_cursor_pagina(livro_row) -> str:
+    chave = json.dumps([livro_row['titulo'], livro_row['id_livro']])
+    return base64.urlsafe_b64encode(chave.encode('utf-8')).decode('ascii')
+
+def _decodificar_cursor_pagina(cursor_pagina: str) -> tuple[str, str]:
+    try:
+        titulo, id_livro = json.loads(base64.urlsafe_b64decode(cursor_pagina.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Cursor de página inválido: {cursor_pagina!r}") from e
+    return titulo, id_livro
+
+@instrumentar
+def listar_livros_pagina_bd(tamanho_pagina: int = 100, cursor_pagina: str | None = None) -> tuple[list[Livro], str | None]:
+    """Retorna uma página de livros ordenada por (titulo, id_livro) e o cursor da próxima.
+
+    A paginação é por chave: a próxima página começa logo após o último livro
+    devolvido, sem reler as anteriores. O cursor é None na última página.
+    """
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        if cursor_pagina is None:
+            livros_db = conn.execute(
+                "SELECT * FROM livros ORDER BY titulo, id_livro LIMIT ?",
+                (tamanho_pagina + 1,)
+            ).fetchall()
+        else:
+            livros_db = conn.execute(
+                "SELECT * FROM livros WHERE (titulo, id_livro) > (?, ?) ORDER BY titulo, id_livro LIMIT ?",
+                (*_decodificar_cursor_pagina(cursor_pagina), tamanho_pagina + 1)
+            ).fetchall()
+        proximo_cursor = None
+        if len(livros_db) > tamanho_pagina:
+            livros_db = livros_db[:tamanho_pagina]
+            proximo_cursor = _codificar_cursor_pagina(livros_db[-1])
+        return _carregar_livros(conn, livros_db), proximo_cursor
+    except sqlite3.Error as e:
+        print(f"Erro ao listar página de livros: {e}")
+    return [], None
+
+@instrumentar
+def iterar_livros_bd(tamanho_lote: int = 500) -> Iterator[Livro]:
+    """Percorre o acervo em ordem de título mantendo em memória apenas um lote por vez."""
+    cursor_pagina = None
+    while True:
+        livros, cursor_pagina = listar_livros_pagina_bd(tamanho_lote, cursor_pagina)
+        yield from livros
+        if cursor_pagina is None:
+            break
+
+def _marca_alteracoes(conn) -> int:
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM registro_alteracoes").fetchone()[0]
+
+@instrumentar
+def obter_marca_alteracoes_bd() -> int:
+    """Número da última alteração registrada (ver registro_alteracoes); 0 se não houver nenhuma."""
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        return _marca_alteracoes(conn)
+    except sqlite3.Error as e:
+        print(f"Erro ao obter a marca de alterações: {e}")
+    return 0
+
+def _versao_dados(conn) -> int:
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+@instrumentar
+def obter_versao_dados_bd() -> int:
+    """PRAGMA data_version da conexão desta thread.
+
+    Muda quando outra conexão (de outro processo ou thread) confirma uma gravação
+    no banco; as gravações feitas por esta conexão não o alteram. Não lê tabela
+    nenhuma, então pode ser consultado com frequência.
+    """
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        return _versao_dados(conn)
+    except sqlite3.Error as e:
+        print(f"Erro ao obter a versão dos dados: {e}")
+    return 0
+
+@instrumentar
+def listar_alteracoes_livros_bd(desde: int, limite: int = 500) -> tuple[int, int | None, list[tuple[str, LivroResumo | None]] | None]:
+    """Livros gravados depois da marca ``desde`` (ver ``obter_marca_alteracoes_bd``).
+
+    Retorna (marca atual, total de livros, alterações), com as alterações em ordem
+    como pares (id_livro, resumo), o resumo None se o livro foi removido. Sem
+    alterações, a lista é vazia e nada além da marca é lido: o total vem None.
+    Com mais de ``limite``, a lista é None: reler a tela sai mais barato que
+    aplicá-las. Em caso de erro, retorna (desde, None, None).
+    """
+    try:
+        # Marca, total e linhas do mesmo instante do banco.
+        with gerenciador_conexoes.transacao(imediata=False) as cursor:
+            marca = _marca_alteracoes(cursor)
+            if marca == desde:
+                return marca, None, []
+            total = cursor.execute("SELECT livros FROM estatisticas").fetchone()[0]
+            cursor.execute(f'''
+                SELECT r.chave, l.id_livro IS NOT NULL, {SQL_COLUNAS_RESUMO}
+                FROM registro_alteracoes r
+                LEFT JOIN livros l ON l.id_livro = r.chave
+                WHERE r.seq > ? AND r.tabela = 'livros'
+                ORDER BY r.seq
+                LIMIT ?
+            ''', (desde, limite + 1))
+            cursor.row_factory = None
+            rows = cursor.fetchall()
+        if len(rows) > limite:
+            return marca, total, None
+        return marca, total, [(row[0], LivroResumo._make(row[2:]) if row[1] else None) for row in rows]
+    except sqlite3.Error as e:
+        print(f"Erro ao listar alterações de livros: {e}")
+    return desde, None, None
+
+@instrumentar
+def contar_livros_bd() -> int:
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM livros").fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"Erro ao contar livros: {e}")
+    return 0
+
+@instrumentar
+def listar_livros_janela_bd(inicio: int, quantidade: int) -> list[Livro]:
+    """Retorna ``quantidade`` livros a partir da posição ``inicio`` na ordem (titulo, id_livro).
+
+    Usada pela lista virtual da interface, que precisa de acesso por posição. O
+    deslocamento é percorrido só no índice idx_livros_titulo (que já contém o
+    rowid); as linhas completas são lidas apenas para a janela pedida.
+    """
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        livros_db = conn.execute('''
+            SELECT * FROM livros WHERE rowid IN (
+                SELECT rowid FROM livros ORDER BY titulo, id_livro LIMIT ? OFFSET ?
+            )
+            ORDER BY titulo, id_livro
+        ''', (quantidade, inicio)).fetchall()
+        return _carregar_livros(conn, livros_db)
+    except sqlite3.Error as e:
+        print(f"Erro ao listar janela de livros: {e}")
+    return []
+
+# Colunas de LivroResumo; os nomes dos autores já vêm unidos na ordem dos vínculos.
+SQL_COLUNAS_RESUMO = '''
+           l.id_livro, l.titulo,
+           COALESCE((
+               SELECT group_concat(nome, ', ') FROM (
+                   SELECT a.nome FROM livros_autores la
+                   JOIN autores a ON a.id_autor = la.autor_id
+                   WHERE la.livro_id = l.id_livro
+                   ORDER BY la.rowid
+               )
+           ), '') AS autores,
+           l.isbn, l.ano_publicacao
+'''
+SQL_RESUMO_LIVROS = f'''
+    SELECT {SQL_COLUNAS_RESUMO}
+    FROM livros l
+'''
+
+@instrumentar
+def listar_livros_resumo_janela_bd(inicio: int, quantidade: int) -> list[LivroResumo]:
+    """Como ``listar_livros_janela_bd``, mas só com as colunas exibidas nas listas.
+
+    Não cria objetos Livro nem Autor: cada linha vira um LivroResumo (uma tupla).
+    """
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        cursor = conn.execute(SQL_RESUMO_LIVROS + '''
+            WHERE l.rowid IN (
+                SELECT rowid FROM livros ORDER BY titulo, id_livro LIMIT ? OFFSET ?
+            )
+            ORDER BY l.titulo, l.id_livro
+        ''', (quantidade, inicio))
+        cursor.row_factory = None
+        return [LivroResumo._make(row) for row in cursor]
+    except sqlite3.Error as e:
+        print(f"Erro ao listar janela de livros: {e}")
+    return []
+
+@instrumentar
+def iterar_livros_resumo_bd(tamanho_lote: int = 500) -> Iterator[LivroResumo]:
+    """Percorre todos os livros como LivroResumo, na ordem (titulo, id_livro)."""
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        cursor = conn.execute(SQL_RESUMO_LIVROS + "ORDER BY l.titulo, l.id_livro")
+        cursor.row_factory = None
+        while True:
+            rows = cursor.fetchmany(tamanho_lote)
+            if not rows:
+                break
+            yield from map(LivroResumo._make, rows)
+    except sqlite3.Error as e:
+        print(f"Erro ao listar livros: {e}")
+
+@instrumentar
+def obter_posicao_livro_bd(livro: Livro) -> int:
+    """Posição (a partir de 0) do livro na ordem (titulo, id_livro) da listagem."""
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        return conn.execute(
+            "SELECT COUNT(*) FROM livros WHERE (titulo, id_livro) < (?, ?)",
+            (livro.titulo, livro.id_item)
+        ).fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"Erro ao obter posição do livro: {e}")
+    return 0
+
+@instrumentar
 def buscar_livro_por_id_bd(id_livro: str) -> Livro | None:
-    conn, cursor = conectar_bd()
+    livro = cache_livros.obter(id_livro)
+    if livro is not None:
+        return livro
+    conn = gerenciador_conexoes.obter_conexao()
     try:
-        cursor.execute("SELECT * FROM livros WHERE id_livro = ?", (id_livro,))
-        livro_row = cursor.fetchone()
+        livro_row = conn.execute("SELECT * FROM livros WHERE id_livro = ?", (id_livro,)).fetchone()
         if livro_row:
-            cursor.execute('''
-                SELECT a.* FROM autores a
-                JOIN livros_autores la ON a.id_autor = la.autor_id
-                WHERE la.livro_id = ?
-            ''', (livro_row['id_livro'],))
-            autores_do_livro_db = cursor.fetchall()
-            autores_do_livro_obj = []
-            for autor_row in autores_do_livro_db:
-                data_nasc = datetime.strptime(autor_row['data_nascimento'], '%Y-%m-%d').date() if autor_row['data_nascimento'] else None
-                autores_do_livro_obj.append(Autor(
-                    id_autor=autor_row['id_autor'],
-                    nome=autor_row['nome'],
-                    data_nascimento=data_nasc,
-                    biografia=autor_row['biografia']
-                ))
-
-            return Livro(
-                id_livro=livro_row['id_livro'],
-                titulo=livro_row['titulo'],
-                ano_publicacao=livro_row['ano_publicacao'],
-                isbn=livro_row['isbn'],
-                editora=livro_row['editora'],
-                numero_paginas=livro_row['numero_paginas'],
-                sinopse=livro_row['sinopse'],
-                autores=autores_do_livro_obj
-            )
+            livro = _carregar_livros(conn, [livro_row])[0]
+            cache_livros.guardar(id_livro, livro)
+            return livro
     except sqlite3.Error as e:
         print(f"Erro ao buscar livro: {e}")
-    finally:
-        fechar_bd(conn)
     return None
 
+def _consulta_fts(texto: str, colunas: tuple[str, ...] = ()) -> str:
+    """Converte o texto digitado em uma consulta FTS5 segura: cada palavra vira um prefixo.
+
+    Com ``colunas``, a consulta só considera essas colunas de livros_fts.
+    """
+    termos = re.findall(r"\w+", texto)
+    consulta = " ".join(f'"{termo}"*' for termo in termos)
+    if consulta and colunas:
+        consulta = f"{{{' '.join(colunas)}}} : ({consulta})"
+    return consulta
+
+@instrumentar
+def buscar_livros_bd(query: str, limit: int = 20, offset: int = 0) -> list[tuple[Livro, str]]:
+    """Busca textual em título, sinopse, editora e nomes dos autores.
+
+    Retorna pares (livro, trecho) ordenados por relevância; no trecho os termos
+    encontrados aparecem entre colchetes.
+    """
+    consulta = _consulta_fts(query)
+    if not consulta:
+        return []
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        livros_db = conn.execute('''
+            SELECT l.*, snippet(livros_fts, -1, '[', ']', '…', 12) AS trecho
+            FROM livros_fts
+            JOIN livros l ON l.rowid = livros_fts.rowid
+            WHERE livros_fts MATCH ?
+            ORDER BY bm25(livros_fts, 10.0, 1.0, 2.0, 5.0)
+            LIMIT ? OFFSET ?
+        ''', (consulta, limit, offset)).fetchall()
+        livros = _carregar_livros(conn, livros_db)
+        return [(livro, livro_row['trecho']) for livro, livro_row in zip(livros, livros_db)]
+    except sqlite3.Error as e:
+        print(f"Erro ao buscar livros: {e}")
+    return []
+
+def _prefixo_isbn(texto: str) -> str | None:
+    """O texto como início de um ISBN (só dígitos e X), ou None se não puder sê-lo."""
+    compacto = re.sub(r"[\s-]", "", texto)
+    return compacto.upper() if re.fullmatch(r"\d+X?", compacto, re.IGNORECASE) else None
+
+@instrumentar
+def filtrar_livros_bd(texto: str) -> list[str]:
+    """IDs dos livros cujo título ou autores têm palavras começando com cada termo
+    digitado, ou cujo ISBN começa com o texto, na ordem (titulo, id_livro) da listagem.
+
+    Título e autores são procurados no índice de prefixos de livros_fts e o ISBN,
+    sem hífens nem espaços e com X maiúsculo dos dois lados, por faixa no índice
+    dessa forma compacta; só a lista de IDs é montada, e as linhas
+    exibidas são lidas depois, por janela (``listar_livros_resumo_por_ids_bd``).
+    """
+    consulta = _consulta_fts(texto, ('titulo', 'autores'))
+    isbn = _prefixo_isbn(texto)
+    partes, params = [], []
+    if consulta:
+        partes.append("SELECT rowid FROM livros_fts WHERE livros_fts MATCH ?")
+        params.append(consulta)
+    if isbn:
+        partes.append(f"SELECT rowid FROM livros WHERE {SQL_ISBN_COMPACTO} >= ? AND {SQL_ISBN_COMPACTO} < ?")
+        params += [isbn, isbn + "\uffff"]
+    if not partes:
+        return []
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        cursor = conn.execute(f'''
+            SELECT id_livro FROM livros
+            WHERE rowid IN ({" UNION ".join(partes)})
+            ORDER BY titulo, id_livro
+        ''', params)
+        cursor.row_factory = None
+        return [row[0] for row in cursor]
+    except sqlite3.OperationalError as e:
+        # Interrompida (ExecutorBD.cancelar) porque o usuário já digitou outra coisa.
+        if str(e) != "interrupted":
+            print(f"Erro ao filtrar livros: {e}")
+    except sqlite3.Error as e:
+        print(f"Erro ao filtrar livros: {e}")
+    return []
+
+@instrumentar
+def listar_livros_resumo_por_ids_bd(ids_livros: list[str]) -> list[LivroResumo]:
+    """LivroResumo dos livros pedidos, na ordem de ``ids_livros``; IDs removidos são omitidos."""
+    if not ids_livros:
+        return []
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        cursor = conn.execute(SQL_RESUMO_LIVROS + '''
+            JOIN json_each(?) j ON j.value = l.id_livro
+            ORDER BY j.key
+        ''', (json.dumps(ids_livros),))
+        cursor.row_factory = None
+        return [LivroResumo._make(row) for row in cursor]
+    except sqlite3.Error as e:
+        print(f"Erro ao listar livros: {e}")
+    return []
+
+@instrumentar
+def reconstruir_indice_busca_bd():
+    """Recria o índice de busca textual (use após um VACUUM)."""
+    try:
+        with gerenciador_conexoes.transacao() as cursor:
+            reconstruir_indice_busca(cursor)
+        return True
+    except sqlite3.Error as e:
+        print(f"Erro ao reconstruir o índice de busca: {e}")
+        return False
+
+def _remover_livro(cursor, id_livro: str):
+    cursor.execute("DELETE FROM livros WHERE id_livro = ?", (id_livro,))
+
+@instrumentar
 def remover_livro_bd(id_livro: str):
-    conn, cursor = conectar_bd()
+    cache_livros.invalidar(id_livro)
     try:
-        cursor.execute("DELETE FROM livros WHERE id_livro = ?", (id_livro,))
-        conn.commit()
+        with gerenciador_conexoes.transacao() as cursor:
+            _remover_livro(cursor, id_livro)
         return True
     except sqlite3.Error as e:
         print(f"Erro ao remover livro: {e}")
-        conn.rollback()
         return False
-    finally:
-        fechar_bd(conn)
-        
+
+# Campos de Livro gravados em colunas de mesmo nome na tabela livros.
+COLUNAS_LIVRO = ('titulo', 'ano_publicacao', 'isbn', 'editora', 'numero_paginas', 'sinopse')
+
+def _atualizar_livro(cursor, livro: Livro):
+    """Grava só o que mudou desde a leitura (ver Livro.campos_alterados).
+
+    Sem estado gravado conhecido (objeto criado fora do banco), regrava todas as
+    colunas e todos os vínculos com autores.
+    """
+    alterados = livro.campos_alterados
+    colunas = COLUNAS_LIVRO if alterados is None else [coluna for coluna in COLUNAS_LIVRO if coluna in alterados]
+    if colunas:
+        cursor.execute(
+            f"UPDATE livros SET {', '.join(f'{coluna} = ?' for coluna in colunas)} WHERE id_livro = ?",
+            [getattr(livro, coluna) for coluna in colunas] + [livro.id_item]
+        )
+    _atualizar_vinculos(cursor, livro)
+
+def _atualizar_vinculos(cursor, livro: Livro):
+    ids_gravados = livro.ids_autores_gravados
+    ids_atuais = [autor.id_autor for autor in livro.autores]
+    if ids_gravados is not None:
+        if list(ids_gravados) == ids_atuais:
+            return
+        removidos = set(ids_gravados) - set(ids_atuais)
+        novos = [autor for autor in livro.autores if autor.id_autor not in ids_gravados]
+        # Os vínculos são lidos na ordem de inserção (rowid): a diferença só basta
+        # se a ordem resultante for a desejada; senão, todos são regravados.
+        if [id_autor for id_autor in ids_gravados if id_autor not in removidos] + \
+                [autor.id_autor for autor in novos] == ids_atuais:
+            cursor.executemany(
+                "DELETE FROM livros_autores WHERE livro_id = ? AND autor_id = ?",
+                [(livro.id_item, id_autor) for id_autor in removidos]
+            )
+            _inserir_autores(cursor, novos)
+            cursor.executemany(
+                "INSERT INTO livros_autores (livro_id, autor_id) VALUES (?, ?)",
+                [(livro.id_item, autor.id_autor) for autor in novos]
+            )
+            return
+    cursor.execute("DELETE FROM livros_autores WHERE livro_id = ?", (livro.id_item,))
+    _inserir_autores(cursor, livro.autores)
+    _inserir_vinculos(cursor, livro)
+
+@instrumentar
 def atualizar_livro_bd(livro: Livro):
-    conn, cursor = conectar_bd()
+    """Grava as alterações do livro; não faz nada (e retorna True) se nada mudou."""
+    if not livro.possui_alteracoes():
+        return True
+    # O objeto pode ser a própria instância em cache, já alterada pelo chamador:
+    # invalida antes de gravar para que uma falha não deixe o cache divergente do banco.
+    cache_livros.invalidar(livro.id_item)
     try:
-        cursor.execute('''
-            UPDATE livros
-            SET titulo = ?, ano_publicacao = ?, isbn = ?, editora = ?, numero_paginas = ?, sinopse = ?
-            WHERE id_livro = ?
-        ''', (livro.titulo, livro.ano_publicacao, livro.isbn, livro.editora,
-              livro.numero_paginas, livro.sinopse, livro.id_item))
-
-        cursor.execute("DELETE FROM livros_autores WHERE livro_id = ?", (livro.id_item,))
-        for autor in livro.autores:
-            autor_existente = buscar_autor_por_id_bd(autor.id_autor)
-            if not autor_existente:
-                 adicionar_autor_bd(autor)
-
-            cursor.execute('''
-                INSERT INTO livros_autores (livro_id, autor_id)
-                VALUES (?, ?)
-            ''', (livro.id_item, autor.id_autor))
-        conn.commit()
+        with gerenciador_conexoes.transacao() as cursor:
+            _atualizar_livro(cursor, livro)
+        livro.marcar_como_gravado()
         return True
     except sqlite3.Error as e:
         print(f"Erro ao atualizar livro: {e}")
-        conn.rollback()
         return False
-    finally:
-        fechar_bd(conn)
 
+def _inserir_emprestimo(cursor, emprestimo: Emprestimo):
+    cursor.execute('''
+        INSERT INTO emprestimos (id_emprestimo, livro_id, nome_usuario, data_emprestimo, data_devolucao_prevista, data_devolucao_efetiva)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (emprestimo.id_emprestimo, emprestimo.livro.id_item, emprestimo.nome_usuario,
+          para_dia(emprestimo.data_emprestimo), para_dia(emprestimo.data_devolucao_prevista),
+          para_dia(emprestimo.data_devolucao_efetiva)))
+
+@instrumentar
 def adicionar_emprestimo_bd(emprestimo: Emprestimo):
-    conn, cursor = conectar_bd()
     try:
-        data_emp_str = emprestimo.data_emprestimo.isoformat()
-        data_dev_prev_str = emprestimo.data_devolucao_prevista.isoformat()
-        data_dev_efet_str = emprestimo.data_devolucao_efetiva.isoformat() if emprestimo.data_devolucao_efetiva else None
-
-        cursor.execute('''
-            INSERT INTO emprestimos (id_emprestimo, livro_id, nome_usuario, data_emprestimo, data_devolucao_prevista, data_devolucao_efetiva)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (emprestimo.id_emprestimo, emprestimo.livro.id_item, emprestimo.nome_usuario,
-              data_emp_str, data_dev_prev_str, data_dev_efet_str))
-        conn.commit()
+        with gerenciador_conexoes.transacao() as cursor:
+            _inserir_emprestimo(cursor, emprestimo)
         return True
     except sqlite3.Error as e:
         print(f"Erro ao adicionar empréstimo: {e}")
-        conn.rollback()
         return False
-    finally:
-        fechar_bd(conn)
 
-def listar_emprestimos_bd() -> list[Emprestimo]:
-    conn, cursor = conectar_bd()
-    emprestimos_obj = []
+def _sql_dia_referencia(data_referencia: date | None) -> tuple[str, tuple]:
+    """Expressão SQL (e parâmetros) do dia usado nas comparações de prazo: hoje, se não informado."""
+    if data_referencia is None:
+        return SQL_DIA_HOJE, ()
+    return "?", (para_dia(data_referencia),)
+
+def _iterar_emprestimos(filtro: str = "", params: tuple = (), ordem: str = "data_emprestimo DESC",
+                        tamanho_lote: int | None = None) -> Iterator[Emprestimo]:
+    """Empréstimos que atendem a ``filtro`` (cláusula WHERE), com os livros carregados em lote.
+
+    Sem ``tamanho_lote``, lê todas as linhas e busca os livros numa só consulta;
+    com ele, lê e produz ``tamanho_lote`` empréstimos por vez.
+    """
+    conn = gerenciador_conexoes.obter_conexao()
+    sem_livro = []
     try:
-        cursor.execute("SELECT * FROM emprestimos ORDER BY data_emprestimo DESC")
-        emprestimos_db = cursor.fetchall()
-        for emp_row in emprestimos_db:
-            livro_obj = buscar_livro_por_id_bd(emp_row['livro_id'])
-            if not livro_obj:
-                print(f"Aviso: Livro com ID {emp_row['livro_id']} não encontrado para o empréstimo {emp_row['id_emprestimo']}.")
-                continue
-
-            data_emp = datetime.strptime(emp_row['data_emprestimo'], '%Y-%m-%d').date()
-            data_dev_prev = datetime.strptime(emp_row['data_devolucao_prevista'], '%Y-%m-%d').date()
-            data_dev_efet = datetime.strptime(emp_row['data_devolucao_efetiva'], '%Y-%m-%d').date() if emp_row['data_devolucao_efetiva'] else None
-            
-            emprestimo = Emprestimo(
-                id_emprestimo=emp_row['id_emprestimo'],
-                livro=livro_obj,
-                nome_usuario=emp_row['nome_usuario'],
-                data_emprestimo=data_emp,
-                data_devolucao_prevista=data_dev_prev
-            )
-            if data_dev_efet:
-                emprestimo.registrar_devolucao(data_dev_efet)
+        cursor = conn.execute(f'''
+            SELECT id_emprestimo, livro_id, nome_usuario, data_emprestimo, data_devolucao_prevista, data_devolucao_efetiva
+            FROM emprestimos {f"WHERE {filtro}" if filtro else ""} ORDER BY {ordem}
+        ''', params)
+        cursor.row_factory = None
+        while True:
+            emprestimos_db = cursor.fetchmany(tamanho_lote) if tamanho_lote else cursor.fetchall()
+            if not emprestimos_db:
+                break
+            livros_por_id = _buscar_livros_por_ids(conn, {emp_row[1] for emp_row in emprestimos_db})
+
+            for id_emprestimo, livro_id, nome_usuario, data_emp, data_dev_prev, data_dev_efet in emprestimos_db:
+                livro_obj = livros_por_id.get(livro_id)
+                if not livro_obj:
+                    sem_livro.append(id_emprestimo)
+                    continue
 
-            emprestimos_obj.append(emprestimo)
-            
+                yield Emprestimo.de_linha_bd(
+                    id_emprestimo,
+                    livro_obj,
+                    nome_usuario,
+                    de_dia(data_emp),
+                    de_dia(data_dev_prev),
+                    de_dia(data_dev_efet)
+                )
+            if not tamanho_lote:
+                break
     except sqlite3.Error as e:
         print(f"Erro ao listar empréstimos: {e}")
-    finally:
-        fechar_bd(conn)
-    return emprestimos_obj
+    if sem_livro:
+        print(f"Aviso: {len(sem_livro)} empréstimo(s) referenciam livros não encontrados e foram ignorados: "
+              f"{', '.join(sem_livro[:10])}{' ...' if len(sem_livro) > 10 else ''}")
 
+def _listar_emprestimos(filtro: str = "", params: tuple = (), ordem: str = "data_emprestimo DESC") -> list[Emprestimo]:
+    """Carrega os empréstimos que atendem a ``filtro`` (cláusula WHERE), com os livros em lote."""
+    return list(_iterar_emprestimos(filtro, params, ordem))
+
+@instrumentar
+def iterar_emprestimos_bd(nome_usuario: str | None = None, id_livro: str | None = None, apenas_ativos: bool = False,
+                          atrasados: bool = False, tamanho_lote: int = 500) -> Iterator[Emprestimo]:
+    """Percorre os empréstimos sem carregá-los todos na memória, ``tamanho_lote`` por vez.
+
+    Os filtros dados se somam (ex.: os empréstimos atrasados de um usuário). A
+    ordem é a das funções listar_emprestimos_*_bd correspondentes: por prazo nos
+    em aberto e atrasados, do mais recente para o mais antigo nos demais casos.
+    """
+    condicoes, params = [], []
+    if nome_usuario is not None:
+        condicoes.append("nome_usuario = ?")
+        params.append(nome_usuario)
+    if id_livro is not None:
+        condicoes.append("livro_id = ?")
+        params.append(id_livro)
+    if apenas_ativos or atrasados:
+        condicoes.append("data_devolucao_efetiva IS NULL")
+    if atrasados:
+        dia, params_dia = _sql_dia_referencia(None)
+        condicoes.append(f"data_devolucao_prevista < {dia}")
+        params.extend(params_dia)
+    ordem = "data_emprestimo DESC"
+    if (apenas_ativos or atrasados) and nome_usuario is None and id_livro is None:
+        ordem = "data_devolucao_prevista, id_emprestimo"
+    yield from _iterar_emprestimos(" AND ".join(condicoes), tuple(params), ordem, tamanho_lote)
+
+@instrumentar
+def listar_emprestimos_bd() -> list[Emprestimo]:
+    return _listar_emprestimos()
+
+@instrumentar
+def listar_emprestimos_ativos_bd() -> list[Emprestimo]:
+    """Empréstimos ainda não devolvidos, do prazo mais antigo para o mais recente."""
+    # A condição literal "data_devolucao_efetiva IS NULL" permite usar o índice
+    # parcial idx_emprestimos_abertos, que só contém os empréstimos em aberto.
+    return _listar_emprestimos("data_devolucao_efetiva IS NULL", ordem="data_devolucao_prevista, id_emprestimo")
+
+@instrumentar
+def listar_emprestimos_atrasados_bd(data_referencia: date | None = None) -> list[Emprestimo]:
+    """Empréstimos em aberto cuja devolução prevista é anterior a ``data_referencia`` (hoje, por padrão)."""
+    dia, params = _sql_dia_referencia(data_referencia)
+    return _listar_emprestimos(
+        f"data_devolucao_efetiva IS NULL AND data_devolucao_prevista < {dia}", params,
+        ordem="data_devolucao_prevista, id_emprestimo"
+    )
+
+@instrumentar
+def listar_emprestimos_usuario_bd(nome_usuario: str, apenas_ativos: bool = False) -> list[Emprestimo]:
+    """Histórico de empréstimos de um usuário, do mais recente para o mais antigo."""
+    filtro = "nome_usuario = ?" + (" AND data_devolucao_efetiva IS NULL" if apenas_ativos else "")
+    return _listar_emprestimos(filtro, (nome_usuario,))
+
+@instrumentar
+def listar_emprestimos_livro_bd(id_livro: str, apenas_ativos: bool = False) -> list[Emprestimo]:
+    """Histórico de empréstimos de um livro, do mais recente para o mais antigo."""
+    filtro = "livro_id = ?" + (" AND data_devolucao_efetiva IS NULL" if apenas_ativos else "")
+    return _listar_emprestimos(filtro, (id_livro,))
+
+@instrumentar
+def buscar_emprestimo_por_id_bd(id_emprestimo: str) -> Emprestimo | None:
+    emprestimos = _listar_emprestimos("id_emprestimo = ?", (id_emprestimo,))
+    return emprestimos[0] if emprestimos else None
+
+def _atualizar_emprestimo(cursor, emprestimo: Emprestimo):
+    cursor.execute('''
+        UPDATE emprestimos
+        SET data_devolucao_efetiva = ?
+        WHERE id_emprestimo = ?
+    ''', (para_dia(emprestimo.data_devolucao_efetiva), emprestimo.id_emprestimo))
+
+@instrumentar
 def atualizar_emprestimo_bd(emprestimo: Emprestimo):
-    conn, cursor = conectar_bd()
     try:
-        data_dev_efet_str = emprestimo.data_devolucao_efetiva.isoformat() if emprestimo.data_devolucao_efetiva else None
-        cursor.execute('''
-            UPDATE emprestimos
-            SET data_devolucao_efetiva = ?
-            WHERE id_emprestimo = ?
-        ''', (data_dev_efet_str, emprestimo.id_emprestimo))
-        conn.commit()
+        with gerenciador_conexoes.transacao() as cursor:
+            _atualizar_emprestimo(cursor, emprestimo)
         return True
     except sqlite3.Error as e:
         print(f"Erro ao atualizar empréstimo: {e}")
-        conn.rollback()
         return False
-    finally:
-        fechar_bd(conn)
+
+@instrumentar
+def obter_situacao_emprestimos_bd(data_referencia: date | None = None) -> dict[str, int]:
+    """Contagens de empréstimos por situação.
+
+    Um empréstimo está atrasado se continua em aberto e a devolução prevista é
+    anterior a ``data_referencia`` (hoje, por padrão). Os atrasados dependem do
+    dia e são contados pelo índice parcial de empréstimos em aberto; os demais
+    totais vêm prontos da tabela estatisticas (ver package/estatisticas.py).
+    """
+    dia, params = _sql_dia_referencia(data_referencia)
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        row = conn.execute(f'''
+            SELECT (SELECT emprestimos_em_aberto FROM estatisticas) AS em_aberto,
+                   (SELECT COUNT(*) FROM emprestimos
+                    WHERE data_devolucao_efetiva IS NULL AND data_devolucao_prevista < {dia}) AS atrasados,
+                   (SELECT emprestimos_devolvidos FROM estatisticas) AS devolvidos,
+                   (SELECT devolvidos_com_atraso FROM estatisticas) AS devolvidos_com_atraso
+        ''', params).fetchone()
+        return dict(row)
+    except sqlite3.Error as e:
+        print(f"Erro ao obter situação dos empréstimos: {e}")
+    return {"em_aberto": 0, "atrasados": 0, "devolvidos": 0, "devolvidos_com_atraso": 0}
@@ -0,0 +1,37 @@
+from datetime import date
+from functools import lru_cache
+
+# As datas são gravadas como o número ordinal do dia (date.toordinal(): 1 = 0001-01-01).
+# Inteiros ocupam menos espaço que 'YYYY-MM-DD', comparam e indexam como números
+# e permitem calcular prazos e atrasos direto no SQL (diferença em dias = subtração).
+
+# julianday() de 0001-01-01 é 1721425.5; a diferença converte entre as duas escalas.
+_DESLOCAMENTO_JULIANO = 1721424.5
+
+# Expressão SQL que converte uma coluna de texto 'YYYY-MM-DD' no dia ordinal.
+SQL_DIA_DE_TEXTO = "CAST(julianday({coluna}) - " + str(_DESLOCAMENTO_JULIANO) + " AS INTEGER)"
+
+# Expressão SQL que converte um dia ordinal de volta para 'YYYY-MM-DD'.
+SQL_TEXTO_DE_DIA = "date({coluna} + " + str(_DESLOCAMENTO_JULIANO) + ")"
+
+# Dia ordinal de hoje (data local), calculado pelo próprio SQLite.
+SQL_DIA_HOJE = "CAST(julianday('now', 'localtime') - " + str(_DESLOCAMENTO_JULIANO) + " AS INTEGER)"
+
+
+def para_dia(data: date | None) -> int | None:
+    """Converte uma data para o valor gravado no banco."""
+    return data.toordinal() if data is not None else None
+
+
+@lru_cache(maxsize=8192)
+def _data_do_dia(dia: int) -> date:
+    return date.fromordinal(dia)
+
+
+def de_dia(dia: int | None) -> date | None:
+    """Converte o valor gravado no banco de volta para date.
+
+    As datas se repetem muito entre as linhas (vários empréstimos no mesmo dia);
+    os objetos date são imutáveis e por isso reaproveitados entre elas.
+    """
+    return _data_do_dia(dia) if dia is not None else None
@@ -0,0 +1,131 @@
+import sqlite3
+
+from .conexao import gerenciador_conexoes
+from .instrumentacao import instrumentar
+from .migracoes import CHAVES_ESTATISTICAS, recalcular_estatisticas
+
+# As contagens vêm das tabelas estatisticas_*, mantidas pelos gatilhos da
+# migração 10 na mesma transação de cada gravação: ler um total é ler uma
+# linha, e um ranking percorre só as linhas pedidas de um índice, qualquer
+# que seja o tamanho do acervo ou do histórico de empréstimos.
+
+
+def _razao(numerador: int, denominador: int) -> float | None:
+    return numerador / denominador if denominador else None
+
+
+@instrumentar
+def obter_resumo_bd() -> dict:
+    """Totais de livros, autores e empréstimos, com a duração média e o giro.
+
+    ``duracao_media_dias`` considera só os empréstimos devolvidos; ``giro`` é o
+    número de empréstimos por livro do acervo. Ambos são None sem dados.
+    """
+    resumo = dict.fromkeys(CHAVES_ESTATISTICAS, 0)
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        row = conn.execute(f"SELECT {', '.join(CHAVES_ESTATISTICAS)} FROM estatisticas").fetchone()
+        if row is not None:
+            resumo.update(dict(row))
+    except sqlite3.Error as e:
+        print(f"Erro ao obter o resumo das estatísticas: {e}")
+    resumo["duracao_media_dias"] = _razao(resumo["dias_emprestados"], resumo["emprestimos_devolvidos"])
+    resumo["giro"] = _razao(resumo["emprestimos"], resumo["livros"])
+    return resumo
+
+
+@instrumentar
+def listar_livros_por_editora_bd(limite: int | None = 20) -> list[tuple[str, int]]:
+    """(editora, livros), das editoras com mais livros para as com menos. '' reúne os sem editora."""
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        return [tuple(row) for row in conn.execute(
+            "SELECT editora, livros FROM estatisticas_editoras ORDER BY livros DESC LIMIT ?",
+            (-1 if limite is None else limite,))]
+    except sqlite3.Error as e:
+        print(f"Erro ao listar livros por editora: {e}")
+    return []
+
+
+@instrumentar
+def listar_livros_por_ano_bd() -> list[tuple[int | None, int]]:
+    """(ano, livros) em ordem de ano; None reúne os livros sem ano de publicação."""
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        return [(row['ano'] or None, row['livros'])
+                for row in conn.execute("SELECT ano, livros FROM estatisticas_anos ORDER BY ano")]
+    except sqlite3.Error as e:
+        print(f"Erro ao listar livros por ano: {e}")
+    return []
+
+
+@instrumentar
+def listar_livros_por_autor_bd(limite: int | None = 20) -> list[tuple[str, str, int]]:
+    """(id_autor, nome, livros), dos autores com mais livros para os com menos."""
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        return [tuple(row) for row in conn.execute('''
+            SELECT s.autor_id, a.nome, s.livros
+            FROM estatisticas_autores s
+            JOIN autores a ON a.id_autor = s.autor_id
+            ORDER BY s.livros DESC
+            LIMIT ?
+        ''', (-1 if limite is None else limite,))]
+    except sqlite3.Error as e:
+        print(f"Erro ao listar livros por autor: {e}")
+    return []
+
+
+@instrumentar
+def listar_livros_mais_emprestados_bd(limite: int = 10) -> list[tuple[str, str, int]]:
+    """(id_livro, titulo, empréstimos) dos livros mais emprestados."""
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        return [tuple(row) for row in conn.execute('''
+            SELECT s.livro_id, l.titulo, s.emprestimos
+            FROM estatisticas_livros_emprestimos s
+            JOIN livros l ON l.id_livro = s.livro_id
+            ORDER BY s.emprestimos DESC
+            LIMIT ?
+        ''', (limite,))]
+    except sqlite3.Error as e:
+        print(f"Erro ao listar os livros mais emprestados: {e}")
+    return []
+
+
+@instrumentar
+def listar_emprestimos_por_mes_bd(meses: int | None = 12) -> list[dict]:
+    """Empréstimos feitos em cada mês ('YYYY-MM'), do mais recente para o mais antigo.
+
+    Cada item traz ``emprestimos``, ``devolvidos``, ``duracao_media_dias`` (dos
+    devolvidos) e ``giro``: empréstimos do mês por livro do acervo atual.
+    """
+    conn = gerenciador_conexoes.obter_conexao()
+    try:
+        livros = conn.execute("SELECT livros FROM estatisticas").fetchone()
+        linhas = conn.execute('''
+            SELECT mes, emprestimos, devolvidos, dias_emprestados
+            FROM estatisticas_emprestimos_mes
+            ORDER BY mes DESC
+            LIMIT ?
+        ''', (-1 if meses is None else meses,)).fetchall()
+    except sqlite3.Error as e:
+        print(f"Erro ao listar empréstimos por mês: {e}")
+        return []
+    livros = livros[0] if livros else 0
+    return [{"mes": row['mes'], "emprestimos": row['emprestimos'], "devolvidos": row['devolvidos'],
+             "duracao_media_dias": _razao(row['dias_emprestados'], row['devolvidos']),
+             "giro": _razao(row['emprestimos'], livros)}
+            for row in linhas]
+
+
+@instrumentar
+def recalcular_estatisticas_bd():
+    """Refaz as tabelas de estatísticas do zero (ex.: após editar o banco com os gatilhos removidos)."""
+    try:
+        with gerenciador_conexoes.transacao() as cursor:
+            recalcular_estatisticas(cursor)
+        return True
+    except sqlite3.Error as e:
+        print(f"Erro ao recalcular as estatísticas: {e}")
+        return False
@@ -0,0 +1,257 @@
+import csv
+import json
+import re
+from contextlib import contextmanager
+from typing import TextIO
+
+from .conexao import gerenciador_conexoes
+from .database import _marca_alteracoes
+from .datas import SQL_DIA_DE_TEXTO, SQL_TEXTO_DE_DIA
+from .importacao import COLUNAS_CSV, SEPARADOR_AUTORES_CSV
+from .instrumentacao import instrumentar
+
+FORMATOS = ('csv', 'jsonl')
+COLUNAS_EMPRESTIMOS = ('id_emprestimo', 'livro_id', 'nome_usuario', 'data_emprestimo',
+                       'data_devolucao_prevista', 'data_devolucao_efetiva')
+# Ordem do dump SQL: cada tabela depois das que ela referencia.
+TABELAS_DUMP = (('autores', 'id_autor'), ('livros', 'id_livro'), ('livros_autores', None),
+                ('emprestimos', 'id_emprestimo'))
+COLUNAS_DATA = {'data_nascimento', 'data_emprestimo', 'data_devolucao_prevista', 'data_devolucao_efetiva'}
+
+
+class RelatorioExportacao:
+    """Resumo de uma exportação. ``marca`` é o ``desde`` da próxima exportação incremental."""
+
+    def __init__(self):
+        self.linhas = 0
+        self.removidos = 0
+        self.marca = 0
+
+    def __str__(self) -> str:
+        return f"Exportação: {self.linhas} linha(s), {self.removidos} remoção(ões); marca {self.marca}."
+
+
+def _sql_nomes_autores(agregacao: str) -> str:
+    """Subconsulta com os nomes dos autores do livro ``l``, na ordem dos vínculos."""
+    return f'''(
+        SELECT {agregacao} FROM (
+            SELECT a.nome FROM livros_autores la
+            JOIN autores a ON a.id_autor = la.autor_id
+            WHERE la.livro_id = l.id_livro
+            ORDER BY la.rowid
+        )
+    )'''
+
+
+# As linhas saem do SQLite já no formato final (o JSON é montado por json_object),
+# e o Python só as copia para o arquivo.
+SQL_LIVROS = {
+    'csv': f'''l.id_livro, l.titulo, COALESCE({_sql_nomes_autores(f"group_concat(nome, '{SEPARADOR_AUTORES_CSV}')")}, ''),
+               l.isbn, l.ano_publicacao, l.editora, l.numero_paginas, l.sinopse''',
+    'jsonl': f'''json_object('id_livro', l.id_livro, 'titulo', l.titulo,
+                             'autores', json({_sql_nomes_autores("json_group_array(nome)")}),
+                             'isbn', l.isbn, 'ano_publicacao', l.ano_publicacao, 'editora', l.editora,
+                             'numero_paginas', l.numero_paginas, 'sinopse', l.sinopse)''',
+}
+
+_DATAS_EMPRESTIMO = {coluna: SQL_TEXTO_DE_DIA.format(coluna=f"e.{coluna}")
+                     for coluna in ('data_emprestimo', 'data_devolucao_prevista', 'data_devolucao_efetiva')}
+SQL_EMPRESTIMOS = {
+    'csv': ", ".join(_DATAS_EMPRESTIMO.get(coluna, f"e.{coluna}") for coluna in COLUNAS_EMPRESTIMOS),
+    'jsonl': "json_object(" + ", ".join(f"'{coluna}', {_DATAS_EMPRESTIMO.get(coluna, f'e.{coluna}')}"
+                                       for coluna in COLUNAS_EMPRESTIMOS) + ")",
+}
+
+
+@contextmanager
+def _abrir_destino(destino: str | TextIO):
+    """Aceita um caminho (o arquivo é criado e fechado aqui) ou um arquivo de texto já aberto."""
+    if hasattr(destino, 'write'):
+        yield destino
+    else:
+        with open(destino, 'w', newline='', encoding='utf-8') as arquivo:
+            yield arquivo
+
+
+def _consultar(cursor, selecao: str, tabela: str, alias: str, chave: str, desde: int | None):
+    """Executa a consulta da exportação e produz (chave, linha).
+
+    Na exportação completa, todas as linhas de ``tabela``. Na incremental, uma
+    por chave alterada depois de ``desde``, em ordem de alteração; ``linha`` é
+    None se a linha foi removida desde então.
+    """
+    if desde is None:
+        cursor.execute(f"SELECT {alias}.{chave}, {selecao} FROM {tabela} {alias} ORDER BY {alias}.rowid")
+    else:
+        cursor.execute(f'''
+            SELECT r.chave, {alias}.{chave} IS NOT NULL, {selecao}
+            FROM registro_alteracoes r
+            LEFT JOIN {tabela} {alias} ON {alias}.{chave} = r.chave
+            WHERE r.tabela = ? AND r.seq > ?
+            ORDER BY r.seq
+        ''', (tabela, desde))
+    cursor.row_factory = None
+    for linha in cursor:
+        if desde is None:
+            yield linha[0], linha[1:]
+        else:
+            yield linha[0], linha[2:] if linha[1] else None
+
+
+def _exportar(destino, formato: str, selecao: dict[str, str], tabela: str, alias: str, chave: str,
+              colunas: tuple, desde: int | None) -> RelatorioExportacao:
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportação desconhecido: '{formato}'. Opções: {', '.join(FORMATOS)}.")
+    relatorio = RelatorioExportacao()
+    # Uma transação de leitura: as linhas e a marca vêm do mesmo instante do banco,
+    # mesmo que outra conexão grave durante a exportação.
+    with _abrir_destino(destino) as saida, gerenciador_conexoes.transacao(imediata=False) as cursor:
+        relatorio.marca = _marca_alteracoes(cursor)
+        if formato == 'csv':
+            escritor = csv.writer(saida)
+            escritor.writerow(colunas)
+            escrever = escritor.writerow
+        else:
+            escrever = lambda valores: saida.write(valores[0] + "\n")
+        for valor_chave, linha in _consultar(cursor, selecao[formato], tabela, alias, chave, desde):
+            if linha is not None:
+                escrever(linha)
+                relatorio.linhas += 1
+            else:
+                # Remoções só têm representação em JSON Lines; no CSV apenas são contadas.
+                if formato == 'jsonl':
+                    saida.write(json.dumps({colunas[0]: valor_chave, "removido": True}, ensure_ascii=False) + "\n")
+                relatorio.removidos += 1
+    return relatorio
+
+
+@instrumentar
+def exportar_livros_bd(destino: str | TextIO, formato: str = 'csv', desde: int | None = None) -> RelatorioExportacao:
+    """Exporta os livros, com os nomes dos autores, nas colunas lidas pela importação.
+
+    A memória usada não depende do tamanho do acervo: as linhas são copiadas do
+    cursor para o arquivo uma a uma. Com ``desde`` (a ``marca`` de uma exportação
+    anterior), só saem os livros alterados depois dela; em JSON Lines os
+    removidos aparecem como ``{"id_livro": ..., "removido": true}``.
+    """
+    return _exportar(destino, formato, SQL_LIVROS, 'livros', 'l', 'id_livro', COLUNAS_CSV, desde)
+
+
+@instrumentar
+def exportar_emprestimos_bd(destino: str | TextIO, formato: str = 'csv',
+                            desde: int | None = None) -> RelatorioExportacao:
+    """Exporta o histórico de empréstimos (datas em 'YYYY-MM-DD'), como ``exportar_livros_bd``."""
+    return _exportar(destino, formato, SQL_EMPRESTIMOS, 'emprestimos', 'e', 'id_emprestimo',
+                     COLUNAS_EMPRESTIMOS, desde)
+
+
+def _colunas(cursor, tabela: str) -> list[str]:
+    return [linha[1] for linha in cursor.execute(f"PRAGMA table_info({tabela})").fetchall()]
+
+
+def _sql_valor(alias: str, coluna: str) -> str:
+    """Expressão SQL que escreve o valor da coluna como literal SQL.
+
+    Uma data sai como 'YYYY-MM-DD' dentro da expressão que a converte no dia
+    ordinal: o dump fica legível e grava o mesmo valor em qualquer banco.
+    """
+    if coluna not in COLUNAS_DATA:
+        return f"quote({alias}.{coluna})"
+    antes, depois = SQL_DIA_DE_TEXTO.split("{coluna}")
+    return f"'{antes}' || quote({SQL_TEXTO_DE_DIA.format(coluna=f'{alias}.{coluna}')}) || '{depois}'"
+
+
+def _sql_insercao(tabela: str, alias: str, colunas: list[str], chave: str | None) -> str:
+    """Expressão SQL que monta, com quote(), o INSERT da linha ``alias`` de ``tabela``.
+
+    Com ``chave``, monta um UPDATE da linha seguido de um INSERT só se ela não
+    existir. Um UPSERT (ON CONFLICT DO UPDATE) não serve: a cláusula de conflito
+    do comando externo substitui o INSERT OR REPLACE dos gatilhos de
+    registro_alteracoes, que falhariam com UNIQUE.
+    """
+    valores = " || ', ' || ".join(_sql_valor(alias, coluna) for coluna in colunas)
+    lista = ", ".join(colunas)
+    if not chave:
+        return f"'INSERT INTO {tabela} ({lista}) VALUES (' || {valores} || ');'"
+    atribuicoes = " || ', ' || ".join(f"'{coluna} = ' || {_sql_valor(alias, coluna)}"
+                                       for coluna in colunas if coluna != chave)
+    condicao = f"'{chave} = ' || quote({alias}.{chave})"
+    return (f"'UPDATE {tabela} SET ' || {atribuicoes} || ' WHERE ' || {condicao} || ';' || char(10) || "
+            f"'INSERT INTO {tabela} ({lista}) SELECT ' || {valores} || "
+            f"' WHERE NOT EXISTS (SELECT 1 FROM {tabela} WHERE ' || {condicao} || ');'")
+
+
+def _escrever_vinculos(cursor, saida, desde: int | None) -> int:
+    """Vínculos livro-autor. Na exportação incremental, os dos livros alterados são regravados."""
+    insercao = _sql_insercao('livros_autores', 'la', ['livro_id', 'autor_id'], None)
+    if desde is None:
+        cursor.execute(f"SELECT NULL, {insercao} FROM livros_autores la ORDER BY la.rowid")
+    else:
+        cursor.execute(f'''
+            SELECT r.chave, CASE WHEN la.livro_id IS NOT NULL THEN {insercao} END
+            FROM registro_alteracoes r
+            LEFT JOIN livros_autores la ON la.livro_id = r.chave
+            WHERE r.tabela = 'livros' AND r.seq > ?
+            ORDER BY r.seq, la.rowid
+        ''', (desde,))
+    cursor.row_factory = None
+    linhas = 0
+    ultimo = None
+    for livro_id, comando in cursor:
+        if livro_id is not None and livro_id != ultimo:
+            saida.write(f"DELETE FROM livros_autores WHERE livro_id = {_literal(livro_id)};\n")
+            ultimo = livro_id
+        if comando is not None:
+            saida.write(comando + "\n")
+            linhas += 1
+    return linhas
+
+
+def _literal(texto: str) -> str:
+    return "'" + texto.replace("'", "''") + "'"
+
+
+@instrumentar
+def exportar_sql_bd(destino: str | TextIO, desde: int | None = None, incluir_esquema: bool = True) -> RelatorioExportacao:
+    """Gera um dump SQL de autores, livros, vínculos e empréstimos, em uma transação.
+
+    O dump completo usa INSERTs simples (e, com ``incluir_esquema``, um CREATE
+    TABLE IF NOT EXISTS para cada uma das quatro tabelas). O incremental
+    (``desde``) usa, para cada linha alterada, um UPDATE e um INSERT caso ela
+    ainda não exista, e DELETE para as removidas.
+
+    As datas saem como texto 'YYYY-MM-DD', convertido para o dia ordinal ao
+    carregar (ver package/datas.py). Num banco criado por esta aplicação, os
+    gatilhos refazem, à medida que as linhas entram, o índice de busca, as
+    estatísticas e o registro de alterações. O dump completo também pode ser
+    carregado num arquivo vazio: ele recebe só as quatro tabelas, e o restante
+    (índices, busca, gatilhos, estatísticas) é criado pelas migrações na
+    primeira vez que a aplicação abrir o arquivo.
+    """
+    relatorio = RelatorioExportacao()
+    with _abrir_destino(destino) as saida, gerenciador_conexoes.transacao(imediata=False) as cursor:
+        relatorio.marca = _marca_alteracoes(cursor)
+        saida.write(f"-- Biblioteca: {'alterações desde ' + str(desde) if desde is not None else 'dump completo'}"
+                    f" (marca {relatorio.marca})\n"
+                    "BEGIN TRANSACTION;\n")
+        if incluir_esquema and desde is None:
+            for tabela, _ in TABELAS_DUMP:
+                sql = cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                     (tabela,)).fetchone()[0]
+                saida.write(re.sub(r"^CREATE TABLE\s+(IF NOT EXISTS\s+)?", "CREATE TABLE IF NOT EXISTS ",
+                                   sql, flags=re.IGNORECASE) + ";\n")
+        for tabela, chave in TABELAS_DUMP:
+            if chave is None:
+                relatorio.linhas += _escrever_vinculos(cursor, saida, desde)
+                continue
+            colunas = _colunas(cursor, tabela)
+            insercao = _sql_insercao(tabela, 't', colunas, chave if desde is not None else None)
+            for valor_chave, linha in _consultar(cursor, insercao, tabela, 't', chave, desde):
+                if linha is not None:
+                    saida.write(linha[0] + "\n")
+                    relatorio.linhas += 1
+                else:
+                    saida.write(f"DELETE FROM {tabela} WHERE {chave} = {_literal(valor_chave)};\n")
+                    relatorio.removidos += 1
+        saida.write("COMMIT;\n")
+    return relatorio
@@ -1,21 +1,18 @@
 import customtkinter as ctk
+import sqlite3
 from tkinter import messagebox
 from datetime import date
 
 from ..models import Livro, Autor
-from ..database import (
-    adicionar_livro_bd,
-    buscar_livro_por_id_bd,
-    atualizar_livro_bd,
-    listar_autores_bd, 
-    adicionar_autor_bd, 
-    buscar_autor_por_id_bd 
-)
+from ..database import buscar_livro_por_id_bd, cache_livros
+from ..sessao import Sessao
+from .executor_bd import ExecutorBD
 
 class BaseLivroDialog(ctk.CTkToplevel):
     """Classe base para diálogos de adicionar e editar livro."""
-    def __init__(self, master, title="Diálogo de Livro"):
+    def __init__(self, master, executor: ExecutorBD, title="Diálogo de Livro"):
         super().__init__(master)
+        self.executor = executor
         self.title(title)
         self.geometry("550x650") 
         self.resizable(False, False)
@@ -67,32 +64,30 @@ class BaseLivroDialog(ctk.CTkToplevel):
         self.btn_cancelar = ctk.CTkButton(self.button_frame, text="Cancelar", command=self.destroy, fg_color="gray")
         self.btn_cancelar.pack(side="left", padx=10)
 
-    def _processar_autores_str(self, autores_str: str) -> list[Autor]:
+    def _processar_autores_str(self, autores_str: str, sessao: Sessao) -> list[Autor]:
         nomes_autores = [nome.strip() for nome in autores_str.split(',') if nome.strip()]
-        autores_obj_list = []
-        
-        autores_existentes_bd = listar_autores_bd()
-        mapa_nomes_autores_bd = {autor.nome.lower(): autor for autor in autores_existentes_bd}
-
-        for nome_autor_str in nomes_autores:
-            autor_encontrado = mapa_nomes_autores_bd.get(nome_autor_str.lower())
-            if autor_encontrado:
-                autores_obj_list.append(autor_encontrado)
-            else:
-                novo_autor = Autor(nome=nome_autor_str)
-                if adicionar_autor_bd(novo_autor): 
-                    autores_obj_list.append(novo_autor)
-                else:
-                    print(f"AVISO: Não foi possível adicionar o novo autor '{nome_autor_str}' ao banco de dados.")
-        return autores_obj_list
+        # Busca só os nomes digitados (sem diferenciar maiúsculas); os que faltam
+        # são gravados junto com o livro, na mesma transação da sessão.
+        return sessao.resolver_autores(nomes_autores)
+
+    def _definir_salvando(self, salvando: bool):
+        estado = "disabled" if salvando else "normal"
+        self.btn_salvar.configure(state=estado, text="Salvando..." if salvando else "Salvar")
+        self.btn_cancelar.configure(state=estado)
+
+    def _ao_falhar_gravacao(self, erro: Exception):
+        if not self.winfo_exists():
+            return
+        self._definir_salvando(False)
+        messagebox.showerror("Erro no Banco de Dados", f"Não foi possível salvar o livro: {erro}", parent=self)
 
     def salvar_livro(self):
         raise NotImplementedError("O método 'salvar_livro' deve ser implementado pela subclasse.")
 
 
 class AdicionarLivroDialog(BaseLivroDialog):
-    def __init__(self, master):
-        super().__init__(master, title="Adicionar Novo Livro")
+    def __init__(self, master, executor: ExecutorBD):
+        super().__init__(master, executor, title="Adicionar Novo Livro")
 
     def salvar_livro(self):
         titulo = self.entry_titulo.get().strip()
@@ -132,10 +127,17 @@ class AdicionarLivroDialog(BaseLivroDialog):
                 messagebox.showerror("Erro de Validação", "Número de páginas deve ser um número.", parent=self)
                 return
 
-        autores_obj_list = self._processar_autores_str(autores_str)
-        if not autores_obj_list and autores_str: 
-            messagebox.showwarning("Aviso Autores", "Não foi possível processar os autores. Verifique os nomes ou tente novamente.", parent=self)
-        
+        self._definir_salvando(True)
+        self.executor.submeter(
+            self._gravar_livro, autores_str, titulo, isbn, ano, editora, paginas, sinopse,
+            ao_concluir=self._ao_gravar_livro,
+            ao_falhar=self._ao_falhar_gravacao
+        )
+
+    def _gravar_livro(self, autores_str, titulo, isbn, ano, editora, paginas, sinopse) -> tuple[Livro, bool]:
+        """Executado na thread do ExecutorBD: não deve tocar nos widgets."""
+        sessao = Sessao()
+        autores_obj_list = self._processar_autores_str(autores_str, sessao)
         novo_livro = Livro(
             titulo=titulo,
             autores=autores_obj_list,
@@ -145,8 +147,22 @@ class AdicionarLivroDialog(BaseLivroDialog):
             numero_paginas=paginas,
             sinopse=sinopse
         )
+        sessao.adicionar_livro(novo_livro)
+        try:
+            return novo_livro, sessao.gravar()
+        except sqlite3.Error as e:
+            print(f"Erro ao adicionar livro: {e}")
+            return novo_livro, False
+
+    def _ao_gravar_livro(self, resultado: tuple[Livro, bool]):
+        novo_livro, sucesso = resultado
+        if not self.winfo_exists():
+            return
+        self._definir_salvando(False)
+        if not novo_livro.autores:
+            messagebox.showwarning("Aviso Autores", "Não foi possível processar os autores. Verifique os nomes ou tente novamente.", parent=self)
 
-        if adicionar_livro_bd(novo_livro):
+        if sucesso:
             messagebox.showinfo("Sucesso", f"Livro '{novo_livro.titulo}' adicionado com sucesso!", parent=self.master) 
             self.livro_result = novo_livro 
             self.destroy() 
@@ -155,14 +171,20 @@ class AdicionarLivroDialog(BaseLivroDialog):
 
 
 class EditarLivroDialog(BaseLivroDialog):
-    def __init__(self, master, id_livro_para_editar: str):
-        super().__init__(master, title="Editar Livro")
+    def __init__(self, master, executor: ExecutorBD, id_livro_para_editar: str):
+        super().__init__(master, executor, title="Editar Livro")
         self.id_livro = id_livro_para_editar
         self.livro_original: Livro | None = None
-        self._carregar_dados_livro()
+        self.btn_salvar.configure(state="disabled")
+        self.executor.submeter(
+            buscar_livro_por_id_bd, self.id_livro,
+            ao_concluir=self._carregar_dados_livro
+        )
 
-    def _carregar_dados_livro(self):
-        self.livro_original = buscar_livro_por_id_bd(self.id_livro)
+    def _carregar_dados_livro(self, livro: Livro | None):
+        if not self.winfo_exists():
+            return
+        self.livro_original = livro
         if not self.livro_original:
             messagebox.showerror("Erro", "Não foi possível carregar os dados do livro para edição.", parent=self)
             self.destroy()
@@ -178,6 +200,7 @@ class EditarLivroDialog(BaseLivroDialog):
         self.entry_editora.insert(0, self.livro_original.editora if self.livro_original.editora else "")
         self.entry_paginas.insert(0, str(self.livro_original.numero_paginas) if self.livro_original.numero_paginas is not None else "")
         self.textbox_sinopse.insert("1.0", self.livro_original.sinopse if self.livro_original.sinopse else "")
+        self.btn_salvar.configure(state="normal")
 
     def salvar_livro(self):
         if not self.livro_original:
@@ -220,23 +243,47 @@ class EditarLivroDialog(BaseLivroDialog):
                 messagebox.showerror("Erro de Validação", "Número de páginas deve ser um número.", parent=self)
                 return
 
-        autores_obj_list = self._processar_autores_str(autores_str)
-        if not autores_obj_list and autores_str:
+        self._definir_salvando(True)
+        self.executor.submeter(
+            self._gravar_livro, autores_str, titulo, isbn, ano, editora, paginas, sinopse,
+            ao_concluir=self._ao_gravar_livro,
+            ao_falhar=self._ao_falhar_gravacao
+        )
+
+    def _gravar_livro(self, autores_str, titulo, isbn, ano, editora, paginas, sinopse) -> bool:
+        """Executado na thread do ExecutorBD: não deve tocar nos widgets.
+
+        ``livro_original`` pode ser a instância do cache; se a gravação falhar, ela
+        sai do cache e as alterações ficam só neste diálogo, que pode tentar de novo.
+        """
+        livro = self.livro_original
+        sessao = Sessao()
+        try:
+            autores_obj_list = self._processar_autores_str(autores_str, sessao)
+            livro.titulo = titulo
+            livro.definir_autores(autores_obj_list)
+            livro.isbn = isbn
+            livro.ano_publicacao = ano
+            livro.editora = editora
+            livro.numero_paginas = paginas
+            livro.sinopse = sinopse
+            sessao.atualizar_livro(livro)
+            return sessao.gravar()
+        except sqlite3.Error as e:
+            print(f"Erro ao atualizar livro: {e}")
+            return False
+        finally:
+            if livro.possui_alteracoes():
+                cache_livros.invalidar(livro.id_item)
+
+    def _ao_gravar_livro(self, sucesso: bool):
+        if not self.winfo_exists():
+            return
+        self._definir_salvando(False)
+        if not self.livro_original.autores:
             messagebox.showwarning("Aviso Autores", "Não foi possível processar os autores. Verifique os nomes ou tente novamente.", parent=self)
 
-        self.livro_original.titulo = titulo
-        
-        self.livro_original._autores.clear()
-        for autor_obj in autores_obj_list:
-            self.livro_original.adicionar_autor(autor_obj)
-            
-        self.livro_original.isbn = isbn
-        self.livro_original.ano_publicacao = ano
-        self.livro_original.editora = editora
-        self.livro_original.numero_paginas = paginas
-        self.livro_original.sinopse = sinopse
-        
-        if atualizar_livro_bd(self.livro_original):
+        if sucesso:
             messagebox.showinfo("Sucesso", f"Livro '{self.livro_original.titulo}' atualizado com sucesso!", parent=self.master)
             self.livro_result = self.livro_original 
             self.destroy()
@@ -0,0 +1,162 @@
+import itertools
+import queue
+import threading
+from ..conexao import gerenciador_conexoes
+
+class PedidoBD:
+    """Uma chamada agendada no ExecutorBD. Pode ser cancelada enquanto não terminar."""
+
+    def __init__(self, numero: int, funcao, args, kwargs, chave, ao_concluir, ao_falhar, progresso: bool = False,
+                 interrompivel: bool = False):
+        self.numero = numero
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self.chave = chave
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.progresso = progresso
+        self.interrompivel = interrompivel
+        self.cancelado = False
+
+    def cancelar(self):
+        self.cancelado = True
+
+
+class ExecutorBD:
+    """Executa as funções de banco em uma thread de trabalho, fora do mainloop do Tk.
+
+    A thread de trabalho é a única a usar o banco, com sua própria conexão do
+    gerenciador. Os resultados voltam por uma fila que a thread do Tk esvazia
+    periodicamente com ``after()``; os callbacks sempre rodam na thread do Tk.
+
+    Pedidos com a mesma ``chave`` se substituem: ao submeter um novo, os
+    anteriores ainda não entregues são cancelados e seus resultados descartados.
+    Um pedido ``interrompivel`` que já esteja rodando é também interrompido
+    (Connection.interrupt), para a thread ficar livre para o que o substituiu.
+    """
+
+    INTERVALO_MS = 25
+
+    def __init__(self, widget, ao_mudar_estado=None):
+        self._widget = widget
+        self._ao_mudar_estado = ao_mudar_estado  # (pendentes, fração | None, mensagem | None)
+        self._pedidos: queue.Queue = queue.Queue()
+        self._respostas: queue.Queue = queue.Queue()
+        self._numeros = itertools.count(1)
+        self._por_chave: dict[str, PedidoBD] = {}
+        self._pendentes = 0
+        self._encerrado = False
+        self._lock = threading.Lock()
+        self._em_execucao: PedidoBD | None = None
+        self._conexao_trabalho = None
+        self._thread = threading.Thread(target=self._trabalhar, name="executor-bd", daemon=True)
+        self._thread.start()
+        self._id_after = self._widget.after(self.INTERVALO_MS, self._drenar)
+
+    def submeter(self, funcao, *args, chave: str | None = None, ao_concluir=None, ao_falhar=None,
+                 progresso: bool = False, interrompivel: bool = False, **kwargs) -> PedidoBD:
+        """Agenda ``funcao(*args, **kwargs)`` na thread de trabalho.
+
+        Com ``progresso``, a função recebe um argumento ``progresso(fracao, mensagem)``
+        que pode chamar para relatar o andamento de operações longas; o andamento
+        chega à interface por ``ao_mudar_estado``. Só marque
+        como ``interrompivel`` leituras que tratem o sqlite3.OperationalError
+        "interrupted" (o resultado de um pedido cancelado é descartado de todo modo).
+        """
+        if chave is not None:
+            self.cancelar(chave)
+        pedido = PedidoBD(next(self._numeros), funcao, args, kwargs, chave, ao_concluir, ao_falhar, progresso,
+                          interrompivel)
+        if chave is not None:
+            self._por_chave[chave] = pedido
+        self._pendentes += 1
+        self._notificar_estado()
+        self._pedidos.put(pedido)
+        return pedido
+
+    def cancelar(self, chave: str):
+        pedido = self._por_chave.pop(chave, None)
+        if pedido:
+            pedido.cancelar()
+            if pedido.interrompivel:
+                with self._lock:
+                    if self._em_execucao is pedido:
+                        self._conexao_trabalho.interrupt()
+
+    def ocupado(self) -> bool:
+        return self._pendentes > 0
+
+    def encerrar(self):
+        if self._encerrado:
+            return
+        self._encerrado = True
+        self._pedidos.put(None)
+        try:
+            self._widget.after_cancel(self._id_after)
+        except Exception:
+            pass
+
+    def _trabalhar(self):
+        while True:
+            pedido = self._pedidos.get()
+            if pedido is None:
+                break
+            if pedido.cancelado:
+                self._respostas.put(("fim", pedido, None))
+                continue
+            kwargs = dict(pedido.kwargs)
+            if pedido.progresso:
+                kwargs["progresso"] = lambda fracao, mensagem=None, p=pedido: \
+                    self._respostas.put(("progresso", p, (fracao, mensagem)))
+            if pedido.interrompivel:
+                with self._lock:
+                    self._conexao_trabalho = gerenciador_conexoes.obter_conexao()
+                    self._em_execucao = pedido
+            try:
+                resultado = pedido.funcao(*pedido.args, **kwargs)
+            except Exception as e:
+                self._respostas.put(("erro", pedido, e))
+            else:
+                self._respostas.put(("ok", pedido, resultado))
+            finally:
+                if pedido.interrompivel:
+                    with self._lock:
+                        self._em_execucao = None
+        gerenciador_conexoes.fechar_conexao_thread()
+
+    def _drenar(self):
+        try:
+            self._entregar_respostas()
+        finally:
+            if not self._encerrado:
+                self._id_after = self._widget.after(self.INTERVALO_MS, self._drenar)
+
+    def _entregar_respostas(self):
+        while True:
+            try:
+                tipo, pedido, valor = self._respostas.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == "progresso":
+                if not pedido.cancelado:
+                    self._notificar_estado(*valor)
+                continue
+
+            self._pendentes -= 1
+            if pedido.chave is not None and self._por_chave.get(pedido.chave) is pedido:
+                del self._por_chave[pedido.chave]
+            self._notificar_estado()
+            if pedido.cancelado:
+                continue
+            if tipo == "ok":
+                if pedido.ao_concluir:
+                    pedido.ao_concluir(valor)
+            elif pedido.ao_falhar:
+                pedido.ao_falhar(valor)
+            else:
+                print(f"Erro na operação de banco '{getattr(pedido.funcao, '__name__', pedido.funcao)}': {valor}")
+
+    def _notificar_estado(self, fracao=None, mensagem=None):
+        if self._ao_mudar_estado:
+            self._ao_mudar_estado(self._pendentes, fracao, mensagem)
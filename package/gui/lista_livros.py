@@ -0,0 +1,425 @@
+import customtkinter as ctk
+from tkinter import ttk
+from ..database import (contar_livros_bd, filtrar_livros_bd, listar_alteracoes_livros_bd,
+                        listar_livros_resumo_janela_bd, listar_livros_resumo_por_ids_bd,
+                        obter_marca_alteracoes_bd, obter_posicao_livro_bd)
+from ..models import Livro, LivroResumo
+from .executor_bd import ExecutorBD
+
+# A marca de alterações é lida antes dos dados: o que for gravado entre as duas
+# leituras aparece de novo na próxima sincronização, em vez de se perder.
+
+def _ler_janela(inicio: int, quantidade: int, contar: bool) -> tuple[int | None, int | None, list[LivroResumo]]:
+    if not contar:
+        return None, None, listar_livros_resumo_janela_bd(inicio, quantidade)
+    marca = obter_marca_alteracoes_bd()
+    return contar_livros_bd(), marca, listar_livros_resumo_janela_bd(inicio, quantidade)
+
+def _ler_janela_filtrada(ids_livros: list[str]) -> tuple[None, None, list[LivroResumo]]:
+    return None, None, listar_livros_resumo_por_ids_bd(ids_livros)
+
+def _filtrar(texto: str) -> tuple[int, list[str]]:
+    marca = obter_marca_alteracoes_bd()
+    return marca, filtrar_livros_bd(texto)
+
+class ListaLivrosVirtual(ctk.CTkFrame):
+    """Lista de livros virtualizada sobre uma ttk.Treeview.
+
+    A Treeview só contém itens para as linhas visíveis. As linhas são buscadas no
+    banco por janelas (as visíveis mais uma margem acima e abaixo) conforme o
+    usuário rola, e a barra de rolagem é controlada pela lista, não pela Treeview.
+    As leituras passam pelo ExecutorBD; enquanto uma janela não chega, a lista
+    continua mostrando as linhas anteriores. Cada linha carregada é um LivroResumo.
+
+    Com um filtro (``filtrar``), a lista guarda os IDs dos livros encontrados, na
+    ordem da listagem, e as janelas são lidas por esses IDs.
+
+    ``sincronizar`` aplica só o que mudou no banco desde a última leitura (ver
+    registro_alteracoes): nada, se nada mudou; as linhas em tela alteradas sem
+    mudar de lugar são trocadas ali mesmo; inclusões, remoções e mudanças de
+    ordem relêem apenas a janela visível.
+    """
+
+    MARGEM = 50
+    ALTURA_LINHA = 25
+
+    def __init__(self, master, executor: ExecutorBD, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.executor = executor
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self._total = 0
+        self._inicio = 0
+        self._visiveis = 20
+        self._linhas: dict[int, LivroResumo] = {}
+        self._selecionado: str | None = None
+        self._recontar = False
+        self._posicao_a_selecionar: int | None = None
+        self._filtro = ""
+        self._ids_filtrados: list[str] | None = None
+        self._marca: int | None = None
+        # Chamado com o número de livros encontrados sempre que um filtro é aplicado
+        # (None quando o filtro é retirado).
+        self.ao_filtrar = None
+        # Chamado uma vez, quando as primeiras linhas vindas do banco são desenhadas.
+        self.ao_exibir_primeira_tela = None
+
+        self.tree = ttk.Treeview(
+            self,
+            columns=("ID", "Título", "Autor(es)", "ISBN", "Ano"),
+            show="headings",
+            selectmode="browse"
+        )
+        self.tree.heading("ID", text="ID")
+        self.tree.heading("Título", text="Título")
+        self.tree.heading("Autor(es)", text="Autor(es)")
+        self.tree.heading("ISBN", text="ISBN")
+        self.tree.heading("Ano", text="Ano Public.")
+
+        self.tree.column("ID", width=200, minwidth=150, stretch=False, anchor="w")
+        self.tree.column("Título", width=300, minwidth=150, stretch=True, anchor="w")
+        self.tree.column("Autor(es)", width=250, minwidth=150, stretch=True, anchor="w")
+        self.tree.column("ISBN", width=150, minwidth=100, stretch=False, anchor="w")
+        self.tree.column("Ano", width=80, minwidth=60, stretch=False, anchor="center")
+
+        self.tree.grid(row=0, column=0, sticky="nsew")
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._ao_rolar_barra)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.tree.bind("<Configure>", self._ao_redimensionar)
+        self.tree.bind("<<TreeviewSelect>>", self._ao_selecionar, add="+")
+        self.tree.bind("<MouseWheel>", self._ao_rolar_mouse)
+        self.tree.bind("<Button-4>", self._ao_rolar_mouse)
+        self.tree.bind("<Button-5>", self._ao_rolar_mouse)
+        self.tree.bind("<Up>", lambda event: self._mover_selecao(-1))
+        self.tree.bind("<Down>", lambda event: self._mover_selecao(1))
+        self.tree.bind("<Prior>", lambda event: self._mover_selecao(-self._visiveis))
+        self.tree.bind("<Next>", lambda event: self._mover_selecao(self._visiveis))
+        self.tree.bind("<Home>", lambda event: self._mover_selecao(-self._total))
+        self.tree.bind("<End>", lambda event: self._mover_selecao(self._total))
+
+    @staticmethod
+    def _valores(livro: LivroResumo) -> tuple:
+        return (
+            livro.id_livro,
+            livro.titulo,
+            livro.autores or "N/A",
+            livro.isbn or "",
+            livro.ano_publicacao if livro.ano_publicacao else "N/A"
+        )
+
+    def recarregar(self):
+        """Relê a contagem e a janela visível, descartando a seleção."""
+        self._linhas.clear()
+        self._selecionado = None
+        if self._filtro:
+            self._aplicar_filtro()
+            return
+        self._recontar = True
+        self._solicitar_janela(self._inicio, self._inicio + self._visiveis - 1)
+
+    def filtrar(self, texto: str) -> bool:
+        """Mostra só os livros com título, autores ou ISBN começando com ``texto``.
+
+        Um filtro novo substitui o anterior: se a busca anterior ainda estiver
+        rodando, ela é interrompida e seu resultado descartado. Texto vazio
+        volta à lista completa. Retorna False se o filtro não mudou.
+        """
+        texto = " ".join(texto.split())
+        if texto == self._filtro:
+            return False
+        self._filtro = texto
+        self._inicio = 0
+        self._linhas.clear()
+        self._selecionado = None
+        if texto:
+            self._aplicar_filtro()
+            return True
+        self.executor.cancelar("lista_livros_filtro")
+        self._ids_filtrados = None
+        if self.ao_filtrar:
+            self.ao_filtrar(None)
+        self.recarregar()
+        return True
+
+    def _aplicar_filtro(self, selecionar: str | None = None):
+        filtro = self._filtro
+        self.executor.submeter(
+            _filtrar, filtro,
+            chave="lista_livros_filtro",
+            interrompivel=True,
+            ao_concluir=lambda resultado: self._receber_filtro(filtro, *resultado, selecionar)
+        )
+
+    def _receber_filtro(self, filtro: str, marca: int, ids: list[str], selecionar: str | None):
+        if filtro != self._filtro:
+            return
+        self._marca = marca
+        # Janelas pedidas para o filtro anterior não servem mais.
+        self.executor.cancelar("lista_livros_janela")
+        self._ids_filtrados = ids
+        self._total = len(ids)
+        self._linhas.clear()
+        if self.ao_filtrar:
+            self.ao_filtrar(len(ids))
+        if selecionar is not None and selecionar in ids:
+            self._selecionado = selecionar
+            self.mostrar_posicao(ids.index(selecionar))
+            return
+        if selecionar is not None:
+            self._descartar_selecao()
+        self.rolar_para(self._inicio, forcar=True)
+
+    def _descartar_selecao(self):
+        """Esquece a seleção e avisa quem observa <<TreeviewSelect>>."""
+        self._selecionado = None
+        self.tree.selection_set(())
+        self.tree.event_generate("<<TreeviewSelect>>")
+
+    def obter_id_selecionado(self) -> str | None:
+        return self._selecionado
+
+    def rolar_para(self, inicio: int, forcar: bool = False):
+        inicio = max(0, min(inicio, self._total - self._visiveis))
+        if inicio != self._inicio or forcar:
+            self._inicio = inicio
+            self._renderizar()
+
+    def mostrar_posicao(self, posicao: int):
+        """Rola o mínimo necessário para que a linha ``posicao`` fique visível."""
+        if posicao < self._inicio:
+            self.rolar_para(posicao, forcar=True)
+        elif posicao >= self._inicio + self._visiveis:
+            self.rolar_para(posicao - self._visiveis + 1, forcar=True)
+        else:
+            self._renderizar()
+
+    def _solicitar_janela(self, primeira: int, ultima: int):
+        inicio = max(0, primeira - self.MARGEM)
+        quantidade = ultima + 1 + self.MARGEM - inicio
+        if self._ids_filtrados is not None:
+            ids = self._ids_filtrados[inicio:inicio + quantidade]
+            funcao, args = _ler_janela_filtrada, (ids,)
+        else:
+            ids = None
+            funcao, args = _ler_janela, (inicio, quantidade, self._recontar)
+        self.executor.submeter(
+            funcao, *args,
+            chave="lista_livros_janela",
+            ao_concluir=lambda resultado: self._receber_janela(inicio, quantidade, ids, *resultado)
+        )
+
+    def _receber_janela(self, inicio: int, quantidade: int, ids: list[str] | None,
+                        total: int | None, marca: int | None, livros: list[LivroResumo]):
+        if total is not None:
+            self._total = total
+            self._recontar = False
+        if marca is not None:
+            self._marca = marca
+        if ids is not None and len(livros) < len(ids):
+            # Livros filtrados que já não existem: saem da lista, para a janela
+            # não ser pedida de novo a cada renderização.
+            if self._ids_filtrados is None or self._ids_filtrados[inicio:inicio + len(ids)] != ids:
+                return
+            encontrados = {livro.id_livro for livro in livros}
+            self._ids_filtrados[inicio:inicio + len(ids)] = [i for i in ids if i in encontrados]
+            self._total = len(self._ids_filtrados)
+            if self._selecionado is not None and self._selecionado not in encontrados and self._selecionado in ids:
+                self._descartar_selecao()
+            if self.ao_filtrar:
+                self.ao_filtrar(self._total)
+        elif ids is None and len(livros) < quantidade and inicio + len(livros) < self._total:
+            # A tabela acabou antes do esperado (linhas removidas por outro
+            # processo): a lista encolhe e, se a contagem não acabou de ser
+            # lida, ela é relida no próximo pedido.
+            self._total = inicio + len(livros)
+            self._recontar = total is None
+        self._linhas = {inicio + i: livro for i, livro in enumerate(livros)}
+        self.rolar_para(self._inicio, forcar=True)
+
+    def _renderizar(self):
+        fim = min(self._total, self._inicio + self._visiveis)
+        self._atualizar_barra()
+        if self._recontar or any(posicao not in self._linhas for posicao in range(self._inicio, fim)):
+            self._solicitar_janela(self._inicio, fim - 1)
+            return
+
+        self.tree.delete(*self.tree.get_children())
+        for posicao in range(self._inicio, fim):
+            livro = self._linhas.get(posicao)
+            if livro:
+                self.tree.insert("", "end", iid=livro.id_livro, values=self._valores(livro))
+        if self._posicao_a_selecionar is not None and self._posicao_a_selecionar in self._linhas:
+            self._selecionado = self._linhas[self._posicao_a_selecionar].id_livro
+            self._posicao_a_selecionar = None
+        if self._selecionado and self.tree.exists(self._selecionado):
+            self.tree.selection_set(self._selecionado)
+            self.tree.focus(self._selecionado)
+        if self.ao_exibir_primeira_tela:
+            callback, self.ao_exibir_primeira_tela = self.ao_exibir_primeira_tela, None
+            callback()
+
+    def _atualizar_barra(self):
+        if self._total <= self._visiveis:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self._inicio / self._total, (self._inicio + self._visiveis) / self._total)
+
+    def _posicao_em_cache(self, id_livro: str) -> int | None:
+        for posicao, livro in self._linhas.items():
+            if livro.id_livro == id_livro:
+                return posicao
+        return None
+
+    def sincronizar(self):
+        """Traz para a lista as gravações feitas no banco desde a última leitura."""
+        if self._marca is None:
+            self.recarregar()
+            return
+        self.executor.submeter(
+            listar_alteracoes_livros_bd, self._marca,
+            chave="lista_livros_sincronizar",
+            ao_concluir=lambda resultado: self._aplicar_alteracoes(*resultado)
+        )
+
+    def _aplicar_alteracoes(self, marca: int, total: int | None,
+                            alteracoes: list[tuple[str, LivroResumo | None]] | None):
+        if alteracoes is None:
+            # Alterações demais (ou erro): relê a tela, mantendo a seleção.
+            self._linhas.clear()
+            if self._filtro:
+                self._aplicar_filtro(selecionar=self._selecionado)
+            else:
+                self._recontar = True
+                self.rolar_para(self._inicio, forcar=True)
+            return
+        self._marca = marca
+        reler = False
+        for id_livro, resumo in alteracoes:
+            posicao = self._posicao_em_cache(id_livro)
+            if resumo is None:
+                if id_livro == self._selecionado:
+                    self._descartar_selecao()
+                if self._ids_filtrados is None:
+                    reler = True
+                elif id_livro in self._ids_filtrados:
+                    self._ids_filtrados.remove(id_livro)
+                    self._total = len(self._ids_filtrados)
+                    self._linhas.clear()
+                continue
+            if posicao is None:
+                # Livro fora da tela: novo, ou pode ter mudado de lugar.
+                reler = True
+                continue
+            anterior = self._linhas[posicao]
+            mesmo_lugar = anterior.titulo == resumo.titulo
+            if self._filtro:
+                # Um livro filtrado só continua encontrado se os campos buscados não mudaram.
+                mesmo_lugar = mesmo_lugar and (anterior.autores, anterior.isbn) == (resumo.autores, resumo.isbn)
+            if not mesmo_lugar:
+                reler = True
+            elif anterior != resumo:
+                self._linhas[posicao] = resumo
+                if self.tree.exists(id_livro):
+                    self.tree.item(id_livro, values=self._valores(resumo))
+        if reler and self._filtro:
+            self._aplicar_filtro(selecionar=self._selecionado)
+        elif reler:
+            self._total = total
+            self._linhas.clear()
+            self.rolar_para(self._inicio, forcar=True)
+        elif not self._linhas:
+            self.rolar_para(self._inicio, forcar=True)
+
+    def atualizar_livro(self, livro: Livro):
+        """Atualiza a linha do livro editado sem reconstruir a lista."""
+        posicao = self._posicao_em_cache(livro.id_item)
+        if posicao is None:
+            return
+        if self._linhas[posicao].titulo != livro.titulo:
+            # A posição na ordenação mudou: só a janela atual é relida.
+            self._linhas.clear()
+            self._mostrar_livro(livro)
+            return
+        resumo = self._linhas[posicao] = LivroResumo.de_livro(livro)
+        if self.tree.exists(resumo.id_livro):
+            self.tree.item(resumo.id_livro, values=self._valores(resumo))
+
+    def inserir_livro(self, livro: Livro):
+        """Inclui um livro novo, rolando até ele e selecionando-o."""
+        self._linhas.clear()
+        self._selecionado = livro.id_item
+        if self._ids_filtrados is None:
+            self._total += 1
+        self._mostrar_livro(livro)
+
+    def _mostrar_livro(self, livro: Livro):
+        if self._filtro:
+            # A posição no filtro só é conhecida refazendo a busca (o livro
+            # pode nem ser mais encontrado por ela).
+            self._aplicar_filtro(selecionar=livro.id_item)
+            return
+        self.executor.submeter(
+            obter_posicao_livro_bd, livro,
+            chave="lista_livros_posicao",
+            ao_concluir=self.mostrar_posicao
+        )
+
+    def obter_livro(self, id_livro: str) -> LivroResumo | None:
+        """Resumo do livro já carregado na janela atual, sem acessar o banco."""
+        posicao = self._posicao_em_cache(id_livro)
+        return self._linhas[posicao] if posicao is not None else None
+
+    def remover_livro(self, id_livro: str):
+        if self._ids_filtrados is not None:
+            if id_livro not in self._ids_filtrados:
+                return
+            self._ids_filtrados.remove(id_livro)
+        self._total = max(0, self._total - 1)
+        self._linhas.clear()
+        if self._selecionado == id_livro:
+            self._selecionado = None
+        self.rolar_para(self._inicio, forcar=True)
+
+    def _ao_redimensionar(self, event=None):
+        visiveis = max(1, (self.tree.winfo_height() - self.ALTURA_LINHA) // self.ALTURA_LINHA)
+        if visiveis != self._visiveis:
+            self._visiveis = visiveis
+            self.rolar_para(self._inicio, forcar=True)
+
+    def _ao_selecionar(self, event=None):
+        # Rolar apaga os itens da Treeview; por isso a seleção é guardada aqui e
+        # só muda quando o usuário escolhe outra linha.
+        selecionados = self.tree.selection()
+        if selecionados:
+            self._selecionado = selecionados[0]
+
+    def _ao_rolar_barra(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.rolar_para(int(float(args[1]) * self._total))
+        elif args[0] == "scroll":
+            passo = self._visiveis if len(args) > 2 and args[2] == "pages" else 1
+            self.rolar_para(self._inicio + int(float(args[1])) * passo)
+
+    def _ao_rolar_mouse(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.rolar_para(self._inicio - 3)
+        else:
+            self.rolar_para(self._inicio + 3)
+        return "break"
+
+    def _mover_selecao(self, deslocamento: int):
+        if self._total == 0:
+            return "break"
+        atual = self._posicao_em_cache(self._selecionado) if self._selecionado else None
+        if atual is None:
+            atual = self._inicio - 1 if deslocamento > 0 else self._inicio + self._visiveis
+        nova = max(0, min(self._total - 1, atual + deslocamento))
+        # Selecionada ao ser desenhada (a janela pode ainda estar a caminho).
+        self._posicao_a_selecionar = nova
+        self.mostrar_posicao(nova)
+        return "break"
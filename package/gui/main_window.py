@@ -1,10 +1,17 @@
 import customtkinter as ctk
-from tkinter import ttk, messagebox
-from ..database import listar_livros_bd, remover_livro_bd, buscar_livro_por_id_bd
-from ..models import Livro
-from .book_dialogs import AdicionarLivroDialog, EditarLivroDialog
+from tkinter import filedialog, ttk, messagebox
+from ..database import cache_autores, cache_livros, inicializar_bd, obter_versao_dados_bd, remover_livro_bd
+from ..instrumentacao import instrumentacao, VARIAVEL_TRACE
+from .executor_bd import ExecutorBD
+from .lista_livros import ListaLivrosVirtual
 
 class AppMainWindow(ctk.CTk):
+    # Espera após a última tecla antes de filtrar: digitando, só o texto final é buscado.
+    ATRASO_FILTRO_MS = 250
+    # Intervalo entre as consultas a PRAGMA data_version, que acusa gravações
+    # de outros processos (ex.: python -m package importar) no mesmo banco.
+    INTERVALO_VERIFICACAO_MS = 2000
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -13,6 +20,16 @@ class AppMainWindow(ctk.CTk):
         ctk.set_appearance_mode("System")
         ctk.set_default_color_theme("blue")
 
+        self.executor_bd = ExecutorBD(self, ao_mudar_estado=self._ao_mudar_estado_bd)
+        self._id_after_progresso = None
+        self._id_after_filtro = None
+        self._id_after_verificacao = None
+        self._versao_dados: int | None = None
+        # Texto de espera em label_status, apagado quando o ExecutorBD fica ocioso;
+        # outros avisos (como o do F12) ficam até serem substituídos.
+        self._status_ocupado: str | None = None
+        self.protocol("WM_DELETE_WINDOW", self.ao_fechar)
+
         self.grid_columnconfigure(0, weight=0)
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
@@ -24,10 +41,10 @@ class AppMainWindow(ctk.CTk):
         self.books_list_frame = ctk.CTkFrame(self)
         self.books_list_frame.grid(row=0, column=1, sticky="nsew", padx=(0,5), pady=5)
         self.books_list_frame.grid_columnconfigure(0, weight=1)
-        self.books_list_frame.grid_rowconfigure(1, weight=1)
+        self.books_list_frame.grid_rowconfigure(2, weight=1)
 
-        self.actions_frame.grid_rowconfigure((0,1,2,3,4,5,6), weight=0)
-        self.actions_frame.grid_rowconfigure(7, weight=1)
+        self.actions_frame.grid_rowconfigure((0,1,2,3,4,5,6,7), weight=0)
+        self.actions_frame.grid_rowconfigure(8, weight=1)
 
         self.label_actions = ctk.CTkLabel(self.actions_frame, text="Ações", font=ctk.CTkFont(size=20, weight="bold"))
         self.label_actions.grid(row=0, column=0, padx=20, pady=(20, 10))
@@ -49,12 +66,28 @@ class AppMainWindow(ctk.CTk):
         self.btn_gerenciar_emprestimos = ctk.CTkButton(self.actions_frame, text="Gerenciar Empréstimos", command=self.abrir_gerenciador_emprestimos)
         self.btn_gerenciar_emprestimos.grid(row=5, column=0, padx=20, pady=10, sticky="ew")
 
-        self.btn_atualizar_lista = ctk.CTkButton(self.actions_frame, text="Atualizar Lista", command=self.carregar_livros)
+        self.btn_atualizar_lista = ctk.CTkButton(self.actions_frame, text="Atualizar Lista", command=self.atualizar_lista)
         self.btn_atualizar_lista.grid(row=6, column=0, padx=20, pady=10, sticky="ew")
 
+        self.btn_importar = ctk.CTkButton(self.actions_frame, text="Importar Livros...", command=self.importar_livros)
+        self.btn_importar.grid(row=7, column=0, padx=20, pady=10, sticky="ew")
+
+        self.label_status = ctk.CTkLabel(self.actions_frame, text="", font=ctk.CTkFont(size=12))
+        self.label_status.grid(row=9, column=0, padx=20, pady=(0, 5), sticky="ew")
+        self.barra_progresso = ctk.CTkProgressBar(self.actions_frame)
+        self.barra_progresso.grid(row=10, column=0, padx=20, pady=(0, 20), sticky="ew")
+        self.barra_progresso.grid_remove()
+
         self.label_lista_livros = ctk.CTkLabel(self.books_list_frame, text="Acervo da Biblioteca", font=ctk.CTkFont(size=20, weight="bold"))
         self.label_lista_livros.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="ew")
 
+        self.entry_filtro = ctk.CTkEntry(self.books_list_frame, placeholder_text="Filtrar por título, autor ou ISBN...")
+        self.entry_filtro.grid(row=1, column=0, padx=20, sticky="ew")
+        self.entry_filtro.bind("<KeyRelease>", self._ao_digitar_filtro)
+        self.entry_filtro.bind("<<Paste>>", self._ao_digitar_filtro, add="+")
+        self.entry_filtro.bind("<Return>", lambda event: self._aplicar_filtro())
+        self.entry_filtro.bind("<Escape>", self.limpar_filtro)
+
         style = ttk.Style(self)
         current_theme = ctk.get_appearance_mode()
         if current_theme == "Dark":
@@ -89,56 +122,119 @@ class AppMainWindow(ctk.CTk):
                       background=[('active', '#d5d5d5')])
 
 
-        self.tree_livros = ttk.Treeview(
-            self.books_list_frame,
-            columns=("ID", "Título", "Autor(es)", "ISBN", "Ano"),
-            show="headings"
-        )
-        self.tree_livros.heading("ID", text="ID")
-        self.tree_livros.heading("Título", text="Título")
-        self.tree_livros.heading("Autor(es)", text="Autor(es)")
-        self.tree_livros.heading("ISBN", text="ISBN")
-        self.tree_livros.heading("Ano", text="Ano Public.")
-
-        self.tree_livros.column("ID", width=200, minwidth=150, stretch=False, anchor="w")
-        self.tree_livros.column("Título", width=300, minwidth=150, stretch=True, anchor="w")
-        self.tree_livros.column("Autor(es)", width=250, minwidth=150, stretch=True, anchor="w")
-        self.tree_livros.column("ISBN", width=150, minwidth=100, stretch=False, anchor="w")
-        self.tree_livros.column("Ano", width=80, minwidth=60, stretch=False, anchor="center")
-
-        self.tree_livros.grid(row=1, column=0, sticky="nsew", padx=20, pady=10)
-        
-        self.scrollbar_livros_y = ctk.CTkScrollbar(self.books_list_frame, command=self.tree_livros.yview)
-        self.scrollbar_livros_y.grid(row=1, column=1, sticky="ns", pady=10, padx=(0,20))
-        self.tree_livros.configure(yscrollcommand=self.scrollbar_livros_y.set)
+        self.lista_livros = ListaLivrosVirtual(self.books_list_frame, self.executor_bd)
+        self.lista_livros.grid(row=2, column=0, sticky="nsew", padx=20, pady=10)
+        self.lista_livros.ao_filtrar = self._ao_filtrar_livros
+        self.tree_livros = self.lista_livros.tree
 
-        self.tree_livros.bind("<<TreeviewSelect>>", self.ao_selecionar_livro)
+        self.tree_livros.bind("<<TreeviewSelect>>", self.ao_selecionar_livro, add="+")
         self.tree_livros.bind("<Double-1>", self.ao_duplo_clique_livro)
+        self.bind("<F12>", self.mostrar_resumo_instrumentacao)
 
-
+        # O esquema é conferido na thread do banco, antes da primeira leitura da
+        # lista (os pedidos são atendidos em ordem): a janela aparece sem esperar.
+        # Num banco antigo as migrações podem demorar; o andamento aparece na barra.
+        self.executor_bd.submeter(inicializar_bd, progresso=True)
         self.carregar_livros()
+        self._verificar_alteracoes_externas()
 
     def carregar_livros(self):
-        for item in self.tree_livros.get_children():
-            self.tree_livros.delete(item)
-
-        livros: list[Livro] = listar_livros_bd()
-        if livros:
-            for livro in livros:
-                nomes_autores = ", ".join([autor.nome for autor in livro.autores]) if livro.autores else "N/A"
-                self.tree_livros.insert("", "end", iid=livro.id_item, values=(
-                    livro.id_item,
-                    livro.titulo,
-                    nomes_autores,
-                    livro.isbn,
-                    livro.ano_publicacao if livro.ano_publicacao else "N/A"
-                ))
+        self._mostrar_status_ocupado("Carregando acervo...")
+        self.lista_livros.recarregar()
         self.desabilitar_botoes_edicao_remocao()
 
+    def atualizar_lista(self):
+        """Aplica à lista só o que mudou no banco desde a última leitura."""
+        self.lista_livros.sincronizar()
+
+    def _verificar_alteracoes_externas(self):
+        self.executor_bd.submeter(obter_versao_dados_bd, chave="versao_dados",
+                                  ao_concluir=self._ao_obter_versao_dados)
+        self._id_after_verificacao = self.after(self.INTERVALO_VERIFICACAO_MS, self._verificar_alteracoes_externas)
+
+    def _ao_obter_versao_dados(self, versao: int):
+        if self._versao_dados is not None and versao != self._versao_dados:
+            # Outro processo gravou: instâncias em cache podem estar desatualizadas.
+            cache_livros.limpar()
+            cache_autores.limpar()
+            self.lista_livros.sincronizar()
+        self._versao_dados = versao
+
+    def _ao_digitar_filtro(self, event=None):
+        if self._id_after_filtro is not None:
+            self.after_cancel(self._id_after_filtro)
+        self._id_after_filtro = self.after(self.ATRASO_FILTRO_MS, self._aplicar_filtro)
+
+    def _aplicar_filtro(self):
+        if self._id_after_filtro is not None:
+            self.after_cancel(self._id_after_filtro)
+            self._id_after_filtro = None
+        if self.lista_livros.filtrar(self.entry_filtro.get()):
+            self.desabilitar_botoes_edicao_remocao()
+
+    def limpar_filtro(self, event=None):
+        self.entry_filtro.delete(0, "end")
+        self._aplicar_filtro()
+
+    def _ao_filtrar_livros(self, encontrados: int | None):
+        if encontrados is None:
+            self.label_lista_livros.configure(text="Acervo da Biblioteca")
+        else:
+            self.label_lista_livros.configure(text=f"Acervo da Biblioteca ({encontrados} encontrado(s))")
+
+    def _ao_mudar_estado_bd(self, pendentes: int, fracao: float | None = None, mensagem: str | None = None):
+        """Mostra o progresso das operações de banco em andamento no ExecutorBD."""
+        if pendentes == 0:
+            if self._id_after_progresso:
+                self.after_cancel(self._id_after_progresso)
+                self._id_after_progresso = None
+            self.barra_progresso.stop()
+            self.barra_progresso.grid_remove()
+            if self._status_ocupado is not None and self.label_status.cget("text") == self._status_ocupado:
+                self.label_status.configure(text="")
+            self._status_ocupado = None
+            return
+        if mensagem:
+            self._mostrar_status_ocupado(mensagem)
+        if fracao is not None:
+            self.barra_progresso.stop()
+            self.barra_progresso.configure(mode="determinate")
+            self.barra_progresso.set(fracao)
+            self.barra_progresso.grid()
+        elif not self._id_after_progresso and not self.barra_progresso.winfo_ismapped():
+            # Operações rápidas terminam antes disso e não fazem a barra piscar.
+            self._id_after_progresso = self.after(200, self._mostrar_progresso_indeterminado)
+
+    def _mostrar_status_ocupado(self, texto: str):
+        self._status_ocupado = texto
+        self.label_status.configure(text=texto)
+
+    def _mostrar_progresso_indeterminado(self):
+        self._id_after_progresso = None
+        if self.executor_bd.ocupado():
+            self.barra_progresso.configure(mode="indeterminate")
+            self.barra_progresso.grid()
+            self.barra_progresso.start()
+
+    def mostrar_resumo_instrumentacao(self, event=None):
+        """Imprime no terminal o resumo das operações de banco medidas até agora (F12)."""
+        if not instrumentacao.ativa:
+            messagebox.showinfo("Instrumentação",
+                                f"A instrumentação está desativada. Inicie o programa com {VARIAVEL_TRACE}=1 para medir as operações do banco.",
+                                parent=self)
+            return
+        instrumentacao.imprimir_resumo()
+        self.label_status.configure(text="Resumo da instrumentação impresso no terminal.")
+
+    def ao_fechar(self):
+        if self._id_after_verificacao is not None:
+            self.after_cancel(self._id_after_verificacao)
+        self.executor_bd.encerrar()
+        self.destroy()
+
 
     def ao_selecionar_livro(self, event=None):
-        selecionados = self.tree_livros.selection()
-        if selecionados:
+        if self.obter_id_livro_selecionado():
             self.btn_edit_livro.configure(state="normal")
             self.btn_remove_livro.configure(state="normal")
         else:
@@ -155,24 +251,30 @@ class AppMainWindow(ctk.CTk):
         self.btn_remove_livro.configure(state="disabled")
         
     def obter_id_livro_selecionado(self) -> str | None:
-        selecionados = self.tree_livros.selection()
-        if selecionados:
-            return selecionados[0] 
-        return None
+        return self.lista_livros.obter_id_selecionado()
 
     def abrir_dialogo_adicionar_livro(self):
         print("Ação: Abrir diálogo para adicionar novo livro.")
-        dialog = AdicionarLivroDialog(master=self)
+        from .book_dialogs import AdicionarLivroDialog
+        dialog = AdicionarLivroDialog(master=self, executor=self.executor_bd)
         self.wait_window(dialog)
-        self.carregar_livros()
+        if dialog.livro_result:
+            self.lista_livros.inserir_livro(dialog.livro_result)
+            self.ao_selecionar_livro()
+        else:
+            self.lista_livros.sincronizar()
 
     def abrir_dialogo_editar_livro(self):
         id_livro_sel = self.obter_id_livro_selecionado()
         if id_livro_sel:
             print(f"Ação: Abrir diálogo para editar livro ID: {id_livro_sel}")
-            dialog = EditarLivroDialog(master=self, id_livro_para_editar=id_livro_sel)
+            from .book_dialogs import EditarLivroDialog
+            dialog = EditarLivroDialog(master=self, executor=self.executor_bd, id_livro_para_editar=id_livro_sel)
             self.wait_window(dialog)
-            self.carregar_livros()
+            if dialog.livro_result:
+                self.lista_livros.atualizar_livro(dialog.livro_result)
+            else:
+                self.lista_livros.sincronizar()
         else:
             messagebox.showwarning("Nenhum Livro Selecionado", "Por favor, selecione um livro na lista para editar.", parent=self)
 
@@ -180,7 +282,7 @@ class AppMainWindow(ctk.CTk):
     def remover_livro_selecionado(self):
         id_livro_sel = self.obter_id_livro_selecionado()
         if id_livro_sel:
-            livro_obj = buscar_livro_por_id_bd(id_livro_sel)
+            livro_obj = self.lista_livros.obter_livro(id_livro_sel)
             nome_livro = livro_obj.titulo if livro_obj else f"ID {id_livro_sel}"
 
             confirmar = messagebox.askyesno(
@@ -190,14 +292,54 @@ class AppMainWindow(ctk.CTk):
                 parent=self
             )
             if confirmar:
-                if remover_livro_bd(id_livro_sel):
-                    messagebox.showinfo("Sucesso", f"Livro '{nome_livro}' removido com sucesso!", parent=self)
-                    self.carregar_livros()
-                else:
-                    messagebox.showerror("Erro no Banco de Dados", f"Falha ao remover o livro '{nome_livro}'.", parent=self)
+                self.btn_remove_livro.configure(state="disabled")
+                self.executor_bd.submeter(
+                    remover_livro_bd, id_livro_sel,
+                    ao_concluir=lambda sucesso: self._ao_remover_livro(sucesso, id_livro_sel, nome_livro)
+                )
         else:
             messagebox.showwarning("Nenhum Livro Selecionado", "Por favor, selecione um livro na lista para remover.", parent=self)
 
+    def _ao_remover_livro(self, sucesso: bool, id_livro: str, nome_livro: str):
+        if sucesso:
+            messagebox.showinfo("Sucesso", f"Livro '{nome_livro}' removido com sucesso!", parent=self)
+            self.lista_livros.remover_livro(id_livro)
+            self.desabilitar_botoes_edicao_remocao()
+        else:
+            messagebox.showerror("Erro no Banco de Dados", f"Falha ao remover o livro '{nome_livro}'.", parent=self)
+            self.ao_selecionar_livro()
+
+    def importar_livros(self):
+        caminho = filedialog.askopenfilename(
+            parent=self, title="Importar Livros",
+            filetypes=[("CSV ou JSON Lines", "*.csv *.jsonl"), ("Todos os arquivos", "*")]
+        )
+        if not caminho:
+            return
+        from ..importacao import importar_csv_bd, importar_jsonl_bd
+        importar = importar_jsonl_bd if caminho.lower().endswith(".jsonl") else importar_csv_bd
+        self.btn_importar.configure(state="disabled")
+        self._mostrar_status_ocupado("Importando...")
+        self.executor_bd.submeter(
+            importar, caminho,
+            progresso=True,
+            ao_concluir=self._ao_importar_livros,
+            ao_falhar=self._ao_falhar_importacao
+        )
+
+    def _ao_importar_livros(self, relatorio):
+        self.btn_importar.configure(state="normal")
+        self.lista_livros.sincronizar()
+        mensagem = str(relatorio)
+        if relatorio.falhas:
+            referencia, erro = relatorio.falhas[0]
+            mensagem += f"\nPrimeira falha ({referencia}): {erro}"
+        messagebox.showinfo("Importação Concluída", mensagem, parent=self)
+
+    def _ao_falhar_importacao(self, erro: Exception):
+        self.btn_importar.configure(state="normal")
+        messagebox.showerror("Erro na Importação", f"Não foi possível importar o arquivo: {erro}", parent=self)
+
     def abrir_gerenciador_autores(self):
         messagebox.showinfo("Em Desenvolvimento", "A funcionalidade de Gerenciar Autores ainda não foi implementada.", parent=self)
         pass
@@ -213,8 +355,5 @@ if __name__ == "__main__":
     SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
     sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, PACKAGE_PARENT, PACKAGE_PARENT)))
 
-    from package.database import inicializar_bd
-    inicializar_bd()
-
     app = AppMainWindow()
     app.mainloop()
\ No newline at end of file
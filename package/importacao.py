@@ -0,0 +1,248 @@
+import csv
+import json
+import os
+import sqlite3
+from itertools import islice
+from typing import Iterable, Iterator
+
+from .models import Autor, Livro
+from .conexao import gerenciador_conexoes
+from .instrumentacao import instrumentar
+from .database import _inserir_autores, _resolver_autores
+
+TAMANHO_LOTE_PADRAO = 1000
+SEPARADOR_AUTORES_CSV = ';'
+COLUNAS_CSV = ('id_livro', 'titulo', 'autores', 'isbn', 'ano_publicacao', 'editora', 'numero_paginas', 'sinopse')
+
+
+class RelatorioImportacao:
+    """Resumo de uma importação em lote: o que foi gravado e o que falhou."""
+
+    def __init__(self):
+        self.livros_inseridos = 0
+        self.autores_inseridos = 0
+        self.vinculos_inseridos = 0
+        self.falhas: list[tuple[str, str]] = []  # (referência da linha/livro, mensagem)
+
+    def registrar_falha(self, referencia, mensagem: str):
+        self.falhas.append((str(referencia), mensagem))
+
+    def __str__(self) -> str:
+        return (f"Importação: {self.livros_inseridos} livro(s), {self.autores_inseridos} autor(es) novo(s), "
+                f"{self.vinculos_inseridos} vínculo(s); {len(self.falhas)} falha(s).")
+
+
+def _linha_livro(livro: Livro) -> tuple:
+    return (livro.id_item, livro.titulo, livro.ano_publicacao, livro.isbn,
+            livro.editora, livro.numero_paginas, livro.sinopse)
+
+
+def _gravar(cursor, livros: list[Livro], autores_gravados: set[str]) -> tuple[int, int, int]:
+    """Grava livros, autores ainda não vistos e vínculos com um executemany por tabela."""
+    autores_novos = {}
+    for livro in livros:
+        for autor in livro.autores:
+            if autor.id_autor not in autores_gravados:
+                autores_novos.setdefault(autor.id_autor, autor)
+
+    n_autores = _inserir_autores(cursor, list(autores_novos.values()))
+
+    # Os vínculos entram antes dos livros: assim o gatilho de inserção em livros
+    # já indexa (FTS) os nomes de todos os autores de uma vez, em vez de o índice
+    # ser regravado a cada vínculo. As chaves estrangeiras ficam adiadas até o commit.
+    cursor.execute("PRAGMA defer_foreign_keys = ON")
+    vinculos = [(livro.id_item, autor.id_autor) for livro in livros for autor in livro.autores]
+    cursor.executemany('''
+        INSERT OR IGNORE INTO livros_autores (livro_id, autor_id)
+        VALUES (?, ?)
+    ''', vinculos)
+    n_vinculos = cursor.rowcount if vinculos else 0
+
+    cursor.executemany('''
+        INSERT INTO livros (id_livro, titulo, ano_publicacao, isbn, editora, numero_paginas, sinopse)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [_linha_livro(livro) for livro in livros])
+
+    return len(livros), n_autores, n_vinculos
+
+
+def _importar_lote(lote: list[tuple[str, Livro]], autores_gravados: set[str], relatorio: RelatorioImportacao,
+                   montar=None):
+    with gerenciador_conexoes.transacao() as cursor:
+        if montar is not None:
+            lote = montar(cursor, lote, relatorio)
+        livros = [livro for _, livro in lote]
+        try:
+            with gerenciador_conexoes.transacao():
+                contagens = _gravar(cursor, livros, autores_gravados)
+            gravados = lote
+        except sqlite3.Error:
+            # Alguma linha violou uma restrição: refaz o lote linha a linha,
+            # cada uma em seu SAVEPOINT, para isolar e registrar as falhas.
+            contagens = (0, 0, 0)
+            gravados = []
+            for referencia, livro in lote:
+                try:
+                    with gerenciador_conexoes.transacao():
+                        parcial = _gravar(cursor, [livro], autores_gravados)
+                except sqlite3.Error as e:
+                    relatorio.registrar_falha(referencia, str(e))
+                    continue
+                contagens = tuple(a + b for a, b in zip(contagens, parcial))
+                gravados.append((referencia, livro))
+
+    relatorio.livros_inseridos += contagens[0]
+    relatorio.autores_inseridos += contagens[1]
+    relatorio.vinculos_inseridos += contagens[2]
+    for _, livro in gravados:
+        autores_gravados.update(autor.id_autor for autor in livro.autores)
+
+
+def _importar_itens(itens: Iterable[tuple[str, object]], tamanho_lote: int, montar=None,
+                    progresso=None, fracao_lida=None) -> RelatorioImportacao:
+    """Importa os itens em lotes; ``montar(cursor, lote, relatorio)``, se dado, converte cada lote em livros.
+
+    Com ``progresso(fracao, mensagem)``, relata o andamento ao fim de cada lote;
+    ``fracao_lida()`` diz quanto da entrada já foi lido (None se não se sabe).
+    """
+    relatorio = RelatorioImportacao()
+    autores_gravados: set[str] = set()
+    itens = iter(itens)
+    while True:
+        bloco = list(islice(itens, tamanho_lote))
+        if not bloco:
+            break
+        lote = []
+        for referencia, item in bloco:
+            if isinstance(item, Exception):
+                relatorio.registrar_falha(referencia, str(item))
+            else:
+                lote.append((referencia, item))
+        if not lote:
+            continue
+        try:
+            _importar_lote(lote, autores_gravados, relatorio, montar)
+        except sqlite3.Error as e:
+            for referencia, _ in lote:
+                relatorio.registrar_falha(referencia, f"Lote não gravado: {e}")
+        if progresso:
+            progresso(fracao_lida() if fracao_lida else None,
+                      f"Importando: {relatorio.livros_inseridos} livro(s)...")
+    return relatorio
+
+
+@instrumentar
+def importar_livros_bd(livros: Iterable[Livro], tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> RelatorioImportacao:
+    """Importa livros (com seus autores) em lotes, uma transação por lote.
+
+    Autores repetidos (mesmo id_autor) são gravados uma única vez. Linhas que
+    violam alguma restrição são registradas no relatório sem abortar o lote.
+    """
+    return _importar_itens(((livro.id_item, livro) for livro in livros), tamanho_lote)
+
+
+def _livro_de_registro(registro: dict) -> tuple[Livro, list[str]]:
+    """Valida um registro lido do arquivo; os autores (por nome) são resolvidos depois, por lote."""
+    titulo = (registro.get('titulo') or '').strip()
+    if not titulo:
+        raise ValueError("O campo 'titulo' é obrigatório.")
+
+    nomes = registro.get('autores') or []
+    if isinstance(nomes, str):
+        nomes = nomes.split(SEPARADOR_AUTORES_CSV)
+    nomes = [nome.strip() for nome in nomes if nome and nome.strip()]
+
+    ano = registro.get('ano_publicacao')
+    paginas = registro.get('numero_paginas')
+    try:
+        ano = int(ano) if ano not in (None, '') else None
+        paginas = int(paginas) if paginas not in (None, '') else 0
+    except (TypeError, ValueError):
+        raise ValueError("Ano de publicação e número de páginas devem ser números inteiros.")
+
+    livro = Livro(
+        id_livro=(registro.get('id_livro') or None),
+        titulo=titulo,
+        isbn=registro.get('isbn'),
+        editora=(registro.get('editora') or '').strip(),
+        numero_paginas=paginas,
+        sinopse=registro.get('sinopse') or '',
+        ano_publicacao=ano
+    )
+    return livro, nomes
+
+
+def _montar_livros_com_autores(cursor, lote: list[tuple[str, tuple[Livro, list[str]]]],
+                               relatorio: RelatorioImportacao) -> list[tuple[str, Livro]]:
+    """Resolve de uma vez os nomes de autores de todo o lote e os associa aos livros.
+
+    Os autores que faltam só são instanciados aqui: ``_gravar`` os grava junto
+    com os livros, no mesmo SAVEPOINT, e assim uma linha rejeitada não deixa
+    para trás (nem conta no relatório) os autores que só ela usava.
+    """
+    nomes = [nome for _, (_, nomes_livro) in lote for nome in nomes_livro]
+    autores, _ = _resolver_autores(cursor, nomes, inserir=False)
+    por_nome = {Autor.normalizar_nome(autor.nome): autor for autor in autores}
+    for _, (livro, nomes_livro) in lote:
+        for nome in nomes_livro:
+            livro.adicionar_autor(por_nome[Autor.normalizar_nome(nome)])
+    return [(referencia, livro) for referencia, (livro, _) in lote]
+
+
+def ler_livros_csv(caminho: str) -> Iterator[tuple[str, tuple[Livro, list[str]] | Exception]]:
+    """Lê um CSV (colunas de COLUNAS_CSV, autores separados por ';') linha a linha.
+
+    Produz pares (número da linha, (Livro sem autores, nomes dos autores)) ou
+    (número da linha, erro) para linhas inválidas.
+    """
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        yield from _ler_csv(arquivo)
+
+
+def _ler_csv(arquivo) -> Iterator[tuple[str, tuple[Livro, list[str]] | Exception]]:
+    leitor = csv.DictReader(arquivo)
+    for registro in leitor:
+        try:
+            yield f"linha {leitor.line_num}", _livro_de_registro(registro)
+        except ValueError as e:
+            yield f"linha {leitor.line_num}", e
+
+
+def ler_livros_jsonl(caminho: str) -> Iterator[tuple[str, tuple[Livro, list[str]] | Exception]]:
+    """Lê um arquivo JSON Lines (um objeto por linha) de forma incremental.
+
+    ``autores`` pode ser uma lista de nomes ou uma string separada por ';'.
+    """
+    with open(caminho, encoding='utf-8') as arquivo:
+        yield from _ler_jsonl(arquivo)
+
+
+def _ler_jsonl(arquivo) -> Iterator[tuple[str, tuple[Livro, list[str]] | Exception]]:
+    for numero, linha in enumerate(arquivo, start=1):
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+            if not isinstance(registro, dict):
+                raise ValueError("Cada linha deve conter um objeto JSON.")
+            yield f"linha {numero}", _livro_de_registro(registro)
+        except ValueError as e:
+            yield f"linha {numero}", e
+
+
+def _importar_arquivo(caminho: str, ler, newline: str | None, tamanho_lote: int, progresso) -> RelatorioImportacao:
+    with open(caminho, newline=newline, encoding='utf-8') as arquivo:
+        tamanho = os.fstat(arquivo.fileno()).st_size
+        # A posição do arquivo binário subjacente avança em blocos: basta para uma barra de progresso.
+        fracao_lida = (lambda: min(1.0, arquivo.buffer.tell() / tamanho)) if tamanho else None
+        return _importar_itens(ler(arquivo), tamanho_lote, _montar_livros_com_autores, progresso, fracao_lida)
+
+
+@instrumentar
+def importar_csv_bd(caminho: str, tamanho_lote: int = TAMANHO_LOTE_PADRAO, progresso=None) -> RelatorioImportacao:
+    return _importar_arquivo(caminho, _ler_csv, '', tamanho_lote, progresso)
+
+
+@instrumentar
+def importar_jsonl_bd(caminho: str, tamanho_lote: int = TAMANHO_LOTE_PADRAO, progresso=None) -> RelatorioImportacao:
+    return _importar_arquivo(caminho, _ler_jsonl, None, tamanho_lote, progresso)
@@ -0,0 +1,275 @@
+import atexit
+import functools
+import os
+import sqlite3
+import threading
+import time
+
+from .conexao import gerenciador_conexoes
+
+# BIBLIOTECA_TRACE=1 ativa a instrumentação e imprime o resumo ao sair;
+# BIBLIOTECA_TRACE=sql também imprime cada comando SQL executado.
+VARIAVEL_TRACE = "BIBLIOTECA_TRACE"
+
+# Acima deste número de consultas, uma operação provavelmente consulta o banco
+# uma vez por item (o padrão "N+1") em vez de uma vez por lote.
+LIMITE_CONSULTAS_PADRAO = 25
+
+# inspect.CO_GENERATOR, sem importar inspect (lento) só por esta constante.
+_CO_GENERATOR = 0x20
+
+
+class EstatisticasOperacao:
+    """Totais acumulados de todas as chamadas de uma operação."""
+
+    __slots__ = ('chamadas', 'tempo_total', 'tempo_maximo', 'consultas', 'comandos', 'linhas', 'conexoes',
+                 'alertas')
+
+    def __init__(self):
+        self.chamadas = 0
+        self.tempo_total = 0.0
+        self.tempo_maximo = 0.0
+        self.consultas = 0   # execute/executemany/executescript chamados pelo Python
+        self.comandos = 0    # comandos executados pelo SQLite (inclui cada linha de um executemany e gatilhos)
+        self.linhas = 0      # linhas lidas dos cursores
+        self.conexoes = 0    # conexões abertas durante a operação
+        self.alertas = 0     # chamadas que passaram do limite de consultas
+
+    def como_dict(self) -> dict:
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+
+class _Medicao:
+    """Contadores de uma chamada em andamento."""
+
+    __slots__ = ('nome', 'verificar_limite', 'inicio', 'tempo', 'consultas', 'comandos', 'linhas', 'conexoes')
+
+    def __init__(self, nome: str, verificar_limite: bool = True):
+        self.nome = nome
+        self.verificar_limite = verificar_limite
+        self.inicio = 0.0
+        self.tempo = 0.0
+        self.consultas = 0
+        self.comandos = 0
+        self.linhas = 0
+        self.conexoes = 0
+
+
+class Instrumentacao:
+    """Mede as operações marcadas com ``@instrumentar`` enquanto estiver ativa.
+
+    Cada chamada registra o tempo, as consultas feitas, as linhas lidas e as
+    conexões abertas. Operações chamadas dentro de outra somam também na de fora;
+    o alerta de N+1 só considera a operação mais externa. Desativada, o custo por
+    chamada é o de um teste de atributo.
+    """
+
+    def __init__(self):
+        self.ativa = False
+        self.imprimir_sql = False
+        self.limite_consultas = LIMITE_CONSULTAS_PADRAO
+        self._estatisticas: dict[str, EstatisticasOperacao] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._resumo_registrado = False
+
+    def ativar(self, limite_consultas: int | None = None, imprimir_sql: bool = False,
+               resumo_ao_sair: bool = False, gerenciador=gerenciador_conexoes):
+        """Passa a medir. Consultas e linhas só são contadas nas conexões abertas depois desta chamada."""
+        if limite_consultas is not None:
+            self.limite_consultas = limite_consultas
+        self.imprimir_sql = imprimir_sql
+        gerenciador.fabrica_conexao = _ConexaoInstrumentada
+        self.ativa = True
+        if resumo_ao_sair and not self._resumo_registrado:
+            atexit.register(self.imprimir_resumo)
+            self._resumo_registrado = True
+
+    def desativar(self, gerenciador=gerenciador_conexoes):
+        self.ativa = False
+        gerenciador.fabrica_conexao = sqlite3.Connection
+
+    def zerar(self):
+        with self._lock:
+            self._estatisticas.clear()
+
+    def _pilha(self) -> list[_Medicao]:
+        pilha = getattr(self._local, "pilha", None)
+        if pilha is None:
+            pilha = self._local.pilha = []
+        return pilha
+
+    def _entrar(self, medicao: _Medicao):
+        self._pilha().append(medicao)
+        medicao.inicio = time.perf_counter()
+
+    def _sair(self, medicao: _Medicao):
+        medicao.tempo += time.perf_counter() - medicao.inicio
+        self._pilha().pop()
+
+    def _concluir(self, medicao: _Medicao):
+        """Soma a chamada terminada nos totais da operação e verifica o limite de consultas."""
+        excedeu = (medicao.verificar_limite and not self._pilha()
+                   and medicao.consultas > self.limite_consultas)
+        with self._lock:
+            estatisticas = self._estatisticas.get(medicao.nome)
+            if estatisticas is None:
+                estatisticas = self._estatisticas[medicao.nome] = EstatisticasOperacao()
+            estatisticas.chamadas += 1
+            estatisticas.tempo_total += medicao.tempo
+            estatisticas.tempo_maximo = max(estatisticas.tempo_maximo, medicao.tempo)
+            estatisticas.consultas += medicao.consultas
+            estatisticas.comandos += medicao.comandos
+            estatisticas.linhas += medicao.linhas
+            estatisticas.conexoes += medicao.conexoes
+            estatisticas.alertas += excedeu
+        if excedeu:
+            print(f"Aviso: {medicao.nome} fez {medicao.consultas} consultas em uma chamada "
+                  f"(limite {self.limite_consultas}); possível consulta por item (N+1).")
+
+    def _contar(self, campo: str, quantidade: int = 1):
+        for medicao in self._pilha():
+            setattr(medicao, campo, getattr(medicao, campo) + quantidade)
+
+    def _registrar_comando(self, sql: str):
+        if self.imprimir_sql:
+            print(f"[SQL] {sql}")
+        self._contar("comandos")
+
+    def estatisticas(self) -> dict[str, dict]:
+        with self._lock:
+            return {nome: estatisticas.como_dict() for nome, estatisticas in self._estatisticas.items()}
+
+    def formatar_resumo(self) -> str:
+        """Tabela com uma linha por operação, da que mais tempo consumiu para a que menos."""
+        itens = sorted(self.estatisticas().items(), key=lambda item: item[1]["tempo_total"], reverse=True)
+        if not itens:
+            return "Instrumentação: nenhuma operação registrada."
+        linhas = [f"{'Operação':<40} {'Chamadas':>8} {'Total ms':>10} {'Médio ms':>9} {'Máx ms':>9} "
+                  f"{'Consultas':>9} {'Comandos':>9} {'Linhas':>9} {'Conexões':>8} {'N+1':>5}"]
+        for nome, e in itens:
+            linhas.append(
+                f"{nome:<40} {e['chamadas']:>8} {e['tempo_total'] * 1000:>10.1f} "
+                f"{e['tempo_total'] * 1000 / e['chamadas']:>9.2f} {e['tempo_maximo'] * 1000:>9.2f} "
+                f"{e['consultas']:>9} {e['comandos']:>9} {e['linhas']:>9} {e['conexoes']:>8} {e['alertas']:>5}"
+            )
+        return "\n".join(linhas)
+
+    def imprimir_resumo(self):
+        print(self.formatar_resumo())
+
+
+instrumentacao = Instrumentacao()
+
+
+class _CursorInstrumentado(sqlite3.Cursor):
+    """Cursor que conta as consultas feitas e as linhas lidas na operação em andamento."""
+
+    def execute(self, sql, parametros=()):
+        instrumentacao._contar("consultas")
+        return super().execute(sql, parametros)
+
+    def executemany(self, sql, sequencia):
+        instrumentacao._contar("consultas")
+        return super().executemany(sql, sequencia)
+
+    def executescript(self, script):
+        instrumentacao._contar("consultas")
+        return super().executescript(script)
+
+    def fetchone(self):
+        linha = super().fetchone()
+        if linha is not None:
+            instrumentacao._contar("linhas")
+        return linha
+
+    def fetchmany(self, size=None):
+        linhas = super().fetchmany(self.arraysize if size is None else size)
+        instrumentacao._contar("linhas", len(linhas))
+        return linhas
+
+    def fetchall(self):
+        linhas = super().fetchall()
+        instrumentacao._contar("linhas", len(linhas))
+        return linhas
+
+    def __next__(self):
+        linha = super().__next__()
+        instrumentacao._contar("linhas")
+        return linha
+
+
+class _ConexaoInstrumentada(sqlite3.Connection):
+    """Conexão aberta pelo gerenciador enquanto a instrumentação está ativa."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_trace_callback(instrumentacao._registrar_comando)
+        instrumentacao._contar("conexoes")
+
+    def cursor(self, factory=_CursorInstrumentado):
+        return super().cursor(factory)
+
+    # Connection.execute* criam o cursor sem passar por cursor().
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, sequencia):
+        return self.cursor().executemany(sql, sequencia)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+
+def instrumentar(funcao):
+    """Decorador que mede a função como uma operação quando a instrumentação está ativa.
+
+    Em funções geradoras, cada avanço do gerador é medido e os totais vão para
+    uma única chamada, concluída quando o gerador termina ou é fechado. Elas
+    consultam o banco uma vez por lote e por isso não passam pelo alerta de N+1.
+    """
+    nome = funcao.__qualname__
+
+    if funcao.__code__.co_flags & _CO_GENERATOR:
+        @functools.wraps(funcao)
+        def gerador(*args, **kwargs):
+            if not instrumentacao.ativa:
+                return (yield from funcao(*args, **kwargs))
+            medicao = _Medicao(nome, verificar_limite=False)
+            iterador = funcao(*args, **kwargs)
+            try:
+                while True:
+                    instrumentacao._entrar(medicao)
+                    try:
+                        item = next(iterador)
+                    except StopIteration as fim:
+                        return fim.value
+                    finally:
+                        instrumentacao._sair(medicao)
+                    yield item
+            finally:
+                iterador.close()
+                instrumentacao._concluir(medicao)
+        return gerador
+
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        if not instrumentacao.ativa:
+            return funcao(*args, **kwargs)
+        medicao = _Medicao(nome)
+        instrumentacao._entrar(medicao)
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            instrumentacao._sair(medicao)
+            instrumentacao._concluir(medicao)
+    return envoltorio
+
+
+def ativar_pelo_ambiente():
+    valor = os.environ.get(VARIAVEL_TRACE, "").strip().lower()
+    if valor and valor not in ("0", "nao", "não", "false"):
+        instrumentacao.ativar(imprimir_sql=(valor == "sql"), resumo_ao_sair=True)
+
+
+ativar_pelo_ambiente()
@@ -0,0 +1,532 @@
+import sqlite3
+
+from .conexao import gerenciador_conexoes
+from .models import Autor
+from .datas import SQL_DIA_DE_TEXTO, SQL_TEXTO_DE_DIA
+
+# Nomes dos autores de um livro, na ordem dos vínculos, para o índice de busca.
+SQL_NOMES_AUTORES = """(
+    SELECT group_concat(a.nome, ' ') FROM livros_autores la
+    JOIN autores a ON a.id_autor = la.autor_id
+    WHERE la.livro_id = {livro_id}
+)"""
+
+# ISBN como comparado pelo filtro da lista: sem hífens nem espaços, X maiúsculo.
+# As consultas precisam repetir a expressão exatamente para usar o índice.
+SQL_ISBN_COMPACTO = "upper(replace(replace(isbn, '-', ''), ' ', ''))"
+
+
+# Mantém os nomes de autores em livros_fts quando um autor é renomeado.
+SQL_GATILHO_AUTORES_FTS = f"""
+    CREATE TRIGGER IF NOT EXISTS trg_autores_fts_update AFTER UPDATE OF nome ON autores BEGIN
+        UPDATE livros_fts
+        SET autores = {SQL_NOMES_AUTORES.format(livro_id='(SELECT id_livro FROM livros WHERE rowid = livros_fts.rowid)')}
+        WHERE rowid IN (
+            SELECT l.rowid FROM livros l
+            JOIN livros_autores la ON la.livro_id = l.id_livro
+            WHERE la.autor_id = NEW.id_autor
+        );
+    END
+"""
+
+
+def _gatilhos_registro_alteracoes(tabela: str, chave: str, registrar_como: str, eventos=("INSERT", "UPDATE", "DELETE")) -> list[str]:
+    """Gatilhos que anotam em registro_alteracoes a chave de cada linha gravada em ``tabela``.
+
+    Cada chave ocupa uma única linha: INSERT OR REPLACE a move para o fim da
+    sequência, então o registro cresce com o número de linhas, não de gravações.
+    """
+    gatilhos = []
+    for evento in eventos:
+        linha = "OLD" if evento == "DELETE" else "NEW"
+        gatilhos.append(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{tabela}_alteracoes_{evento.lower()} AFTER {evento} ON {tabela} BEGIN
+                INSERT OR REPLACE INTO registro_alteracoes (tabela, chave) VALUES ('{registrar_como}', {linha}.{chave});
+            END
+        """)
+    return gatilhos
+
+
+# Colunas da tabela estatisticas, que tem uma única linha com os totais gerais.
+CHAVES_ESTATISTICAS = ("livros", "autores", "emprestimos", "emprestimos_em_aberto", "emprestimos_devolvidos",
+                       "dias_emprestados", "devolvidos_com_atraso")
+
+# Contribuição de um empréstimo para cada total; {e} é NEW ou OLD (ou o alias na recontagem).
+_VALORES_EMPRESTIMO = {
+    "emprestimos": "1",
+    "emprestimos_em_aberto": "{e}.data_devolucao_efetiva IS NULL",
+    "emprestimos_devolvidos": "{e}.data_devolucao_efetiva IS NOT NULL",
+    "dias_emprestados": "COALESCE({e}.data_devolucao_efetiva - {e}.data_emprestimo, 0)",
+    "devolvidos_com_atraso": "COALESCE({e}.data_devolucao_efetiva > {e}.data_devolucao_prevista, 0)",
+}
+
+# Mês ('YYYY-MM') do empréstimo, a partir do dia ordinal.
+_SQL_MES_EMPRESTIMO = "substr(" + SQL_TEXTO_DE_DIA.format(coluna="{e}.data_emprestimo") + ", 1, 7)"
+
+
+def _sql_contar(tabela: str, coluna: str, valor: str, sinal: str, campos: dict[str, str]) -> str:
+    """Soma (``sinal`` '+') ou subtrai ('-') ``campos`` na linha ``valor`` de ``tabela``.
+
+    A linha é criada na primeira soma e removida quando a primeira contagem
+    chega a zero, para as listagens não exibirem grupos vazios.
+    """
+    nomes = ", ".join(campos)
+    valores = ", ".join(expressao if sinal == "+" else f"-({expressao})" for expressao in campos.values())
+    somas = ", ".join(f"{campo} = {campo} + excluded.{campo}" for campo in campos)
+    sql = (f"INSERT INTO {tabela} ({coluna}, {nomes}) VALUES ({valor}, {valores}) "
+           f"ON CONFLICT ({coluna}) DO UPDATE SET {somas};")
+    if sinal == "-":
+        sql += f"\nDELETE FROM {tabela} WHERE {coluna} = {valor} AND {next(iter(campos))} = 0;"
+    return sql
+
+
+def _sql_somar_livro(linha: str, sinal: str) -> str:
+    return "\n".join([
+        _sql_contar("estatisticas_editoras", "editora", f"COALESCE({linha}.editora, '')", sinal, {"livros": "1"}),
+        _sql_contar("estatisticas_anos", "ano", f"COALESCE({linha}.ano_publicacao, 0)", sinal, {"livros": "1"}),
+    ])
+
+
+def _sql_totais_emprestimo(somar: str | None, subtrair: str | None) -> str:
+    """Atualiza os totais de empréstimos com a linha ``somar`` menos a ``subtrair`` (NEW/OLD)."""
+    atribuicoes = []
+    for chave, valor in _VALORES_EMPRESTIMO.items():
+        if somar and subtrair and valor == "1":
+            continue  # alterar um empréstimo não muda a quantidade
+        delta = (f" + ({valor.format(e=somar)})" if somar else "") + \
+                (f" - ({valor.format(e=subtrair)})" if subtrair else "")
+        atribuicoes.append(f"{chave} = {chave}{delta}")
+    return f"UPDATE estatisticas SET {', '.join(atribuicoes)};"
+
+
+def _sql_somar_emprestimo_mes(linha: str, sinal: str) -> str:
+    return _sql_contar("estatisticas_emprestimos_mes", "mes", _SQL_MES_EMPRESTIMO.format(e=linha), sinal, {
+        "emprestimos": "1",
+        "devolvidos": _VALORES_EMPRESTIMO["emprestimos_devolvidos"].format(e=linha),
+        "dias_emprestados": _VALORES_EMPRESTIMO["dias_emprestados"].format(e=linha),
+    })
+
+
+def _sql_somar_emprestimo_livro(linha: str, sinal: str) -> str:
+    return _sql_contar("estatisticas_livros_emprestimos", "livro_id", f"{linha}.livro_id", sinal, {"emprestimos": "1"})
+
+
+def _gatilhos_estatisticas() -> list[str]:
+    """Gatilhos que mantêm as tabelas de estatísticas na mesma transação de cada gravação.
+
+    Cada gatilho só toca as linhas que a gravação altera: cada página a mais
+    modificada é uma página a mais escrita no WAL a cada transação.
+    """
+    def gatilho(nome, evento, *corpo, condicao=""):
+        return f"CREATE TRIGGER IF NOT EXISTS trg_{nome}_estatisticas AFTER {evento}{condicao} BEGIN\n" \
+               + "\n".join(corpo) + "\nEND"
+
+    return [
+        gatilho("livros_insert", "INSERT ON livros", "UPDATE estatisticas SET livros = livros + 1;",
+                _sql_somar_livro("NEW", "+")),
+        gatilho("livros_delete", "DELETE ON livros", "UPDATE estatisticas SET livros = livros - 1;",
+                _sql_somar_livro("OLD", "-")),
+        gatilho("livros_update", "UPDATE OF editora, ano_publicacao ON livros",
+                _sql_somar_livro("OLD", "-"), _sql_somar_livro("NEW", "+"),
+                condicao=" WHEN OLD.editora IS NOT NEW.editora OR OLD.ano_publicacao IS NOT NEW.ano_publicacao"),
+        gatilho("livros_autores_insert", "INSERT ON livros_autores",
+                _sql_contar("estatisticas_autores", "autor_id", "NEW.autor_id", "+", {"livros": "1"})),
+        gatilho("livros_autores_delete", "DELETE ON livros_autores",
+                _sql_contar("estatisticas_autores", "autor_id", "OLD.autor_id", "-", {"livros": "1"})),
+        gatilho("autores_insert", "INSERT ON autores", "UPDATE estatisticas SET autores = autores + 1;"),
+        gatilho("autores_delete", "DELETE ON autores", "UPDATE estatisticas SET autores = autores - 1;"),
+        gatilho("emprestimos_insert", "INSERT ON emprestimos", _sql_totais_emprestimo("NEW", None),
+                _sql_somar_emprestimo_mes("NEW", "+"), _sql_somar_emprestimo_livro("NEW", "+")),
+        gatilho("emprestimos_delete", "DELETE ON emprestimos", _sql_totais_emprestimo(None, "OLD"),
+                _sql_somar_emprestimo_mes("OLD", "-"), _sql_somar_emprestimo_livro("OLD", "-")),
+        # Devolução (o caso comum): só os totais e o mês mudam, não a contagem por livro.
+        gatilho("emprestimos_update_datas",
+                "UPDATE OF data_emprestimo, data_devolucao_prevista, data_devolucao_efetiva ON emprestimos",
+                _sql_totais_emprestimo("NEW", "OLD"), _sql_somar_emprestimo_mes("OLD", "-"),
+                _sql_somar_emprestimo_mes("NEW", "+")),
+        gatilho("emprestimos_update_livro", "UPDATE OF livro_id ON emprestimos",
+                _sql_somar_emprestimo_livro("OLD", "-"), _sql_somar_emprestimo_livro("NEW", "+"),
+                condicao=" WHEN OLD.livro_id IS NOT NEW.livro_id"),
+    ]
+
+
+def recalcular_estatisticas(cursor):
+    """Refaz todas as tabelas de estatísticas a partir das tabelas de dados."""
+    for tabela in ("estatisticas", "estatisticas_editoras", "estatisticas_anos", "estatisticas_autores",
+                   "estatisticas_emprestimos_mes", "estatisticas_livros_emprestimos"):
+        cursor.execute(f"DELETE FROM {tabela}")
+    somas = ", ".join(f"COALESCE(SUM({valor.format(e='e')}), 0)" for valor in _VALORES_EMPRESTIMO.values())
+    cursor.execute(f"""
+        INSERT INTO estatisticas (id, {', '.join(CHAVES_ESTATISTICAS)})
+        SELECT 1, (SELECT COUNT(*) FROM livros), (SELECT COUNT(*) FROM autores), {somas}
+        FROM emprestimos e
+    """)
+    cursor.execute("""
+        INSERT INTO estatisticas_editoras (editora, livros)
+        SELECT COALESCE(editora, ''), COUNT(*) FROM livros GROUP BY 1
+    """)
+    cursor.execute("""
+        INSERT INTO estatisticas_anos (ano, livros)
+        SELECT COALESCE(ano_publicacao, 0), COUNT(*) FROM livros GROUP BY 1
+    """)
+    cursor.execute("""
+        INSERT INTO estatisticas_autores (autor_id, livros)
+        SELECT autor_id, COUNT(*) FROM livros_autores GROUP BY autor_id
+    """)
+    cursor.execute(f"""
+        INSERT INTO estatisticas_emprestimos_mes (mes, emprestimos, devolvidos, dias_emprestados)
+        SELECT {_SQL_MES_EMPRESTIMO.format(e='e')}, COUNT(*),
+               SUM({_VALORES_EMPRESTIMO['emprestimos_devolvidos'].format(e='e')}),
+               SUM({_VALORES_EMPRESTIMO['dias_emprestados'].format(e='e')})
+        FROM emprestimos e GROUP BY 1
+    """)
+    cursor.execute("""
+        INSERT INTO estatisticas_livros_emprestimos (livro_id, emprestimos)
+        SELECT livro_id, COUNT(*) FROM emprestimos GROUP BY livro_id
+    """)
+
+
+def reconstruir_indice_busca(cursor):
+    """Recria todo o conteúdo de livros_fts a partir das tabelas.
+
+    Necessário após um VACUUM, que pode renumerar os rowids de livros.
+    """
+    cursor.execute("DELETE FROM livros_fts")
+    cursor.execute(f"""
+        INSERT INTO livros_fts (rowid, titulo, sinopse, editora, autores)
+        SELECT l.rowid, l.titulo, l.sinopse, l.editora, {SQL_NOMES_AUTORES.format(livro_id='l.id_livro')}
+        FROM livros l
+    """)
+
+
+def _recriar_tabela(cursor, tabela: str, definicao: str, colunas: list[str], conversoes: dict[str, str]):
+    """Recria ``tabela`` com a nova ``definicao`` e copia as linhas numa única instrução.
+
+    ``conversoes`` mapeia coluna -> expressão SQL aplicada na cópia. A nova tabela
+    é criada com outro nome e renomeada ao final; com legacy_alter_table o RENAME
+    não revalida os gatilhos das outras tabelas, que citam ``tabela`` pelo nome e
+    continuam válidos. Índices e gatilhos da própria tabela precisam ser recriados.
+    """
+    lista = ", ".join(colunas)
+    selecao = ", ".join(conversoes.get(coluna, coluna) for coluna in colunas)
+    cursor.execute(definicao.format(tabela=f"{tabela}_nova"))
+    cursor.execute(f"INSERT INTO {tabela}_nova ({lista}) SELECT {selecao} FROM {tabela}")
+    cursor.execute(f"DROP TABLE {tabela}")
+    cursor.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        cursor.execute(f"ALTER TABLE {tabela}_nova RENAME TO {tabela}")
+    finally:
+        cursor.execute("PRAGMA legacy_alter_table = OFF")
+
+
+def _converter_datas(cursor):
+    def dia(coluna):
+        # Só o texto 'YYYY-MM-DD' é convertido: um dia ordinal já gravado (o passo
+        # rodando de novo, ou um dump carregado num arquivo novo) fica como está.
+        return f"CASE WHEN typeof({coluna}) = 'text' THEN {SQL_DIA_DE_TEXTO.format(coluna=coluna)} ELSE {coluna} END"
+
+    _recriar_tabela(cursor, "autores", '''
+        CREATE TABLE {tabela} (
+            id_autor TEXT PRIMARY KEY,
+            nome TEXT NOT NULL,
+            data_nascimento INTEGER, -- dia ordinal (ver package/datas.py)
+            biografia TEXT
+        )
+    ''', ["id_autor", "nome", "data_nascimento", "biografia"],
+        {"data_nascimento": dia("data_nascimento")})
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_autores_nome ON autores (nome)")
+    cursor.execute(SQL_GATILHO_AUTORES_FTS)
+
+    _recriar_tabela(cursor, "emprestimos", '''
+        CREATE TABLE {tabela} (
+            id_emprestimo TEXT PRIMARY KEY,
+            livro_id TEXT NOT NULL,
+            nome_usuario TEXT NOT NULL,
+            data_emprestimo INTEGER NOT NULL, -- dia ordinal (ver package/datas.py)
+            data_devolucao_prevista INTEGER NOT NULL,
+            data_devolucao_efetiva INTEGER,
+            FOREIGN KEY (livro_id) REFERENCES livros (id_livro) ON DELETE CASCADE
+        )
+    ''', ["id_emprestimo", "livro_id", "nome_usuario", "data_emprestimo",
+          "data_devolucao_prevista", "data_devolucao_efetiva"],
+        {coluna: dia(coluna) for coluna in ("data_emprestimo", "data_devolucao_prevista", "data_devolucao_efetiva")})
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_emprestimos_livro ON emprestimos (livro_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_emprestimos_data ON emprestimos (data_emprestimo)")
+
+
+def _adicionar_coluna(tabela: str, coluna: str, tipo: str):
+    """Passo que adiciona ``coluna`` a ``tabela`` só se ela ainda não existir.
+
+    ALTER TABLE ... ADD COLUMN não tem IF NOT EXISTS; sem a verificação, o passo
+    falharia num banco em que a coluna já foi criada.
+    """
+    def adicionar(cursor):
+        colunas = [linha[1] for linha in cursor.execute(f"PRAGMA table_info({tabela})").fetchall()]
+        if coluna not in colunas:
+            cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}")
+    return adicionar
+
+
+def _preencher_nomes_normalizados(cursor):
+    # A normalização (casefold) é feita em Python: NOCASE do SQLite só trata ASCII.
+    cursor.execute("SELECT rowid, nome FROM autores")
+    cursor.executemany(
+        "UPDATE autores SET nome_normalizado = ? WHERE rowid = ?",
+        [(Autor.normalizar_nome(nome), rowid) for rowid, nome in cursor.fetchall()]
+    )
+
+
+# Cada migração é (versão, descrição, passos). Um passo é um comando SQL ou uma
+# função que recebe o cursor. As versões são aplicadas em ordem, cada uma em sua
+# própria transação, e a versão aplicada fica registrada em PRAGMA user_version.
+# Os passos devem ser idempotentes: bancos criados antes das migrações já possuem
+# as tabelas da versão 1, mas têm user_version = 0.
+MIGRACOES = [
+    (1, "Tabelas iniciais", [
+        '''
+        CREATE TABLE IF NOT EXISTS autores (
+            id_autor TEXT PRIMARY KEY,
+            nome TEXT NOT NULL,
+            data_nascimento TEXT, -- Armazenar como YYYY-MM-DD
+            biografia TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS livros (
+            id_livro TEXT PRIMARY KEY, -- id_item da classe base ItemBiblioteca
+            titulo TEXT NOT NULL,
+            ano_publicacao INTEGER,
+            isbn TEXT UNIQUE, -- ISBN deve ser único
+            editora TEXT,
+            numero_paginas INTEGER,
+            sinopse TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS livros_autores (
+            livro_id TEXT NOT NULL,
+            autor_id TEXT NOT NULL,
+            FOREIGN KEY (livro_id) REFERENCES livros (id_livro) ON DELETE CASCADE,
+            FOREIGN KEY (autor_id) REFERENCES autores (id_autor) ON DELETE CASCADE,
+            PRIMARY KEY (livro_id, autor_id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS emprestimos (
+            id_emprestimo TEXT PRIMARY KEY,
+            livro_id TEXT NOT NULL,
+            nome_usuario TEXT NOT NULL,
+            data_emprestimo TEXT NOT NULL, -- Armazenar como YYYY-MM-DD
+            data_devolucao_prevista TEXT NOT NULL, -- Armazenar como YYYY-MM-DD
+            data_devolucao_efetiva TEXT, -- Armazenar como YYYY-MM-DD
+            FOREIGN KEY (livro_id) REFERENCES livros (id_livro) ON DELETE CASCADE
+        )
+        ''',
+    ]),
+    (2, "Índices secundários para autores, vínculos e empréstimos", [
+        "CREATE INDEX IF NOT EXISTS idx_livros_autores_autor ON livros_autores (autor_id)",
+        "CREATE INDEX IF NOT EXISTS idx_emprestimos_livro ON emprestimos (livro_id)",
+        "CREATE INDEX IF NOT EXISTS idx_emprestimos_data ON emprestimos (data_emprestimo)",
+        "CREATE INDEX IF NOT EXISTS idx_autores_nome ON autores (nome)",
+    ]),
+    (3, "Índice de busca textual (FTS5) sobre livros e autores", [
+        # rowid de livros_fts = rowid do livro correspondente em livros.
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS livros_fts USING fts5(
+            titulo, sinopse, editora, autores,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_livros_fts_insert AFTER INSERT ON livros BEGIN
+            INSERT INTO livros_fts (rowid, titulo, sinopse, editora, autores)
+            VALUES (NEW.rowid, NEW.titulo, NEW.sinopse, NEW.editora, {SQL_NOMES_AUTORES.format(livro_id='NEW.id_livro')});
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_livros_fts_delete AFTER DELETE ON livros BEGIN
+            DELETE FROM livros_fts WHERE rowid = OLD.rowid;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_livros_fts_update AFTER UPDATE OF titulo, sinopse, editora ON livros BEGIN
+            UPDATE livros_fts SET titulo = NEW.titulo, sinopse = NEW.sinopse, editora = NEW.editora
+            WHERE rowid = NEW.rowid;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_livros_autores_fts_insert AFTER INSERT ON livros_autores BEGIN
+            UPDATE livros_fts SET autores = {SQL_NOMES_AUTORES.format(livro_id='NEW.livro_id')}
+            WHERE rowid = (SELECT rowid FROM livros WHERE id_livro = NEW.livro_id);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_livros_autores_fts_delete AFTER DELETE ON livros_autores BEGIN
+            UPDATE livros_fts SET autores = {SQL_NOMES_AUTORES.format(livro_id='OLD.livro_id')}
+            WHERE rowid = (SELECT rowid FROM livros WHERE id_livro = OLD.livro_id);
+        END
+        """,
+        SQL_GATILHO_AUTORES_FTS,
+        reconstruir_indice_busca,
+    ]),
+    (4, "Índice (titulo, id_livro) para a paginação por chave", [
+        "CREATE INDEX IF NOT EXISTS idx_livros_titulo ON livros (titulo, id_livro)",
+    ]),
+    (5, "Datas de autores e empréstimos gravadas como dia ordinal (INTEGER)", [
+        _converter_datas,
+    ]),
+    (6, "Índices para consultas de empréstimos em aberto, por usuário e por livro", [
+        # Parciais: só os empréstimos em aberto entram, então o relatório diário
+        # de atrasos não percorre o histórico de devoluções.
+        """
+        CREATE INDEX IF NOT EXISTS idx_emprestimos_abertos
+        ON emprestimos (data_devolucao_prevista) WHERE data_devolucao_efetiva IS NULL
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_emprestimos_abertos_livro
+        ON emprestimos (livro_id) WHERE data_devolucao_efetiva IS NULL
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_emprestimos_usuario ON emprestimos (nome_usuario, data_emprestimo)",
+        # Substitui idx_emprestimos_livro: também entrega o histórico já ordenado.
+        "CREATE INDEX IF NOT EXISTS idx_emprestimos_livro_data ON emprestimos (livro_id, data_emprestimo)",
+        "DROP INDEX IF EXISTS idx_emprestimos_livro",
+    ]),
+    (7, "Nome normalizado de autores para a busca sem diferenciar maiúsculas", [
+        _adicionar_coluna("autores", "nome_normalizado", "TEXT"),
+        _preencher_nomes_normalizados,
+        "CREATE INDEX IF NOT EXISTS idx_autores_nome_normalizado ON autores (nome_normalizado)",
+    ]),
+    (8, "Remoção de vínculos e empréstimos órfãos (antes de ativar as chaves estrangeiras)", [
+        # Até aqui foreign_keys ficava desligado e o ON DELETE CASCADE não agia.
+        """
+        DELETE FROM livros_autores
+        WHERE livro_id NOT IN (SELECT id_livro FROM livros)
+           OR autor_id NOT IN (SELECT id_autor FROM autores)
+        """,
+        "DELETE FROM emprestimos WHERE livro_id NOT IN (SELECT id_livro FROM livros)",
+    ]),
+    (9, "Registro de alterações para exportações incrementais", [
+        # seq cresce a cada gravação (AUTOINCREMENT nunca reaproveita valores);
+        # uma chave sem linha correspondente na tabela indica uma remoção.
+        """
+        CREATE TABLE IF NOT EXISTS registro_alteracoes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabela TEXT NOT NULL,
+            chave TEXT NOT NULL,
+            UNIQUE (tabela, chave)
+        )
+        """,
+        *_gatilhos_registro_alteracoes("livros", "id_livro", "livros"),
+        # Os autores fazem parte do livro exportado: mudar os vínculos altera o livro.
+        *_gatilhos_registro_alteracoes("livros_autores", "livro_id", "livros", eventos=("INSERT", "DELETE")),
+        *_gatilhos_registro_alteracoes("autores", "id_autor", "autores"),
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_autores_alteracoes_livros AFTER UPDATE OF nome ON autores BEGIN
+            INSERT OR REPLACE INTO registro_alteracoes (tabela, chave)
+            SELECT 'livros', livro_id FROM livros_autores WHERE autor_id = NEW.id_autor;
+        END
+        """,
+        *_gatilhos_registro_alteracoes("emprestimos", "id_emprestimo", "emprestimos"),
+    ]),
+    (10, "Tabelas de estatísticas mantidas por gatilhos", [
+        # Uma linha com os totais e uma por grupo (editora, ano, autor, mês, livro):
+        # os painéis leem as contagens prontas, sem percorrer livros ou empréstimos.
+        f"""
+        CREATE TABLE IF NOT EXISTS estatisticas (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            {", ".join(f"{chave} INTEGER NOT NULL" for chave in CHAVES_ESTATISTICAS)}
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS estatisticas_editoras (
+            editora TEXT PRIMARY KEY, -- '' para livros sem editora
+            livros INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS estatisticas_anos (
+            ano INTEGER PRIMARY KEY, -- 0 para livros sem ano de publicação
+            livros INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS estatisticas_autores (
+            autor_id TEXT PRIMARY KEY,
+            livros INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS estatisticas_emprestimos_mes (
+            mes TEXT PRIMARY KEY, -- 'YYYY-MM' da data do empréstimo
+            emprestimos INTEGER NOT NULL,
+            devolvidos INTEGER NOT NULL,
+            dias_emprestados INTEGER NOT NULL -- soma das durações dos devolvidos
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS estatisticas_livros_emprestimos (
+            livro_id TEXT PRIMARY KEY,
+            emprestimos INTEGER NOT NULL
+        )
+        """,
+        # Rankings ("editoras com mais livros") leem o índice do maior para o menor.
+        "CREATE INDEX IF NOT EXISTS idx_estatisticas_editoras_livros ON estatisticas_editoras (livros)",
+        "CREATE INDEX IF NOT EXISTS idx_estatisticas_autores_livros ON estatisticas_autores (livros)",
+        "CREATE INDEX IF NOT EXISTS idx_estatisticas_livros_emprestimos ON estatisticas_livros_emprestimos (emprestimos)",
+        *_gatilhos_estatisticas(),
+        recalcular_estatisticas,
+    ]),
+    (11, "Índice do ISBN compacto para o filtro por prefixo", [
+        # O ISBN é gravado como digitado (com ou sem hífens); o filtro compara a forma compacta.
+        f"CREATE INDEX IF NOT EXISTS idx_livros_isbn_compacto ON livros ({SQL_ISBN_COMPACTO})",
+    ]),
+]
+
+VERSAO_ATUAL = MIGRACOES[-1][0]
+
+
+def obter_versao_esquema(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def aplicar_migracoes(gerenciador=gerenciador_conexoes, progresso=None) -> list[int]:
+    """Aplica, em ordem, as migrações ainda não registradas no banco.
+
+    Retorna a lista das versões aplicadas (vazia se o esquema já estava atualizado).
+    Com ``progresso(fracao, mensagem)``, relata cada migração antes de aplicá-la.
+    """
+    conn = gerenciador.obter_conexao()
+    aplicadas = []
+    if obter_versao_esquema(conn) >= VERSAO_ATUAL:
+        return aplicadas
+
+    # Com chaves estrangeiras ativas, recriar uma tabela (DROP + RENAME) apagaria
+    # em cascata as linhas que a referenciam. O PRAGMA só muda fora de transação.
+    chaves_estrangeiras = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for versao, descricao, passos in MIGRACOES:
+            with gerenciador.transacao(imediata=True) as cursor:
+                # Relido dentro da transação: outro processo pode ter migrado antes.
+                if obter_versao_esquema(conn) >= versao:
+                    continue
+                if progresso:
+                    progresso((versao - 1) / VERSAO_ATUAL, f"Atualizando o banco: {descricao.lower()}...")
+                for passo in passos:
+                    if callable(passo):
+                        passo(cursor)
+                    else:
+                        cursor.execute(passo)
+                cursor.execute(f"PRAGMA user_version = {versao}")
+            print(f"Migração {versao} aplicada: {descricao}.")
+            aplicadas.append(versao)
+    finally:
+        if chaves_estrangeiras:
+            conn.execute("PRAGMA foreign_keys = ON")
+
+    invalidas = conn.execute("PRAGMA foreign_key_check").fetchall()
+    if invalidas:
+        print(f"Aviso: {len(invalidas)} referência(s) inválida(s) após as migrações "
+              f"(ex.: tabela {invalidas[0][0]}, rowid {invalidas[0][1]}).")
+    return aplicadas
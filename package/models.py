@@ -1,13 +1,31 @@
 import uuid
 from datetime import date
+from typing import NamedTuple
 
 class Autor:
+    __slots__ = ('_id_autor', '_nome', '_data_nascimento', '_biografia')
+
     def __init__(self, nome: str, data_nascimento: date = None, biografia: str = "", id_autor: str = None):
         self._id_autor = id_autor if id_autor else str(uuid.uuid4())
         self._nome = nome
         self._data_nascimento = data_nascimento
         self._biografia = biografia
 
+    @classmethod
+    def de_linha_bd(cls, id_autor: str, nome: str, data_nascimento: date | None, biografia: str) -> "Autor":
+        """Construção rápida para linhas já validadas vindas do banco (sem gerar ID nem validar)."""
+        autor = cls.__new__(cls)
+        autor._id_autor = id_autor
+        autor._nome = nome
+        autor._data_nascimento = data_nascimento
+        autor._biografia = biografia
+        return autor
+
+    @staticmethod
+    def normalizar_nome(nome: str) -> str:
+        """Forma usada para comparar nomes: sem diferenciar maiúsculas nem espaços repetidos."""
+        return " ".join(nome.split()).casefold()
+
     @property
     def id_autor(self) -> str:
         return self._id_autor
@@ -47,10 +65,23 @@ class Autor:
         return f"Autor(nome='{self._nome}', id_autor='{self._id_autor}')"
 
 class ItemBiblioteca:
+    __slots__ = ('_id_item', '_titulo', '_ano_publicacao', '_alterados')
+
     def __init__(self, titulo: str, ano_publicacao: int = None, id_item: str = None):
         self._id_item = id_item if id_item else str(uuid.uuid4())
         self._titulo = titulo
         self._ano_publicacao = ano_publicacao
+        # Campos alterados desde a leitura do banco; None quando o objeto não veio
+        # do banco (não há com o que comparar e a gravação deve ser completa).
+        self._alterados: set[str] | None = None
+
+    def _registrar_alteracao(self, campo: str, valor_atual, novo_valor):
+        if self._alterados is not None and valor_atual != novo_valor:
+            self._alterados.add(campo)
+
+    @property
+    def campos_alterados(self) -> set[str] | None:
+        return self._alterados
 
     @property
     def id_item(self) -> str:
@@ -64,6 +95,7 @@ class ItemBiblioteca:
     def titulo(self, titulo: str):
         if not titulo or not isinstance(titulo, str):
             raise ValueError("Título não pode ser vazio e deve ser uma string.")
+        self._registrar_alteracao('titulo', self._titulo, titulo)
         self._titulo = titulo
 
     @property
@@ -74,6 +106,7 @@ class ItemBiblioteca:
     def ano_publicacao(self, ano: int):
         if ano and (not isinstance(ano, int) or ano > date.today().year):
             raise ValueError(f"Ano de publicação deve ser um número inteiro válido e não futuro (até {date.today().year}).")
+        self._registrar_alteracao('ano_publicacao', self._ano_publicacao, ano)
         self._ano_publicacao = ano
 
     def obter_descricao_curta(self) -> str: 
@@ -84,22 +117,70 @@ class ItemBiblioteca:
 
 
 class Livro(ItemBiblioteca):
-    def __init__(self, titulo: str, isbn: str = "", editora: str = "", numero_paginas: int = 0,
+    __slots__ = ('_isbn', '_editora', '_numero_paginas', '_sinopse', '_autores', '_ids_autores_gravados')
+
+    def __init__(self, titulo: str, isbn: str | None = None, editora: str = "", numero_paginas: int = 0,
                  sinopse: str = "", ano_publicacao: int = None, id_livro: str = None,
                  autores: list[Autor] = None):
         super().__init__(titulo, ano_publicacao, id_item=id_livro)
-        self._isbn = isbn
+        self._isbn = self.normalizar_isbn(isbn)
         self._editora = editora
         self._numero_paginas = numero_paginas
         self._sinopse = sinopse
         self._autores = autores if autores else []
+        self._ids_autores_gravados: tuple[str, ...] | None = None
+
+    @classmethod
+    def de_linha_bd(cls, id_livro: str, titulo: str, ano_publicacao: int | None, isbn: str | None, editora: str,
+                    numero_paginas: int, sinopse: str, autores: list[Autor]) -> "Livro":
+        """Construção rápida para linhas já validadas vindas do banco (sem gerar ID nem validar)."""
+        livro = cls.__new__(cls)
+        livro._id_item = id_livro
+        livro._titulo = titulo
+        livro._ano_publicacao = ano_publicacao
+        livro._isbn = cls.normalizar_isbn(isbn)
+        livro._editora = editora
+        livro._numero_paginas = numero_paginas
+        livro._sinopse = sinopse
+        livro._autores = autores
+        livro._alterados = set()
+        livro._ids_autores_gravados = tuple([autor._id_autor for autor in autores])
+        return livro
+
+    def marcar_como_gravado(self):
+        """Toma o estado atual como o gravado no banco (zera os campos alterados)."""
+        self._alterados = set()
+        self._ids_autores_gravados = tuple(autor.id_autor for autor in self._autores)
+
+    @property
+    def ids_autores_gravados(self) -> tuple[str, ...] | None:
+        """IDs dos autores vinculados no banco, na ordem, quando o livro foi lido ou gravado."""
+        return self._ids_autores_gravados
+
+    def possui_alteracoes(self) -> bool:
+        """Há algo a gravar? Sempre True para objetos sem estado gravado conhecido."""
+        if self._alterados is None or self._ids_autores_gravados is None:
+            return True
+        return bool(self._alterados) or \
+            self._ids_autores_gravados != tuple(autor.id_autor for autor in self._autores)
+
+    @staticmethod
+    def normalizar_isbn(isbn: str | None) -> str | None:
+        """ISBN sem espaços nas pontas; vazio vira None (NULL no banco).
+
+        Vários livros podem não ter ISBN, e a coluna é UNIQUE: só NULL não colide.
+        Com um único valor para "sem ISBN", regravar o mesmo livro não o marca como alterado.
+        """
+        return (isbn.strip() or None) if isbn else None
 
     @property
-    def isbn(self) -> str:
+    def isbn(self) -> str | None:
         return self._isbn
 
     @isbn.setter
-    def isbn(self, isbn: str):
+    def isbn(self, isbn: str | None):
+        isbn = self.normalizar_isbn(isbn)
+        self._registrar_alteracao('isbn', self._isbn, isbn)
         self._isbn = isbn
 
     @property
@@ -108,6 +189,7 @@ class Livro(ItemBiblioteca):
     
     @editora.setter
     def editora(self, editora: str):
+        self._registrar_alteracao('editora', self._editora, editora)
         self._editora = editora
 
     @property
@@ -118,6 +200,7 @@ class Livro(ItemBiblioteca):
     def numero_paginas(self, num_paginas: int):
         if not isinstance(num_paginas, int) or num_paginas < 0:
             raise ValueError("Número de páginas deve ser um inteiro não negativo.")
+        self._registrar_alteracao('numero_paginas', self._numero_paginas, num_paginas)
         self._numero_paginas = num_paginas
         
     @property
@@ -126,6 +209,7 @@ class Livro(ItemBiblioteca):
 
     @sinopse.setter
     def sinopse(self, sinopse: str):
+        self._registrar_alteracao('sinopse', self._sinopse, sinopse)
         self._sinopse = sinopse
 
     @property
@@ -142,6 +226,16 @@ class Livro(ItemBiblioteca):
         if autor in self._autores:
             self._autores.remove(autor)
 
+    def definir_autores(self, autores: list[Autor]):
+        """Troca todos os autores, na ordem dada (repetidos entram uma vez)."""
+        novos = []
+        for autor in autores:
+            if not isinstance(autor, Autor):
+                raise TypeError("Só é possível adicionar objetos do tipo Autor.")
+            if autor not in novos:
+                novos.append(autor)
+        self._autores[:] = novos
+
     def obter_descricao_curta(self) -> str:
         nomes_autores = ", ".join([autor.nome for autor in self._autores]) if self._autores else "Desconhecido"
         return f"Livro: {self.titulo} por {nomes_autores} (Ano: {self.ano_publicacao if self.ano_publicacao else 'N/A'})"
@@ -149,7 +243,31 @@ class Livro(ItemBiblioteca):
     def __repr__(self) -> str:
         return f"Livro(titulo='{self.titulo}', isbn='{self.isbn}', id_item='{self.id_item}')"
 
+class LivroResumo(NamedTuple):
+    """Linha somente leitura com as colunas que as listagens exibem.
+
+    ``autores`` já vem com os nomes unidos por vírgula; não há objetos Autor.
+    """
+    id_livro: str
+    titulo: str
+    autores: str
+    isbn: str | None
+    ano_publicacao: int | None
+
+    @classmethod
+    def de_livro(cls, livro: Livro) -> "LivroResumo":
+        return cls(
+            livro.id_item,
+            livro.titulo,
+            ", ".join(autor.nome for autor in livro.autores),
+            livro.isbn,
+            livro.ano_publicacao
+        )
+
 class Emprestimo:
+    __slots__ = ('_id_emprestimo', '_livro', '_nome_usuario', '_data_emprestimo',
+                 '_data_devolucao_prevista', '_data_devolucao_efetiva')
+
     def __init__(self, livro: Livro, nome_usuario: str, data_emprestimo: date, data_devolucao_prevista: date, id_emprestimo: str = None):
         if not isinstance(livro, Livro):
             raise TypeError("Empréstimo deve ser de um objeto Livro.")
@@ -163,6 +281,19 @@ class Emprestimo:
         self._data_devolucao_prevista = data_devolucao_prevista
         self._data_devolucao_efetiva = None
 
+    @classmethod
+    def de_linha_bd(cls, id_emprestimo: str, livro: Livro, nome_usuario: str, data_emprestimo: date,
+                    data_devolucao_prevista: date, data_devolucao_efetiva: date | None) -> "Emprestimo":
+        """Construção rápida para linhas já validadas vindas do banco (sem validar nem imprimir)."""
+        emprestimo = cls.__new__(cls)
+        emprestimo._id_emprestimo = id_emprestimo
+        emprestimo._livro = livro
+        emprestimo._nome_usuario = nome_usuario
+        emprestimo._data_emprestimo = data_emprestimo
+        emprestimo._data_devolucao_prevista = data_devolucao_prevista
+        emprestimo._data_devolucao_efetiva = data_devolucao_efetiva
+        return emprestimo
+
     @property
     def id_emprestimo(self) -> str:
         return self._id_emprestimo
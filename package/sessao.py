@@ -0,0 +1,175 @@
+from .models import Autor, Livro, Emprestimo
+from .conexao import gerenciador_conexoes
+from .instrumentacao import instrumentar
+from .database import (
+    cache_autores,
+    cache_livros,
+    buscar_livro_por_id_bd,
+    buscar_autor_por_id_bd,
+    _resolver_autores,
+    _inserir_autores,
+    _inserir_livro,
+    _atualizar_livro,
+    _remover_livro,
+    _inserir_emprestimo,
+    _atualizar_emprestimo,
+)
+
+
+class Sessao:
+    """Unidade de trabalho: acumula alterações e as grava juntas.
+
+    As operações são apenas registradas; ``gravar()`` executa todas, na ordem em
+    que foram pedidas, em uma única transação da conexão da thread. Se qualquer
+    uma falhar, nada é gravado e o erro (sqlite3.Error) é propagado.
+
+    Como gerenciador de contexto, grava ao sair do bloco, ou descarta as
+    operações se uma exceção escapar dele::
+
+        with Sessao() as sessao:
+            livro.autores.extend(sessao.resolver_autores(["Machado de Assis"]))
+            sessao.adicionar_livro(livro)
+    """
+
+    def __init__(self, gerenciador=gerenciador_conexoes):
+        self._gerenciador = gerenciador
+        self._operacoes: list[tuple] = []  # (função(cursor, ...), argumentos)
+        self._livros_alterados: set[str] = set()
+        self._autores_alterados: set[str] = set()
+        self._autores_novos: dict[str, Autor] = {}  # nome normalizado -> autor ainda não gravado
+        self._autores_a_confirmar: list[Autor] = []  # criados por resolver_autores (ver _confirmar_autores)
+        self._livros_gravados: list[Livro] = []  # marcados como gravados após o commit
+
+    def __enter__(self) -> "Sessao":
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, traceback):
+        if tipo_excecao is None:
+            self.gravar()
+        else:
+            self.descartar()
+        return False
+
+    def __len__(self) -> int:
+        return len(self._operacoes)
+
+    def _registrar(self, funcao, *args):
+        self._operacoes.append((funcao, args))
+
+    def adicionar_autor(self, autor: Autor):
+        self._autores_alterados.add(autor.id_autor)
+        self._autores_novos.setdefault(Autor.normalizar_nome(autor.nome), autor)
+        self._registrar(_inserir_autores, [autor])
+
+    def resolver_autores(self, nomes: list[str]) -> list[Autor]:
+        """Como ``resolver_autores_bd``, mas os autores que faltam só são gravados com a sessão.
+
+        A consulta feita aqui só adianta os autores já cadastrados. Se um autor
+        deve ser criado é decidido de novo na transação de ``gravar()``: se outro
+        processo cadastrou o nome nesse meio-tempo, os livros da sessão passam a
+        usar o autor gravado em vez de criar um homônimo.
+        """
+        conn = self._gerenciador.obter_conexao()
+        pendentes = [nome for nome in nomes if Autor.normalizar_nome(nome) not in self._autores_novos]
+        encontrados, novos = _resolver_autores(conn.cursor(), pendentes, inserir=False)
+        for autor in novos:
+            self._autores_novos[Autor.normalizar_nome(autor.nome)] = autor
+            self._autores_a_confirmar.append(autor)
+        por_nome = {Autor.normalizar_nome(autor.nome): autor for autor in encontrados}
+        por_nome.update(self._autores_novos)
+        chaves = (Autor.normalizar_nome(nome) for nome in nomes)
+        return list({chave: por_nome[chave] for chave in chaves if chave}.values())
+
+    def adicionar_livro(self, livro: Livro):
+        self._livros_alterados.add(livro.id_item)
+        self._livros_gravados.append(livro)
+        self._registrar(_inserir_livro, livro)
+
+    def atualizar_livro(self, livro: Livro):
+        """Registra a gravação das alterações do livro (só as colunas e vínculos que mudaram)."""
+        self._livros_alterados.add(livro.id_item)
+        self._livros_gravados.append(livro)
+        self._registrar(_atualizar_livro, livro)
+
+    def remover_livro(self, id_livro: str):
+        self._livros_alterados.add(id_livro)
+        self._registrar(_remover_livro, id_livro)
+
+    def adicionar_emprestimo(self, emprestimo: Emprestimo):
+        self._registrar(_inserir_emprestimo, emprestimo)
+
+    def atualizar_emprestimo(self, emprestimo: Emprestimo):
+        self._registrar(_atualizar_emprestimo, emprestimo)
+
+    def buscar_livro(self, id_livro: str) -> Livro | None:
+        return buscar_livro_por_id_bd(id_livro)
+
+    def buscar_autor(self, id_autor: str) -> Autor | None:
+        return buscar_autor_por_id_bd(id_autor)
+
+    def _confirmar_autores(self, cursor):
+        """Grava os autores criados por ``resolver_autores``, já dentro da transação.
+
+        Com BEGIN IMMEDIATE nenhum outro escritor grava entre esta consulta e o
+        commit; os nomes cadastrados por outro processo desde ``resolver_autores``
+        são trocados, nos livros da sessão, pelo autor gravado.
+        """
+        if not self._autores_a_confirmar:
+            return
+        resolvidos, criados = _resolver_autores(
+            cursor, [autor.nome for autor in self._autores_a_confirmar], inserir=False)
+        ids_criados = {id(autor) for autor in criados}
+        substitutos = {}
+        inserir = []
+        for autor, resolvido in zip(self._autores_a_confirmar, resolvidos):
+            if id(resolvido) in ids_criados:
+                inserir.append(autor)
+            else:
+                substitutos[autor.id_autor] = resolvido
+        _inserir_autores(cursor, inserir)
+        if substitutos:
+            for livro in self._livros_gravados:
+                livro.definir_autores([substitutos.get(autor.id_autor, autor) for autor in livro.autores])
+
+    @instrumentar
+    def gravar(self) -> bool:
+        """Executa as operações pendentes em uma única transação.
+
+        Retorna True quando tudo foi gravado (ou não havia nada a gravar); em caso
+        de erro, propaga o sqlite3.Error depois de desfazer a transação.
+        """
+        # Atualizações de livros sem nenhuma alteração não abrem transação.
+        self._operacoes = [(funcao, args) for funcao, args in self._operacoes
+                           if funcao is not _atualizar_livro or args[0].possui_alteracoes()]
+        if not self._operacoes and not self._autores_a_confirmar:
+            self.descartar()
+            return True
+        try:
+            with self._gerenciador.transacao(imediata=True) as cursor:
+                self._confirmar_autores(cursor)
+                for funcao, args in self._operacoes:
+                    funcao(cursor, *args)
+        except Exception:
+            # Só sai do cache o que a falha deixou divergente do banco: as
+            # instâncias em cache que a sessão alterou. As demais continuam válidas.
+            for livro in self._livros_gravados:
+                if cache_livros.espiar(livro.id_item) is livro:
+                    cache_livros.invalidar(livro.id_item)
+            raise
+        else:
+            cache_livros.invalidar(*self._livros_alterados)
+            cache_autores.invalidar(*self._autores_alterados)
+            for livro in self._livros_gravados:
+                livro.marcar_como_gravado()
+        finally:
+            self.descartar()
+        return True
+
+    def descartar(self):
+        """Esquece as operações pendentes sem gravá-las."""
+        self._operacoes.clear()
+        self._livros_alterados.clear()
+        self._autores_alterados.clear()
+        self._autores_novos.clear()
+        self._autores_a_confirmar.clear()
+        self._livros_gravados.clear()
@@ -0,0 +1,34 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Os testes nunca usam data/biblioteca.db: o caminho é definido antes de o
+# pacote ser importado, e cada teste troca para um banco próprio.
+os.environ["BIBLIOTECA_BD"] = os.path.join(tempfile.mkdtemp(), "biblioteca.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from package.conexao import gerenciador_conexoes
+from package.database import cache_autores, cache_livros, inicializar_bd
+
+
+@pytest.fixture
+def caminho_bd(tmp_path, monkeypatch):
+    """Caminho de um banco novo (ainda não criado), usado por todo o pacote durante o teste."""
+    caminho = str(tmp_path / "biblioteca.db")
+    monkeypatch.setenv("BIBLIOTECA_BD", caminho)
+    gerenciador_conexoes.definir_caminho(caminho)
+    cache_livros.limpar()
+    cache_autores.limpar()
+    yield caminho
+    gerenciador_conexoes.fechar_todas()
+    cache_livros.limpar()
+    cache_autores.limpar()
+
+
+@pytest.fixture
+def banco(caminho_bd):
+    """Banco criado pela aplicação, com o esquema na versão atual."""
+    inicializar_bd()
+    return caminho_bd
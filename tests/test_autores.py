@@ -0,0 +1,18 @@
+from package.database import adicionar_autor_bd, listar_autores_bd, resolver_autores_bd
+from package.models import Autor
+
+
+def test_resolver_autores_sem_diferenciar_maiusculas(banco):
+    primeiros = resolver_autores_bd(["Érico Veríssimo", "Ana"])
+    segundos = resolver_autores_bd(["ÉRICO VERÍSSIMO", "  ana ", "Bia", "bia"])
+
+    assert [autor.id_autor for autor in segundos[:2]] == [autor.id_autor for autor in primeiros]
+    assert len(segundos) == 3
+    assert sorted(autor.nome for autor in listar_autores_bd()) == ["Ana", "Bia", "Érico Veríssimo"]
+
+
+def test_adicionar_autor_repetido_falha(banco):
+    autor = Autor("Ana")
+    assert adicionar_autor_bd(autor)
+    assert not adicionar_autor_bd(autor)
+    assert [a.id_autor for a in listar_autores_bd()] == [autor.id_autor]
@@ -0,0 +1,93 @@
+import pytest
+
+from package.cache import CacheLRU
+from package.database import (TAMANHO_CACHE_AUTORES, TAMANHO_CACHE_LIVROS, adicionar_autor_bd, adicionar_livro_bd,
+                              atualizar_livro_bd, buscar_autor_por_id_bd, buscar_livro_por_id_bd, configurar_cache,
+                              listar_livros_bd, remover_livro_bd)
+from package.models import Autor, Livro
+
+
+def test_descarta_o_usado_ha_mais_tempo():
+    cache = CacheLRU(2)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    assert cache.obter("a") == 1
+    cache.guardar("c", 3)
+
+    assert (cache.espiar("a"), cache.espiar("b"), cache.espiar("c")) == (1, None, 3)
+    assert cache.descartes == 1
+
+
+def test_espiar_nao_altera_ordem_nem_contadores():
+    cache = CacheLRU(2)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    assert cache.espiar("a") == 1
+    cache.guardar("c", 3)
+
+    assert cache.espiar("a") is None
+    assert (cache.acertos, cache.falhas) == (0, 0)
+
+
+def test_redimensionar_descarta_excedentes():
+    cache = CacheLRU(3)
+    for chave in "abc":
+        cache.guardar(chave, chave)
+
+    cache.redimensionar(1)
+
+    assert len(cache) == 1 and cache.espiar("c") == "c"
+    cache.redimensionar(0)
+    cache.guardar("d", "d")
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        cache.redimensionar(-1)
+
+
+@pytest.fixture
+def livro_gravado(banco) -> Livro:
+    livro = Livro("Dom Casmurro", autores=[Autor("Machado de Assis")])
+    assert adicionar_livro_bd(livro)
+    return livro
+
+
+def test_leituras_por_id_devolvem_a_mesma_instancia(livro_gravado):
+    livro = buscar_livro_por_id_bd(livro_gravado.id_item)
+    assert livro is buscar_livro_por_id_bd(livro_gravado.id_item)
+
+    autor = buscar_autor_por_id_bd(livro.autores[0].id_autor)
+    assert autor is buscar_autor_por_id_bd(autor.id_autor)
+    # Livros carregados depois reaproveitam o autor que já está no mapa de identidade.
+    assert listar_livros_bd()[0].autores[0] is autor
+
+
+def test_gravacoes_invalidam_o_cache(livro_gravado):
+    livro = buscar_livro_por_id_bd(livro_gravado.id_item)
+    livro.titulo = "Dom Casmurro (edição revista)"
+    assert atualizar_livro_bd(livro)
+
+    relido = buscar_livro_por_id_bd(livro.id_item)
+    assert relido is not livro
+    assert relido.titulo == "Dom Casmurro (edição revista)"
+
+    assert remover_livro_bd(livro.id_item)
+    assert buscar_livro_por_id_bd(livro.id_item) is None
+
+
+def test_autor_regravado_nao_fica_em_cache(banco):
+    autor = Autor("Clarice Lispector")
+    assert adicionar_autor_bd(autor)
+    lido = buscar_autor_por_id_bd(autor.id_autor)
+
+    assert buscar_autor_por_id_bd(autor.id_autor) is lido
+    assert adicionar_autor_bd(autor) is False
+    assert buscar_autor_por_id_bd(autor.id_autor) is not lido
+
+
+def test_cache_desativado(livro_gravado):
+    configurar_cache(tamanho_livros=0)
+    try:
+        primeiro = buscar_livro_por_id_bd(livro_gravado.id_item)
+        assert buscar_livro_por_id_bd(livro_gravado.id_item) is not primeiro
+    finally:
+        configurar_cache(TAMANHO_CACHE_AUTORES, TAMANHO_CACHE_LIVROS)
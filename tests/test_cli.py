@@ -0,0 +1,47 @@
+import sqlite3
+
+from package.cli import main
+
+
+def _executar(capsys, *argv) -> tuple[int, str, str]:
+    codigo = main(list(argv))
+    saida = capsys.readouterr()
+    return codigo, saida.out, saida.err
+
+
+def test_adicionar_listar_e_buscar_usam_o_mesmo_separador_de_autores(banco, capsys):
+    codigo, id_livro, _ = _executar(capsys, "adicionar", "Memórias Póstumas", "--autores", "Machado; Alencar",
+                                    "--ano", "1881")
+    assert codigo == 0
+    id_livro = id_livro.strip()
+
+    _, listagem, _ = _executar(capsys, "listar")
+    _, busca, _ = _executar(capsys, "buscar", "memórias")
+
+    linhas_listagem = [linha.split("\t") for linha in listagem.splitlines()]
+    linhas_busca = [linha.split("\t") for linha in busca.splitlines()]
+    assert linhas_listagem == [["id_livro", "titulo", "autores", "isbn", "ano_publicacao"],
+                               [id_livro, "Memórias Póstumas", "Machado, Alencar", "", "1881"]]
+    assert linhas_busca[0] == ["id_livro", "titulo", "autores", "trecho"]
+    assert linhas_busca[1][:3] == [id_livro, "Memórias Póstumas", "Machado, Alencar"]
+
+
+def test_erros_do_banco_vao_para_stderr(banco, capsys):
+    _executar(capsys, "adicionar", "Dom Casmurro")
+    conn = sqlite3.connect(banco)
+    conn.execute("DROP TABLE livros_fts")
+    conn.commit()
+    conn.close()
+
+    codigo, saida, erros = _executar(capsys, "buscar", "casmurro")
+
+    assert codigo == 0
+    assert saida == "id_livro\ttitulo\tautores\ttrecho\n"
+    assert "Erro ao buscar livros" in erros
+
+
+def test_migracoes_nao_aparecem_na_saida(caminho_bd, capsys):
+    codigo, saida, _ = _executar(capsys, "listar", "--formato", "jsonl")
+
+    assert codigo == 0
+    assert saida == ""
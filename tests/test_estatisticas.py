@@ -0,0 +1,80 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from package.conexao import gerenciador_conexoes
+from package.database import (adicionar_emprestimo_bd, adicionar_livro_bd, atualizar_emprestimo_bd,
+                              atualizar_livro_bd, remover_livro_bd, resolver_autores_bd)
+from package.migracoes import recalcular_estatisticas
+from package.models import Emprestimo, Livro
+
+TABELAS_ESTATISTICAS = ("estatisticas", "estatisticas_editoras", "estatisticas_anos", "estatisticas_autores",
+                        "estatisticas_emprestimos_mes", "estatisticas_livros_emprestimos")
+EDITORAS = [None, "", "Globo", "Rocco", "Companhia"]
+ANOS = [None, 1899, 1990, 2024]
+NOMES = ["Ana", "Bia", "Caio", "Dora", "Eva"]
+
+
+def _fotografar() -> dict[str, list[tuple]]:
+    conn = gerenciador_conexoes.obter_conexao()
+    return {tabela: sorted(tuple(linha) for linha in conn.execute(f"SELECT * FROM {tabela}"))
+            for tabela in TABELAS_ESTATISTICAS}
+
+
+def _conferir():
+    mantidas = _fotografar()
+    with gerenciador_conexoes.transacao() as cursor:
+        recalcular_estatisticas(cursor)
+    assert mantidas == _fotografar()
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_gatilhos_mantem_estatisticas_iguais_a_recontagem(banco, semente):
+    rng = random.Random(semente)
+    livros: dict[str, Livro] = {}
+    emprestimos: list[Emprestimo] = []
+
+    def novo_livro():
+        livro = Livro(f"Livro {rng.random()}", isbn=rng.choice([None, str(rng.random())]),
+                      editora=rng.choice(EDITORAS), ano_publicacao=rng.choice(ANOS))
+        livro.definir_autores(resolver_autores_bd(rng.sample(NOMES, rng.randint(0, 3))))
+        assert adicionar_livro_bd(livro)
+        livros[livro.id_item] = livro
+
+    def alterar_livro():
+        livro = livros[rng.choice(list(livros))]
+        livro.editora = rng.choice(EDITORAS)
+        livro.ano_publicacao = rng.choice(ANOS)
+        livro.definir_autores(resolver_autores_bd(rng.sample(NOMES, rng.randint(0, 3))))
+        assert atualizar_livro_bd(livro)
+
+    def remover_livro():
+        id_livro = rng.choice(list(livros))
+        assert remover_livro_bd(id_livro)
+        del livros[id_livro]
+        emprestimos[:] = [e for e in emprestimos if e.livro.id_item != id_livro]
+
+    def emprestar():
+        inicio = date(2023, 1, 1) + timedelta(days=rng.randint(0, 700))
+        emprestimo = Emprestimo(livros[rng.choice(list(livros))], f"usuario {rng.randint(1, 4)}",
+                                inicio, inicio + timedelta(days=14))
+        assert adicionar_emprestimo_bd(emprestimo)
+        emprestimos.append(emprestimo)
+
+    def devolver():
+        emprestimo = rng.choice(emprestimos)
+        emprestimo.registrar_devolucao(emprestimo.data_emprestimo + timedelta(days=rng.randint(0, 30)))
+        assert atualizar_emprestimo_bd(emprestimo)
+        emprestimos.remove(emprestimo)
+
+    for passo in range(300):
+        operacoes = [novo_livro]
+        if livros:
+            operacoes += [alterar_livro, remover_livro, emprestar, emprestar]
+        if emprestimos:
+            operacoes += [devolver, devolver]
+        rng.choice(operacoes)()
+        if passo % 50 == 49:
+            _conferir()
+    _conferir()
@@ -0,0 +1,105 @@
+import io
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from datetime import date
+
+from package.conexao import gerenciador_conexoes
+from package.database import (adicionar_emprestimo_bd, adicionar_livro_bd, atualizar_emprestimo_bd,
+                              atualizar_livro_bd, buscar_livro_por_id_bd, inicializar_bd, remover_livro_bd,
+                              resolver_autores_bd)
+from package.exportacao import exportar_livros_bd, exportar_sql_bd
+from package.models import Emprestimo, Livro
+
+# As tabelas do dump e as de estatísticas, que os gatilhos do banco de destino refazem.
+TABELAS = ("autores", "livros", "livros_autores", "emprestimos", "estatisticas", "estatisticas_editoras",
+           "estatisticas_anos", "estatisticas_autores", "estatisticas_emprestimos_mes")
+
+
+def _adicionar(titulo: str, isbn: str, autores: list[str]) -> Livro:
+    livro = Livro(titulo, isbn=isbn)
+    livro.definir_autores(resolver_autores_bd(autores))
+    assert adicionar_livro_bd(livro)
+    return livro
+
+
+def _linhas(caminho: str) -> dict[str, list[tuple]]:
+    conn = sqlite3.connect(caminho)
+    try:
+        return {tabela: sorted(conn.execute(f"SELECT * FROM {tabela}").fetchall()) for tabela in TABELAS}
+    finally:
+        conn.close()
+
+
+def _copia_pela_aplicacao(caminho: str, *dumps: str):
+    """Cria um banco pela aplicação em ``caminho`` e carrega nele os dumps, em ordem."""
+    original = gerenciador_conexoes.caminho
+    gerenciador_conexoes.definir_caminho(caminho)
+    try:
+        inicializar_bd()
+    finally:
+        gerenciador_conexoes.definir_caminho(original)
+    conn = sqlite3.connect(caminho)
+    try:
+        for dump in dumps:
+            conn.executescript(dump)
+    finally:
+        conn.close()
+
+
+def test_exportacao_incremental(banco, tmp_path):
+    mantido = _adicionar("Mantido", "1", ["Ana"])
+    alterado = _adicionar("Alterado", "2", ["Bia"])
+    removido = _adicionar("Removido", "3", ["Ana"])
+    emprestimo = Emprestimo(mantido, "ana", date(2024, 1, 1), date(2024, 1, 15))
+    assert adicionar_emprestimo_bd(emprestimo)
+    completo = io.StringIO()
+    marca = exportar_sql_bd(completo).marca
+
+    novo = _adicionar("Novo", "4", ["Caio"])
+    alterado = buscar_livro_por_id_bd(alterado.id_item)
+    alterado.titulo = "Alterado de novo"
+    assert atualizar_livro_bd(alterado)
+    assert remover_livro_bd(removido.id_item)
+    emprestimo.registrar_devolucao(date(2024, 1, 20))
+    assert atualizar_emprestimo_bd(emprestimo)
+
+    jsonl = io.StringIO()
+    relatorio = exportar_livros_bd(jsonl, 'jsonl', desde=marca)
+    registros = {registro["id_livro"]: registro for registro in map(json.loads, jsonl.getvalue().splitlines())}
+    assert (relatorio.linhas, relatorio.removidos) == (2, 1)
+    assert registros[novo.id_item]["autores"] == ["Caio"]
+    assert registros[alterado.id_item]["titulo"] == "Alterado de novo"
+    assert registros[removido.id_item] == {"id_livro": removido.id_item, "removido": True}
+    assert mantido.id_item not in registros
+
+    incremental = io.StringIO()
+    exportar_sql_bd(incremental, desde=marca)
+    copia = str(tmp_path / "copia.db")
+    _copia_pela_aplicacao(copia, completo.getvalue(), incremental.getvalue())
+    assert _linhas(copia) == _linhas(banco)
+
+
+def test_dump_completo_em_arquivo_vazio(banco, tmp_path):
+    livro = _adicionar("Dom Casmurro", "1", ["Machado de Assis"])
+    emprestimo = Emprestimo(livro, "ana", date(2024, 1, 1), date(2024, 1, 15))
+    assert adicionar_emprestimo_bd(emprestimo)
+    dump = io.StringIO()
+    exportar_sql_bd(dump)
+    assert "'2024-01-01'" in dump.getvalue()
+
+    vazio = str(tmp_path / "vazio.db")
+    conn = sqlite3.connect(vazio)
+    conn.executescript(dump.getvalue())
+    conn.close()
+    # A aplicação abre o arquivo (user_version 0) e aplica as migrações.
+    processo = subprocess.run([sys.executable, "-m", "package", "emprestimo", "listar"],
+                              env={**os.environ, "BIBLIOTECA_BD": vazio},
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              capture_output=True, text=True)
+
+    assert processo.returncode == 0, processo.stderr
+    assert "2024-01-01" in processo.stdout and "2024-01-15" in processo.stdout
+    assert _linhas(vazio) == _linhas(banco)
@@ -0,0 +1,40 @@
+from package.conexao import gerenciador_conexoes
+from package.database import adicionar_livro_bd, filtrar_livros_bd, resolver_autores_bd
+from package.migracoes import SQL_ISBN_COMPACTO
+from package.models import Livro
+
+
+def _adicionar(titulo: str, isbn: str | None = None, autores: tuple[str, ...] = ()) -> str:
+    livro = Livro(titulo, isbn=isbn)
+    livro.definir_autores(resolver_autores_bd(list(autores)))
+    assert adicionar_livro_bd(livro)
+    return livro.id_item
+
+
+def test_isbn_com_hifens_e_x_minusculo(banco):
+    hifens = _adicionar("Com hífens", "978-3-16-148410-0")
+    com_x = _adicionar("Com x", "0-8044-2957-x")
+    _adicionar("Outro", "9790000000000")
+
+    assert filtrar_livros_bd("9783-16") == [hifens]
+    assert filtrar_livros_bd("978 3 16 148410 0") == [hifens]
+    assert filtrar_livros_bd("080442957X") == [com_x]
+    assert filtrar_livros_bd("080442957x") == [com_x]
+
+
+def test_titulo_e_autores_por_prefixo_na_ordem_da_lista(banco):
+    machado = _adicionar("Memórias póstumas", autores=("Machado de Assis",))
+    dom = _adicionar("Dom Casmurro", autores=("Machado de Assis",))
+    _adicionar("Iracema", autores=("José de Alencar",))
+
+    assert filtrar_livros_bd("mach") == [dom, machado]
+    assert filtrar_livros_bd("dom cas") == [dom]
+    assert filtrar_livros_bd("") == []
+
+
+def test_faixa_de_isbn_usa_o_indice(banco):
+    plano = gerenciador_conexoes.obter_conexao().execute(
+        f"EXPLAIN QUERY PLAN SELECT rowid FROM livros WHERE {SQL_ISBN_COMPACTO} >= ? AND {SQL_ISBN_COMPACTO} < ?",
+        ("978", "978\uffff")
+    ).fetchall()
+    assert any("idx_livros_isbn_compacto" in linha[-1] for linha in plano)
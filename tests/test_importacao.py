@@ -0,0 +1,40 @@
+import pytest
+
+from package.database import contar_livros_bd, listar_autores_bd
+from package.importacao import importar_csv_bd, importar_jsonl_bd
+
+
+@pytest.mark.parametrize("tamanho_lote", [1, 10])
+def test_linha_rejeitada_nao_deixa_autores_orfaos(banco, tmp_path, tamanho_lote):
+    caminho = tmp_path / "livros.csv"
+    caminho.write_text(
+        "titulo,autores,isbn\n"
+        "Livro A,Ana;Bia,111\n"
+        "Livro B,Carl,111\n"  # ISBN repetido: rejeitado, e Carl não pode ficar no banco
+        "Livro C,Ana;Dora,\n"
+        "Livro D,Dora,\n",
+        encoding="utf-8"
+    )
+
+    relatorio = importar_csv_bd(str(caminho), tamanho_lote=tamanho_lote)
+
+    assert [referencia for referencia, _ in relatorio.falhas] == ["linha 3"]
+    assert relatorio.livros_inseridos == contar_livros_bd() == 3
+    assert sorted(autor.nome for autor in listar_autores_bd()) == ["Ana", "Bia", "Dora"]
+    assert relatorio.autores_inseridos == 3
+
+
+def test_importacao_relata_progresso_por_lote(banco, tmp_path):
+    caminho = tmp_path / "livros.jsonl"
+    caminho.write_text("".join(f'{{"titulo": "Livro {i}", "autores": ["Ana"]}}\n' for i in range(25)),
+                       encoding="utf-8")
+    relatos = []
+
+    relatorio = importar_jsonl_bd(str(caminho), tamanho_lote=10,
+                                  progresso=lambda fracao, mensagem: relatos.append((fracao, mensagem)))
+
+    assert relatorio.livros_inseridos == 25
+    assert len(relatos) == 3
+    fracoes = [fracao for fracao, _ in relatos]
+    assert fracoes == sorted(fracoes) and fracoes[-1] == 1.0
+    assert relatos[-1][1] == "Importando: 25 livro(s)..."
@@ -0,0 +1,69 @@
+import pytest
+
+from package.database import (adicionar_livro_bd, iterar_livros_bd, iterar_livros_resumo_bd, listar_livros_bd,
+                              listar_livros_janela_bd, listar_livros_pagina_bd, listar_livros_resumo_janela_bd)
+from package.models import Livro
+
+
+@pytest.fixture
+def acervo(banco) -> list[str]:
+    """IDs de 23 livros na ordem (titulo, id_livro), com títulos repetidos para exercitar o desempate."""
+    livros = [Livro(f"Título {i % 7:02d}") for i in range(23)]
+    for livro in livros:
+        assert adicionar_livro_bd(livro)
+    return [livro.id_item for livro in sorted(livros, key=lambda livro: (livro.titulo, livro.id_item))]
+
+
+def _ids(livros) -> list[str]:
+    return [livro.id_item for livro in livros]
+
+
+def test_paginas_cobrem_o_acervo_uma_vez_em_ordem(acervo):
+    paginas, cursor = [], None
+    while True:
+        livros, cursor = listar_livros_pagina_bd(5, cursor)
+        paginas.append(_ids(livros))
+        if cursor is None:
+            break
+
+    assert [len(pagina) for pagina in paginas] == [5, 5, 5, 5, 3]
+    assert [id_livro for pagina in paginas for id_livro in pagina] == acervo
+
+
+def test_pagina_exata_nao_deixa_cursor(acervo):
+    livros, cursor = listar_livros_pagina_bd(len(acervo))
+
+    assert _ids(livros) == acervo
+    assert cursor is None
+
+
+def test_insercao_entre_paginas_nao_repete_nem_pula_livros(acervo):
+    primeira, cursor = listar_livros_pagina_bd(10)
+    # Entra antes da posição do cursor: com OFFSET, a página seguinte repetiria um livro.
+    assert adicionar_livro_bd(Livro("A"))
+
+    restantes = []
+    while cursor is not None:
+        livros, cursor = listar_livros_pagina_bd(10, cursor)
+        restantes += _ids(livros)
+
+    assert _ids(primeira) + restantes == acervo
+
+
+def test_cursor_invalido(acervo):
+    with pytest.raises(ValueError):
+        listar_livros_pagina_bd(5, "nao-e-um-cursor")
+
+
+@pytest.mark.parametrize("tamanho_lote", [1, 4, 23, 100])
+def test_iteracao_segue_a_ordem_da_listagem(acervo, tamanho_lote):
+    assert _ids(iterar_livros_bd(tamanho_lote)) == acervo
+    assert [resumo.id_livro for resumo in iterar_livros_resumo_bd(tamanho_lote)] == acervo
+    assert _ids(listar_livros_bd()) == acervo
+
+
+def test_janelas_por_posicao(acervo):
+    assert _ids(listar_livros_janela_bd(20, 10)) == acervo[20:]
+    for inicio in range(0, len(acervo), 6):
+        assert _ids(listar_livros_janela_bd(inicio, 6)) == acervo[inicio:inicio + 6]
+        assert [resumo.id_livro for resumo in listar_livros_resumo_janela_bd(inicio, 6)] == acervo[inicio:inicio + 6]
@@ -0,0 +1,83 @@
+import sqlite3
+from datetime import date
+
+from package.database import (adicionar_emprestimo_bd, adicionar_livro_bd, buscar_autor_por_id_bd,
+                              buscar_emprestimo_por_id_bd, buscar_livros_bd, inicializar_bd)
+from package.estatisticas import obter_resumo_bd
+from package.migracoes import VERSAO_ATUAL, aplicar_migracoes
+from package.models import Emprestimo, Livro
+
+
+def _criar_banco_legado(caminho: str):
+    """Banco como os criados antes das migrações: tabelas da versão 1, datas em texto, user_version 0."""
+    conn = sqlite3.connect(caminho)
+    conn.executescript('''
+        CREATE TABLE autores (id_autor TEXT PRIMARY KEY, nome TEXT NOT NULL,
+                              data_nascimento TEXT, biografia TEXT);
+        CREATE TABLE livros (id_livro TEXT PRIMARY KEY, titulo TEXT NOT NULL, ano_publicacao INTEGER,
+                             isbn TEXT UNIQUE, editora TEXT, numero_paginas INTEGER, sinopse TEXT);
+        CREATE TABLE livros_autores (livro_id TEXT NOT NULL, autor_id TEXT NOT NULL,
+                                     PRIMARY KEY (livro_id, autor_id));
+        CREATE TABLE emprestimos (id_emprestimo TEXT PRIMARY KEY, livro_id TEXT NOT NULL,
+                                  nome_usuario TEXT NOT NULL, data_emprestimo TEXT NOT NULL,
+                                  data_devolucao_prevista TEXT NOT NULL, data_devolucao_efetiva TEXT);
+        INSERT INTO autores VALUES ('a1', 'Machado de Assis', '1839-06-21', NULL);
+        INSERT INTO livros VALUES ('l1', 'Dom Casmurro', 1899, '123', 'Garnier', 256, 'Capitu');
+        INSERT INTO livros_autores VALUES ('l1', 'a1');
+        INSERT INTO emprestimos VALUES ('e1', 'l1', 'ana', '2024-01-01', '2024-01-15', '2024-01-10');
+    ''')
+    conn.close()
+
+
+def test_banco_legado_chega_a_versao_atual(caminho_bd):
+    _criar_banco_legado(caminho_bd)
+
+    inicializar_bd()
+
+    conn = sqlite3.connect(caminho_bd)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == VERSAO_ATUAL
+    conn.close()
+    assert buscar_autor_por_id_bd("a1").data_nascimento == date(1839, 6, 21)
+    emprestimo = buscar_emprestimo_por_id_bd("e1")
+    assert (emprestimo.data_emprestimo, emprestimo.data_devolucao_prevista,
+            emprestimo.data_devolucao_efetiva) == (date(2024, 1, 1), date(2024, 1, 15), date(2024, 1, 10))
+    assert [livro.id_item for livro, _ in buscar_livros_bd("machado")] == ["l1"]
+    resumo = obter_resumo_bd()
+    assert (resumo["livros"], resumo["autores"], resumo["emprestimos"]) == (1, 1, 1)
+
+
+def test_migracoes_nao_se_repetem(banco):
+    assert aplicar_migracoes() == []
+
+
+def test_migracao_de_coluna_e_idempotente(banco):
+    # A coluna da migração 7 já existe, mas user_version voltou para 6.
+    conn = sqlite3.connect(banco)
+    conn.execute("PRAGMA user_version = 6")
+    conn.close()
+
+    assert aplicar_migracoes() == list(range(7, VERSAO_ATUAL + 1))
+
+
+def test_conversao_de_datas_preserva_dias_ordinais(banco):
+    emprestimo = Emprestimo(Livro("Livro"), "ana", date(2024, 1, 1), date(2024, 1, 15))
+    assert adicionar_livro_bd(emprestimo.livro)
+    assert adicionar_emprestimo_bd(emprestimo)
+    conn = sqlite3.connect(banco)
+    conn.execute("PRAGMA user_version = 4")
+    conn.close()
+
+    assert 5 in aplicar_migracoes()
+
+    relido = buscar_emprestimo_por_id_bd(emprestimo.id_emprestimo)
+    assert (relido.data_emprestimo, relido.data_devolucao_prevista) == (date(2024, 1, 1), date(2024, 1, 15))
+
+
+def test_migracoes_relatam_progresso(caminho_bd):
+    relatos = []
+
+    aplicar_migracoes(progresso=lambda fracao, mensagem: relatos.append((fracao, mensagem)))
+
+    assert len(relatos) == VERSAO_ATUAL
+    assert relatos[0] == (0.0, "Atualizando o banco: tabelas iniciais...")
+    assert [fracao for fracao, _ in relatos] == sorted(fracao for fracao, _ in relatos)
@@ -0,0 +1,67 @@
+import sqlite3
+
+from package.database import (adicionar_livro_bd, atualizar_livro_bd, buscar_livro_por_id_bd, cache_livros,
+                              obter_marca_alteracoes_bd, resolver_autores_bd)
+from package.models import Livro
+
+
+def _reler(id_livro: str) -> Livro:
+    cache_livros.limpar()
+    return buscar_livro_por_id_bd(id_livro)
+
+
+def test_isbn_vazio_e_none_sao_o_mesmo_valor():
+    assert Livro("Livro").isbn is None
+    assert Livro("Livro", isbn="  ").isbn is None
+    assert Livro("Livro", isbn=" 123 ").isbn == "123"
+
+
+def test_regravar_sem_mudancas_nao_escreve(banco):
+    livro = Livro("Sem ISBN", editora="Globo")
+    livro.definir_autores(resolver_autores_bd(["Ana"]))
+    assert adicionar_livro_bd(livro)
+    lido = _reler(livro.id_item)
+    marca = obter_marca_alteracoes_bd()
+
+    # O que o diálogo de edição faz ao salvar sem mexer em nada.
+    lido.titulo = "Sem ISBN"
+    lido.isbn = ""
+    lido.editora = "Globo"
+    lido.definir_autores(resolver_autores_bd(["Ana"]))
+
+    assert lido.campos_alterados == set()
+    assert not lido.possui_alteracoes()
+    assert atualizar_livro_bd(lido)
+    assert obter_marca_alteracoes_bd() == marca
+
+
+def test_update_grava_so_os_campos_alterados(banco):
+    livro = Livro("Original", isbn="111", editora="Globo")
+    assert adicionar_livro_bd(livro)
+    lido = _reler(livro.id_item)
+    # Uma mudança feita por fora depois da leitura, numa coluna que não será regravada.
+    conn = sqlite3.connect(banco)
+    with conn:
+        conn.execute("UPDATE livros SET sinopse = 'de fora' WHERE id_livro = ?", (livro.id_item,))
+    conn.close()
+
+    lido.editora = "Rocco"
+    assert lido.campos_alterados == {"editora"}
+    assert atualizar_livro_bd(lido)
+    assert not lido.possui_alteracoes()
+
+    gravado = _reler(livro.id_item)
+    assert (gravado.editora, gravado.sinopse, gravado.isbn) == ("Rocco", "de fora", "111")
+
+
+def test_troca_de_autores_marca_o_livro_como_alterado(banco):
+    livro = Livro("Livro")
+    livro.definir_autores(resolver_autores_bd(["Ana", "Bia"]))
+    assert adicionar_livro_bd(livro)
+    lido = _reler(livro.id_item)
+
+    lido.definir_autores(resolver_autores_bd(["Bia", "Caio"]))
+    assert lido.campos_alterados == set() and lido.possui_alteracoes()
+    assert atualizar_livro_bd(lido)
+
+    assert [autor.nome for autor in _reler(livro.id_item).autores] == ["Bia", "Caio"]
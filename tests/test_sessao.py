@@ -0,0 +1,56 @@
+import sqlite3
+
+import pytest
+
+from package.database import (adicionar_livro_bd, buscar_livro_por_id_bd, cache_livros, contar_livros_bd,
+                              listar_autores_bd)
+from package.models import Livro
+from package.sessao import Sessao
+
+
+def _nomes_autores() -> list[str]:
+    return sorted(autor.nome for autor in listar_autores_bd())
+
+
+def test_falha_desfaz_toda_a_sessao(banco):
+    assert adicionar_livro_bd(Livro("Existente", isbn="111"))
+
+    sessao = Sessao()
+    primeiro = Livro("Primeiro", isbn="222")
+    primeiro.definir_autores(sessao.resolver_autores(["Autora Nova"]))
+    sessao.adicionar_livro(primeiro)
+    sessao.adicionar_livro(Livro("Repetido", isbn="111"))
+    with pytest.raises(sqlite3.IntegrityError):
+        sessao.gravar()
+
+    assert contar_livros_bd() == 1
+    assert _nomes_autores() == []
+    assert len(sessao) == 0
+
+
+def test_gravar_confirma_livro_e_autores(banco):
+    with Sessao() as sessao:
+        livro = Livro("Dom Casmurro", isbn="123")
+        livro.definir_autores(sessao.resolver_autores(["Machado de Assis", "machado de assis"]))
+        sessao.adicionar_livro(livro)
+
+    gravado = buscar_livro_por_id_bd(livro.id_item)
+    assert [autor.nome for autor in gravado.autores] == ["Machado de Assis"]
+    assert not livro.possui_alteracoes()
+
+
+def test_edicao_que_falha_sai_do_cache(banco):
+    livro = Livro("Original", isbn="111")
+    assert adicionar_livro_bd(livro)
+    assert adicionar_livro_bd(Livro("Outro", isbn="222"))
+    em_cache = buscar_livro_por_id_bd(livro.id_item)
+    assert cache_livros.espiar(livro.id_item) is em_cache
+
+    sessao = Sessao()
+    em_cache.isbn = "222"
+    sessao.atualizar_livro(em_cache)
+    with pytest.raises(sqlite3.IntegrityError):
+        sessao.gravar()
+
+    assert cache_livros.espiar(livro.id_item) is None
+    assert buscar_livro_por_id_bd(livro.id_item).isbn == "111"